@@ -13,19 +13,74 @@
 # limitations under the License.
 
 import asyncio
-import os
 import textwrap
-from dataclasses import dataclass
-from typing import List
+import time
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from typing import List, Optional
 
-from google import genai
 from google.genai import types
 from langgraph.graph import END, START, StateGraph
+from langgraph.types import StreamWriter
 from loguru import logger
 from pydantic import BaseModel, Field
 
-from mcp_examples.tools.duckduckgo import DuckDuckGoSearchResult, search
-from mcp_examples.utils import request_get
+from mcp_examples.llm import GeminiClient, Priority, get_gemini_client
+from mcp_examples.llm_cache import ResponseCache, get_response_cache
+from mcp_examples.tools.duckduckgo import DuckDuckGoSearchResult
+from mcp_examples.tools.duckduckgo import get_client as get_search_client
+from mcp_examples.tools.html_text import extract_text, truncate_utf8
+from mcp_examples.tools.near_duplicates import deduplicate
+from mcp_examples.tools.passage_index import PassageIndex
+from mcp_examples.utils import normalize_url, request_get
+
+EXTRACT_CHUNK_SIZE = 16 * 1024
+CHARS_PER_TOKEN = 4
+
+SUMMARIZER_PROMPT = textwrap.dedent(
+    """
+    You are an expert research summarizer. Your task is to analyze and synthesize multiple research sources into a clear, concise, and well-structured summary. Follow these guidelines:
+
+    1. Focus on key insights, main points, and important findings
+    2. Maintain accuracy and preserve the original meaning
+    3. Organize information logically with clear headings
+    4. Use bullet points for key takeaways
+    5. Include relevant statistics and data points when available
+    6. Highlight any notable trends, patterns, or contradictions
+    7. Keep the language professional yet accessible
+    8. Ensure the summary is comprehensive but concise
+
+    Format the output in markdown with the following structure:
+    # [Main Topic]
+    ## Key Insights
+    - [Insight 1]
+    - [Insight 2]
+    ## Detailed Findings
+    ### [Sub-topic 1]
+    [Summary content]
+    ### [Sub-topic 2]
+    [Summary content]
+    ## Conclusion
+    [Overall synthesis and final thoughts]
+    """
+)
+
+BRIEF_SUMMARY_PROMPT = "Time is short: keep the summary brief and focus on the key insights only."
+
+MAP_PROMPT = textwrap.dedent(
+    """
+    You are an expert research assistant. Extract the key facts, findings, statistics and
+    arguments from the following excerpt that are relevant to the research topic.
+    Write concise bullet points, keep the source title and URL, and omit anything irrelevant.
+    """
+)
+REDUCE_PROMPT = textwrap.dedent(
+    """
+    You are an expert research assistant. Merge the following research notes into a single
+    set of concise bullet points about the research topic. Remove duplicates, keep the
+    source URLs, and preserve statistics, data points and any contradictions between sources.
+    """
+)
 
 
 class PlannerResult(BaseModel):
@@ -42,6 +97,17 @@ class ResearchData(BaseModel):
     title: str = Field(..., description="The title of the research")
     href: str = Field(..., description="The href of the research")
     content: str = Field(..., description="The content of the research")
+    bytes_in: int = Field(
+        description="The number of bytes read from the page", default=0)
+    bytes_out: int = Field(
+        description="The number of bytes of extracted text", default=0)
+    fetched_at: float = Field(
+        description="The time (seconds since the epoch) the page was fetched",
+        default_factory=time.time,
+    )
+    extracted: bool = Field(
+        description="Whether the content is already extracted text", default=False
+    )
 
 
 class ResearchWorkflowState(BaseModel):
@@ -53,11 +119,82 @@ class ResearchWorkflowState(BaseModel):
         description="The research data", default_factory=list
     )
     summary: str = Field(description="The summary of the research", default="")
+    previous_research_data: List[ResearchData] = Field(
+        description="The research data of the previous run of the same research",
+        default_factory=list,
+    )
+    deadline: Optional[float] = Field(
+        description="The time (seconds since the epoch) by which the research must finish",
+        default=None,
+    )
+    degraded: bool = Field(
+        description="Whether the summary was cut short or replaced by the fallback",
+        default=False,
+    )
+
+    def time_left(self) -> Optional[float]:
+        """The number of seconds left before the deadline, or None without a deadline."""
+        if self.deadline is None:
+            return None
+        return self.deadline - time.time()
 
 
 @dataclass
 class ResearchWorkflow:
-    genai_client: genai.Client
+    genai_client: GeminiClient
+    max_results_per_query: int = 3
+    max_concurrent_fetches: int = 20
+    # Stop reading a page after this many bytes.
+    max_page_bytes: int = 512 * 1024
+    # Keep at most this many bytes of extracted text per page.
+    max_text_bytes: int = 32 * 1024
+    # Pages from a previous run younger than this are reused instead of fetched again.
+    max_page_age_seconds: float = 24 * 3600.0
+    # Pages at least this similar to a better page are dropped as near-duplicates.
+    duplicate_similarity_threshold: float = 0.8
+    # Above this many input tokens, only the most relevant passages are summarized.
+    summary_budget_tokens: int = 32_000
+    # Above this many input tokens, every page is summarized with map-reduce
+    # instead. It defaults to twice the summary budget, past which passage
+    # packing would drop more than half of the research data.
+    map_reduce_threshold_tokens: Optional[int] = None
+    # Pages are capped at `max_text_bytes`, about 8k tokens, so that each is
+    # mapped in a couple of chunks.
+    map_chunk_tokens: int = 4_000
+    map_output_tokens: int = 1_024
+    # The input budget of a single reduce call at every level.
+    reduce_budget_tokens: int = 32_000
+    reduce_output_tokens: int = 2_048
+    max_concurrent_summaries: int = 8
+    # The shares of the time left that the planner and then the researcher may
+    # use. The summarizer gets whatever remains.
+    planner_time_share: float = 0.15
+    researcher_time_share: float = 0.55
+    # The time one search query is assumed to take, to decide how many to run.
+    seconds_per_query: float = 10.0
+    # With less time than this left, the summary is kept short.
+    brief_summary_seconds: float = 30.0
+    brief_summary_tokens: int = 1_024
+    # With less time than this left, map-reduce summarization is not attempted.
+    min_map_reduce_seconds: float = 120.0
+    # The time kept in reserve to return the result before the deadline.
+    deadline_margin_seconds: float = 5.0
+    # Identical Gemini requests are answered from this cache.
+    response_cache: ResponseCache = field(default_factory=get_response_cache)
+    use_response_cache: bool = True
+
+    def stage_budget(self, state: ResearchWorkflowState, share: float) -> Optional[float]:
+        """Return the seconds a stage may use, or None when the run has no deadline."""
+        time_left = state.time_left()
+        if time_left is None:
+            return None
+        return max(0.0, (time_left - self.deadline_margin_seconds) * share)
+
+    def map_reduce_threshold(self) -> int:
+        """The number of input tokens above which map-reduce summarization is used."""
+        if self.map_reduce_threshold_tokens is not None:
+            return self.map_reduce_threshold_tokens
+        return 2 * self.summary_budget_tokens
 
     def get_graph_builder(self) -> StateGraph:
         graph_builder = StateGraph(ResearchWorkflowState)
@@ -70,20 +207,40 @@ class ResearchWorkflow:
             "researcher",
             self.researcher,
         )
+        graph_builder.add_node(
+            "extractor",
+            self.extractor,
+        )
+        graph_builder.add_node(
+            "deduplicator",
+            self.deduplicator,
+        )
         graph_builder.add_node(
             "summarizer",
             self.summarizer,
         )
+        graph_builder.add_node(
+            "map_reduce_summarizer",
+            self.map_reduce_summarizer,
+        )
         # Add edges
         graph_builder.add_edge(START, "planner")
         graph_builder.add_edge("planner", "researcher")
-        graph_builder.add_edge("researcher", "summarizer")
+        graph_builder.add_edge("researcher", "extractor")
+        graph_builder.add_edge("extractor", "deduplicator")
+        graph_builder.add_conditional_edges(
+            "deduplicator",
+            self.route_summarizer,
+            ["summarizer", "map_reduce_summarizer"],
+        )
         graph_builder.add_edge("summarizer", END)
+        graph_builder.add_edge("map_reduce_summarizer", END)
         return graph_builder
 
-    def planner(self, state: ResearchWorkflowState) -> ResearchWorkflowState:
+    async def planner(self, state: ResearchWorkflowState) -> ResearchWorkflowState:
         logger.info(
             f"Planning the research for the topic: {state.research_topic}")
+        budget = self.stage_budget(state, self.planner_time_share)
         system_prompt = textwrap.dedent(
             """
             You are an expert research planner specializing in crafting optimal search queries.
@@ -106,22 +263,29 @@ class ResearchWorkflow:
             system_prompt,
             state.research_topic,
         ]
-        response = self.genai_client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=contents,
-            config=types.GenerateContentConfig(
-                response_mime_type="application/json",
-                response_schema=PlannerResult,
-            ),
-        )
-        state.plan = response.parsed
+        try:
+            async with asyncio.timeout(budget):
+                response = await self.response_cache.generate_content(
+                    self.genai_client,
+                    model="gemini-2.0-flash",
+                    contents=contents,
+                    config=types.GenerateContentConfig(
+                        response_mime_type="application/json",
+                        response_schema=PlannerResult,
+                    ),
+                    use_cache=self.use_response_cache,
+                )
+            state.plan = response.parsed
+        except TimeoutError:
+            logger.warning(
+                "The planner ran out of time, searching the topic as-is")
+            state.plan = PlannerResult(search_queries=[state.research_topic])
         logger.info(f"Search queries: {state.plan.search_queries}")
         return state
 
     async def researcher(self, state: ResearchWorkflowState) -> ResearchWorkflowState:
         logger.info(f"Researching the topic: {state.research_topic}")
-        research_data: List[ResearchData] = []
-        semaphore = asyncio.Semaphore(20)
+        semaphore = asyncio.Semaphore(self.max_concurrent_fetches)
 
         async def fetch_research_data(search_result: DuckDuckGoSearchResult) -> ResearchData | None:
             async with semaphore:
@@ -129,11 +293,16 @@ class ResearchWorkflow:
                     f"Researching the search result: {search_result.title} at {search_result.href}"
                 )
                 try:
-                    response = await request_get(search_result.href)
+                    response = await request_get(
+                        search_result.href,
+                        max_bytes=self.max_page_bytes,
+                        use_cache=True,
+                    )
                     return ResearchData(
                         title=search_result.title,
                         href=search_result.href,
                         content=response.text,
+                        bytes_in=len(response.content),
                     )
                 # pylint: disable=broad-exception-caught
                 except Exception as e:
@@ -141,72 +310,335 @@ class ResearchWorkflow:
                         f"Failed to get the content of the search result: {e}")
                     return None
 
-        async def process_search_query(search_query: str) -> List[ResearchData]:
-            tasks = []
-            for _search_result in search(query=search_query, max_results=3):
-                logger.info(
-                    f"Search result: {_search_result.title} at {_search_result.href}")
-                if not _search_result.href.endswith("pdf"):
-                    tasks.append(fetch_research_data(_search_result))
-            results = await asyncio.gather(*tasks)
-            return [result for result in results if result is not None]
-
-        for search_query in state.plan.search_queries:
-            data = await process_search_query(search_query)
-            research_data.extend(data)
-        state.research_data = research_data
+        budget = self.stage_budget(state, self.researcher_time_share)
+        search_queries = state.plan.search_queries
+        if budget is not None:
+            max_queries = max(1, int(budget // self.seconds_per_query))
+            if len(search_queries) > max_queries:
+                logger.warning(
+                    f"Only {budget:.0f}s left, running {max_queries} of {len(search_queries)} queries"
+                )
+                search_queries = search_queries[:max_queries]
+
+        # On a re-run, only the pages that are new or stale are fetched again.
+        now = time.time()
+        previous = {
+            normalize_url(data.href): data
+            for data in state.previous_research_data
+            if now - data.fetched_at < self.max_page_age_seconds
+        }
+        reused: List[ResearchData] = []
+
+        # Search every query at once and start fetching each result as soon as
+        # its query returns, so the run takes about as long as the slowest query.
+        fetch_tasks: List[asyncio.Task] = []
+        try:
+            async with asyncio.timeout(budget):
+                async with aclosing(
+                    get_search_client().iter_search_many(
+                        search_queries, max_results=self.max_results_per_query
+                    )
+                ) as search_results:
+                    async for _search_result in search_results:
+                        logger.info(
+                            f"Search result: {_search_result.title} at {_search_result.href}")
+                        data = previous.pop(
+                            normalize_url(_search_result.href), None)
+                        if data is not None:
+                            reused.append(data)
+                        elif not _search_result.href.endswith("pdf"):
+                            fetch_tasks.append(asyncio.create_task(
+                                fetch_research_data(_search_result)))
+                if fetch_tasks:
+                    await asyncio.wait(fetch_tasks)
+        except TimeoutError:
+            logger.warning(
+                "The researcher ran out of time, keeping the pages fetched so far")
+        for task in fetch_tasks:
+            task.cancel()
+        fetched = [
+            task.result()
+            for task in fetch_tasks
+            if task.done() and not task.cancelled() and task.result() is not None
+        ]
+        if state.previous_research_data:
+            logger.info(
+                f"Reused {len(reused)} pages from the previous run, fetched {len(fetched)}")
+        state.research_data = reused + fetched
+        # The previous pages are not needed anymore, so keep them out of the checkpoints.
+        state.previous_research_data = []
         return state
 
-    def summarizer(self, state: ResearchWorkflowState) -> ResearchWorkflowState:
-        logger.info(f"Summarizing the research data: {state.research_data}")
-        system_prompt = textwrap.dedent(
-            """
-            You are an expert research summarizer. Your task is to analyze and synthesize multiple research sources into a clear, concise, and well-structured summary. Follow these guidelines:
-
-            1. Focus on key insights, main points, and important findings
-            2. Maintain accuracy and preserve the original meaning
-            3. Organize information logically with clear headings
-            4. Use bullet points for key takeaways
-            5. Include relevant statistics and data points when available
-            6. Highlight any notable trends, patterns, or contradictions
-            7. Keep the language professional yet accessible
-            8. Ensure the summary is comprehensive but concise
-
-            Format the output in markdown with the following structure:
-            # [Main Topic]
-            ## Key Insights
-            - [Insight 1]
-            - [Insight 2]
-            ## Detailed Findings
-            ### [Sub-topic 1]
-            [Summary content]
-            ### [Sub-topic 2]
-            [Summary content]
-            ## Conclusion
-            [Overall synthesis and final thoughts]
-            """
-        )
-        all_data = "\n".join(
-            [
-                f"{data.title}\n{data.href}\n{data.content}"
-                for data in state.research_data
-            ]
+    def extractor(self, state: ResearchWorkflowState) -> ResearchWorkflowState:
+        logger.info(
+            f"Extracting the text of {len(state.research_data)} pages")
+        for data in state.research_data:
+            if data.extracted:
+                continue
+            # Feed the page in slices, as it would arrive from the network.
+            chunks = (
+                data.content[i: i + EXTRACT_CHUNK_SIZE]
+                for i in range(0, len(data.content), EXTRACT_CHUNK_SIZE)
+            )
+            data.content = truncate_utf8(
+                extract_text(chunks), self.max_text_bytes)
+            data.bytes_out = len(data.content.encode("utf-8"))
+            data.extracted = True
+            logger.info(
+                f"Extracted {data.href}: {data.bytes_in} bytes in, {data.bytes_out} bytes out"
+            )
+        return state
+
+    def deduplicator(self, state: ResearchWorkflowState) -> ResearchWorkflowState:
+        """Drop mirrors and near-identical copies, keeping the copy with the most text."""
+        kept = deduplicate(
+            [data.content for data in state.research_data],
+            quality=[data.bytes_out for data in state.research_data],
+            threshold=self.duplicate_similarity_threshold,
         )
+        if len(kept) < len(state.research_data):
+            kept_hrefs = {state.research_data[i].href for i in kept}
+            logger.info(
+                "Dropped near-duplicate pages: "
+                f"{[data.href for data in state.research_data if data.href not in kept_hrefs]}"
+            )
+        state.research_data = [state.research_data[i] for i in kept]
+        return state
+
+    async def summarizer(
+        self, state: ResearchWorkflowState, writer: StreamWriter
+    ) -> ResearchWorkflowState:
+        logger.info(
+            f"Summarizing the research data: {[data.href for data in state.research_data]}")
+        all_data = self.pack_research_data(state)
         contents = [
-            system_prompt,
+            SUMMARIZER_PROMPT,
             all_data,
         ]
-        response = self.genai_client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=contents,
+        state.summary = await self.stream_summary(state, contents, writer)
+        return state
+
+    async def stream_summary(
+        self, state: ResearchWorkflowState, contents: List[str], writer: StreamWriter
+    ) -> str:
+        """
+        Generate the summary with the streaming API, within the time left.
+
+        Every chunk of text is written to the graph's custom stream as
+        `{"summary_delta": text}` as soon as it arrives. When time is short the
+        summary is kept brief, and when time runs out the summary generated so
+        far is returned and the state is marked as degraded.
+        """
+        budget = self.stage_budget(state, 1.0)
+        config = None
+        if budget is not None and budget < self.brief_summary_seconds:
+            logger.warning(
+                f"Only {budget:.0f}s left, writing a brief summary")
+            contents = [*contents, BRIEF_SUMMARY_PROMPT]
+            config = types.GenerateContentConfig(
+                max_output_tokens=self.brief_summary_tokens
+            )
+        chunks = []
+        try:
+            async with asyncio.timeout(budget):
+                async with aclosing(
+                    self.response_cache.generate_content_stream(
+                        self.genai_client,
+                        model="gemini-2.0-flash",
+                        contents=contents,
+                        config=config,
+                        use_cache=self.use_response_cache,
+                    )
+                ) as stream:
+                    async for text in stream:
+                        chunks.append(text)
+                        writer({"summary_delta": text})
+        except TimeoutError:
+            logger.warning("The summarizer ran out of time")
+            state.degraded = True
+            if not chunks:
+                return fallback_summary(state)
+        return "".join(chunks)
+
+    def pack_research_data(self, state: ResearchWorkflowState) -> str:
+        """
+        Build the summarizer input within the summary token budget.
+
+        When every page fits, they are concatenated as-is. Otherwise the pages
+        are split into passages and only the passages that rank best with BM25
+        against the research topic and the search queries are kept.
+        """
+        total_tokens = sum(
+            estimate_tokens(data.content) for data in state.research_data)
+        if total_tokens <= self.summary_budget_tokens:
+            return "\n".join(
+                [
+                    f"{data.title}\n{data.href}\n{data.content}"
+                    for data in state.research_data
+                ]
+            )
+        index = PassageIndex()
+        for data in state.research_data:
+            index.add_document(data.title, data.href, data.content)
+        passages = index.pack(
+            [state.research_topic, *state.plan.search_queries],
+            self.summary_budget_tokens,
+            chars_per_token=CHARS_PER_TOKEN,
+        )
+        logger.info(
+            f"Packed {len(passages)} of {len(index.passages)} passages from ~{total_tokens} tokens"
+        )
+        sections = []
+        for passage in passages:
+            if not sections or sections[-1][0] != passage.doc_id:
+                sections.append(
+                    (passage.doc_id, [f"{passage.title}\n{passage.href}"]))
+            sections[-1][1].append(passage.text)
+        return "\n".join("\n".join(lines) for _, lines in sections)
+
+    def route_summarizer(self, state: ResearchWorkflowState) -> str:
+        """Pick the map-reduce summarizer when the research data is too large for one call."""
+        total_tokens = sum(
+            estimate_tokens(data.content) for data in state.research_data)
+        time_left = state.time_left()
+        if time_left is not None and time_left < self.min_map_reduce_seconds:
+            return "summarizer"
+        if total_tokens > self.map_reduce_threshold():
+            logger.info(
+                f"Research data has ~{total_tokens} tokens, using map-reduce summarization"
+            )
+            return "map_reduce_summarizer"
+        return "summarizer"
+
+    async def map_reduce_summarizer(
+        self, state: ResearchWorkflowState, writer: StreamWriter
+    ) -> ResearchWorkflowState:
+        semaphore = asyncio.Semaphore(self.max_concurrent_summaries)
+        # The many map and reduce calls yield to interactive requests.
+        batch_client = self.genai_client.with_priority(Priority.BATCH)
+
+        async def summarize(prompt: str, text: str, max_output_tokens: int) -> str:
+            async with semaphore:
+                response = await self.response_cache.generate_content(
+                    batch_client,
+                    model="gemini-2.0-flash",
+                    contents=[prompt, f"Research topic: {state.research_topic}", text],
+                    config=types.GenerateContentConfig(
+                        max_output_tokens=max_output_tokens
+                    ),
+                    use_cache=self.use_response_cache,
+                )
+                return response.text or ""
+
+        async def merge(group: List[str]) -> str:
+            if len(group) == 1:
+                return group[0]
+            return await summarize(
+                REDUCE_PROMPT, "\n\n".join(group), self.reduce_output_tokens
+            )
+
+        try:
+            # Leave part of the time left for the final summary.
+            async with asyncio.timeout(self.stage_budget(state, 0.7)):
+                # Map: summarize every chunk of every page in parallel.
+                chunk_chars = self.map_chunk_tokens * CHARS_PER_TOKEN
+                chunks = [
+                    f"{data.title}\n{data.href}\n{data.content[i: i + chunk_chars]}"
+                    for data in state.research_data
+                    for i in range(0, len(data.content), chunk_chars)
+                ]
+                logger.info(f"Summarizing {len(chunks)} chunks")
+                notes = await asyncio.gather(
+                    *[summarize(MAP_PROMPT, chunk, self.map_output_tokens) for chunk in chunks]
+                )
+                notes = [note for note in notes if note.strip()]
+
+                # Reduce: merge the notes level by level until they fit in one budget.
+                level = 0
+                while sum(estimate_tokens(note) for note in notes) > self.reduce_budget_tokens:
+                    groups = group_by_budget(notes, self.reduce_budget_tokens)
+                    if len(groups) == len(notes):
+                        break
+                    level += 1
+                    logger.info(
+                        f"Reducing {len(notes)} notes into {len(groups)} at level {level}")
+                    notes = await asyncio.gather(*[merge(group) for group in groups])
+                if sum(estimate_tokens(note) for note in notes) > self.reduce_budget_tokens:
+                    # The notes are too large to be merged in pairs, so cut
+                    # the largest ones down to the budget instead.
+                    logger.warning(
+                        f"Truncating {len(notes)} notes to {self.reduce_budget_tokens} tokens")
+                    notes = truncate_to_budget(notes, self.reduce_budget_tokens)
+        except TimeoutError:
+            logger.warning(
+                "Map-reduce ran out of time, summarizing the most relevant passages instead")
+            notes = [self.pack_research_data(state)]
+
+        state.summary = await self.stream_summary(
+            state, [SUMMARIZER_PROMPT, "\n\n".join(notes)], writer
         )
-        state.summary = response.text
         return state
 
 
+def fallback_summary(state: ResearchWorkflowState) -> str:
+    """The result returned when no summary could be written in time."""
+    sources = "\n".join(
+        f"- [{data.title}]({data.href})" for data in state.research_data)
+    return (
+        f"# {state.research_topic}\n\n"
+        "The research ran out of time before a summary could be written.\n\n"
+        f"## Sources\n{sources or '- No sources were fetched.'}\n"
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the number of tokens in the text."""
+    return len(text) // CHARS_PER_TOKEN
+
+
+def group_by_budget(texts: List[str], budget_tokens: int) -> List[List[str]]:
+    """
+    Greedily group consecutive texts so that each group fits in the token budget.
+
+    A text larger than the budget on its own forms a group by itself.
+    """
+    groups: List[List[str]] = []
+    current: List[str] = []
+    current_tokens = 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if current and current_tokens + tokens > budget_tokens:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+def truncate_to_budget(texts: List[str], budget_tokens: int) -> List[str]:
+    """
+    Truncate the largest texts so that all the texts fit in the token budget together.
+
+    Texts smaller than an equal share of the budget are kept whole, and the
+    others share what they leave.
+    """
+    limits = [0] * len(texts)
+    remaining = budget_tokens
+    order = sorted(range(len(texts)), key=lambda i: estimate_tokens(texts[i]))
+    for n, i in enumerate(order):
+        limits[i] = min(estimate_tokens(texts[i]), remaining // (len(texts) - n))
+        remaining -= limits[i]
+    return [
+        text if estimate_tokens(text) <= limit else text[: limit * CHARS_PER_TOKEN]
+        for text, limit in zip(texts, limits, strict=True)
+    ]
+
+
 if __name__ == "__main__":
     # Create the Gemini client
-    client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    client = get_gemini_client()
 
     # Build the graph
     graph_builder = ResearchWorkflow(genai_client=client).get_graph_builder()
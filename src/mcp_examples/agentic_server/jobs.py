@@ -0,0 +1,245 @@
+# Copyright 2025 yu-iskw
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import itertools
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from loguru import logger
+from pydantic import BaseModel, Field, PrivateAttr
+
+# Called with the name of each completed stage, its step number and the number of steps.
+ProgressCallback = Callable[[str, int, int], Awaitable[None]]
+# Called with each piece of the summary as it is generated.
+TokenCallback = Callable[[str], Awaitable[None]]
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Job(BaseModel):
+    """A research job."""
+
+    job_id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    research_topic: str = Field(..., description="The topic to research")
+    priority: int = Field(
+        description="Jobs with a higher priority run first", default=0)
+    status: JobStatus = Field(default=JobStatus.QUEUED)
+    stage: str = Field(
+        description="The last completed stage of the job", default="")
+    progress: float = Field(
+        description="The progress of the job, from 0 to 1", default=0.0)
+    deadline: Optional[float] = Field(
+        description="The time (seconds since the epoch) by which the job must finish",
+        default=None,
+    )
+    thread_id: Optional[str] = Field(
+        description="The checkpoint thread the job runs in", default=None)
+    created_at: float = Field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    summary: str = Field(description="The result of the job", default="")
+    error: str = Field(
+        description="The error message of a failed job", default="")
+
+    _done: asyncio.Event = PrivateAttr(default_factory=asyncio.Event)
+    _on_progress: Optional[ProgressCallback] = PrivateAttr(default=None)
+    _on_token: Optional[TokenCallback] = PrivateAttr(default=None)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+    async def report_progress(self, stage: str, step: int, total: int) -> None:
+        """Record the completion of a stage and forward it to the submitter."""
+        self.stage = stage
+        self.progress = min(step / total, 1.0)
+        if self._on_progress is not None:
+            try:
+                await self._on_progress(stage, step, total)
+            # pylint: disable=broad-exception-caught
+            except Exception as e:
+                logger.warning(
+                    f"Failed to report the progress of job {self.job_id}: {e}")
+
+    async def report_token(self, text: str) -> None:
+        """Forward a piece of the streamed summary to the submitter."""
+        if self._on_token is not None:
+            try:
+                await self._on_token(text)
+            # pylint: disable=broad-exception-caught
+            except Exception as e:
+                logger.warning(
+                    f"Failed to stream the summary of job {self.job_id}: {e}")
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a job is submitted while the queue is full."""
+
+
+JobRunner = Callable[[Job], Awaitable[str]]
+
+
+@dataclass
+class JobManager:
+    """A bounded pool of workers that runs jobs from a priority queue.
+
+    Submitting to a full queue fails immediately with `QueueFullError` instead
+    of piling up work, so callers get backpressure. Jobs with the same priority
+    run in submission order. Only the latest `max_finished_jobs` finished jobs
+    are kept.
+    """
+
+    runner: JobRunner
+    num_workers: int = 2
+    max_queue_size: int = 32
+    max_finished_jobs: int = 256
+
+    _jobs: "OrderedDict[str, Job]" = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+    _queue: Optional["asyncio.PriorityQueue[Tuple[int, int, str]]"] = field(
+        default=None, init=False, repr=False
+    )
+    _workers: List[asyncio.Task] = field(
+        default_factory=list, init=False, repr=False)
+    _sequence: itertools.count = field(
+        default_factory=itertools.count, init=False, repr=False
+    )
+
+    def _start(self) -> "asyncio.PriorityQueue[Tuple[int, int, str]]":
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue(maxsize=self.max_queue_size)
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._work(), name=f"research-worker-{i}")
+                for i in range(self.num_workers)
+            ]
+        return self._queue
+
+    def submit(
+        self,
+        research_topic: str,
+        priority: int = 0,
+        deadline: Optional[float] = None,
+        on_progress: Optional[ProgressCallback] = None,
+        on_token: Optional[TokenCallback] = None,
+        thread_id: Optional[str] = None,
+    ) -> Job:
+        """
+        Queue a job.
+
+        Args:
+            research_topic: The topic to research.
+            priority: Jobs with a higher priority run first.
+            deadline: The time (seconds since the epoch) by which the job must finish.
+            on_progress: Called as each stage of the job completes.
+            on_token: Called with each piece of the summary as it is generated.
+            thread_id: The checkpoint thread the job runs in.
+
+        Raises:
+            QueueFullError: The queue is full.
+        """
+        queue = self._start()
+        if queue.full():
+            raise QueueFullError(
+                f"The research queue is full ({self.max_queue_size} jobs), try again later"
+            )
+        job = Job(
+            research_topic=research_topic,
+            priority=priority,
+            deadline=deadline,
+            thread_id=thread_id,
+        )
+        job._on_progress = on_progress  # pylint: disable=protected-access
+        job._on_token = on_token  # pylint: disable=protected-access
+        self._jobs[job.job_id] = job
+        queue.put_nowait((-priority, next(self._sequence), job.job_id))
+        logger.info(f"Queued job {job.job_id}: {research_topic}")
+        return job
+
+    def get(self, job_id: str) -> Job:
+        """
+        Return the job with the given id.
+
+        Raises:
+            KeyError: The job does not exist or has expired.
+        """
+        if job_id not in self._jobs:
+            raise KeyError(f"Unknown job: {job_id}")
+        return self._jobs[job_id]
+
+    async def wait(self, job_id: str) -> Job:
+        """Wait until the job has finished and return it."""
+        job = self.get(job_id)
+        await job._done.wait()  # pylint: disable=protected-access
+        return job
+
+    def active(self) -> List[Job]:
+        """The queued and running jobs, in submission order."""
+        return [job for job in self._jobs.values() if not job.finished]
+
+    def queued(self) -> int:
+        """The number of jobs waiting for a worker."""
+        return 0 if self._queue is None else self._queue.qsize()
+
+    async def _work(self) -> None:
+        assert self._queue is not None
+        while True:
+            _, _, job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            if job is None:
+                self._queue.task_done()
+                continue
+            job.status = JobStatus.RUNNING
+            job.started_at = time.time()
+            try:
+                if job.deadline is not None and job.started_at >= job.deadline:
+                    raise TimeoutError(
+                        "The deadline passed while the job was queued")
+                job.summary = await self.runner(job)
+                job.status = JobStatus.SUCCEEDED
+                job.progress = 1.0
+            # pylint: disable=broad-exception-caught
+            except Exception as e:
+                logger.error(f"Job {job.job_id} failed: {e}")
+                job.status = JobStatus.FAILED
+                job.error = str(e)
+            finally:
+                job.finished_at = time.time()
+                job._done.set()  # pylint: disable=protected-access
+                self._queue.task_done()
+                self._prune()
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id,
+                    job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+
+    async def aclose(self) -> None:
+        """Stop the workers."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
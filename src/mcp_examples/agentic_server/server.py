@@ -12,35 +12,426 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import hashlib
+import math
 import os
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
 
+import aiosqlite
 from dotenv import load_dotenv
-from google import genai
-from mcp.server.fastmcp import FastMCP
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from langgraph.graph.state import CompiledStateGraph
+from loguru import logger
+from mcp.server.fastmcp import Context, FastMCP
 
 from mcp_examples.agentic_server.agent import ResearchWorkflow, ResearchWorkflowState
+from mcp_examples.agentic_server.jobs import (
+    Job,
+    JobManager,
+    JobStatus,
+    ProgressCallback,
+    TokenCallback,
+)
+from mcp_examples.cache import SingleFlight, TTLCache, cache_dir
+from mcp_examples.llm import get_gemini_client
 
 # Initialize FastMCP server
 mcp = FastMCP("math")
 
 load_dotenv()  # load environment variables from .env
 
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
-# client = genai.Client(vertexai=True, location="us-central1")
+client = get_gemini_client()
 graph_builder = ResearchWorkflow(genai_client=client).get_graph_builder()
-graph = graph_builder.compile()
+
+_graph: Optional[CompiledStateGraph] = None
+
+
+def get_graph() -> CompiledStateGraph:
+    """
+    Return the research graph, checkpointed to SQLite after every node.
+
+    It must be called from the event loop the graph runs on.
+    """
+    global _graph  # pylint: disable=global-statement
+    if _graph is None:
+        conn = aiosqlite.connect(str(cache_dir() / "checkpoints.sqlite3"))
+        # Do not keep the process alive for the connection's thread on exit.
+        conn.daemon = True
+        _graph = graph_builder.compile(checkpointer=AsyncSqliteSaver(conn))
+    return _graph
+
+
+# Only the checkpoints of the most recently run research threads are kept.
+MAX_CHECKPOINT_THREADS = int(os.getenv("RESEARCH_CHECKPOINT_THREADS", "64"))
+
+
+async def prune_checkpoints(
+    saver: AsyncSqliteSaver, thread_id: str, max_threads: int = MAX_CHECKPOINT_THREADS
+) -> None:
+    """
+    Bound the checkpoints after a run of the thread has completed.
+
+    Every node writes a checkpoint with the full page contents, so only the
+    latest checkpoint of the thread is kept, for the next run to reuse its
+    pages. Then only the `max_threads` most recently run threads are kept.
+    Checkpoint ids are time-ordered, so the latest is the largest.
+    """
+    await saver.setup()
+    async with saver.lock:
+        for table in ("checkpoints", "writes"):
+            await saver.conn.execute(
+                f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_id <"
+                " (SELECT MAX(checkpoint_id) FROM checkpoints WHERE thread_id = ?)",
+                (thread_id, thread_id),
+            )
+        await saver.conn.execute(
+            "DELETE FROM checkpoints WHERE thread_id IN (SELECT thread_id FROM checkpoints"
+            " GROUP BY thread_id ORDER BY MAX(checkpoint_id) DESC LIMIT -1 OFFSET ?)",
+            (max_threads,),
+        )
+        await saver.conn.execute(
+            "DELETE FROM writes WHERE thread_id NOT IN (SELECT thread_id FROM checkpoints)"
+        )
+        await saver.conn.commit()
+
+
+# Concurrent requests for the same topic share one graph run, and finished
+# summaries are served from a short-lived cache.
+SUMMARY_CACHE_TTL_SECONDS = 600
+research_flight = SingleFlight()
+summary_cache: TTLCache[str] = TTLCache(
+    maxsize=256, ttl=SUMMARY_CACHE_TTL_SECONDS)
+# The deadlines of the in-flight runs of each topic, None for no deadline.
+research_runs: Dict[str, List[Optional[float]]] = {}
+
+
+def normalize_topic(research_topic: str) -> str:
+    """Normalize a research topic so that trivially different spellings share a key."""
+    return " ".join(research_topic.casefold().split())
+
+
+def finishes_by(run_deadline: Optional[float], deadline: Optional[float]) -> bool:
+    """Whether a run with `run_deadline` ends no later than `deadline`."""
+    if deadline is None:
+        return True
+    return run_deadline is not None and run_deadline <= deadline
+
+
+def find_research_run(
+    key: str, deadline: Optional[float]
+) -> Optional[Tuple[str, Optional[float]]]:
+    """Return the flight key of an in-flight run of the topic that ends by the deadline."""
+    run_deadlines = [
+        run_deadline
+        for run_deadline in research_runs.get(key, [])
+        if finishes_by(run_deadline, deadline)
+    ]
+    if not run_deadlines:
+        return None
+    # The run with the most time left writes the best summary.
+    return key, max(run_deadlines, key=lambda d: math.inf if d is None else d)
+
+
+def research_thread_id(research_topic: str) -> str:
+    """Return the checkpoint thread of a research topic."""
+    digest = hashlib.sha256(normalize_topic(research_topic).encode("utf-8"))
+    return f"research-{digest.hexdigest()[:16]}"
+
+
+# The step number of each graph node of a research run.
+RESEARCH_STEPS = {
+    "planner": 1,
+    "researcher": 2,
+    "extractor": 3,
+    "deduplicator": 4,
+    "summarizer": 5,
+    "map_reduce_summarizer": 5,
+}
+NUM_RESEARCH_STEPS = 5
+
+
+async def invoke_graph(
+    research_topic: str,
+    deadline: Optional[float] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    on_token: Optional[TokenCallback] = None,
+    thread_id: Optional[str] = None,
+) -> Tuple[str, bool]:
+    """
+    Run the research graph, reporting each completed node and each summary chunk.
+
+    The run is checkpointed under `thread_id`, one thread per topic by
+    default. When the last run of the thread was interrupted, it resumes after
+    the last node that finished. When it completed, a new run starts from the
+    pages it fetched, and only new or stale pages are fetched again. Once the
+    run completes, the checkpoints are pruned.
+
+    Returns:
+        The summary, and whether it is degraded: cut short or replaced by the
+        fallback because time ran out.
+    """
+    graph = get_graph()
+    thread_id = thread_id or research_thread_id(research_topic)
+    config = {"configurable": {"thread_id": thread_id}}
+    snapshot = await graph.aget_state(config)
+    graph_input: Optional[ResearchWorkflowState] = None
+    if snapshot.next:
+        logger.info(
+            f"Resuming the research for {research_topic} at {list(snapshot.next)}")
+        await graph.aupdate_state(config, {"deadline": deadline})
+    else:
+        graph_input = ResearchWorkflowState(
+            research_topic=research_topic,
+            deadline=deadline,
+            previous_research_data=snapshot.values.get("research_data", []),
+        )
+    summary, degraded = "", False
+    async for mode, chunk in graph.astream(
+        graph_input, config, stream_mode=["updates", "custom"]
+    ):
+        if mode == "custom":
+            if on_token is not None and "summary_delta" in chunk:
+                await on_token(chunk["summary_delta"])
+            continue
+        for node, values in chunk.items():
+            summary = values.get("summary", summary)
+            degraded = values.get("degraded", degraded)
+            if on_progress is not None:
+                await on_progress(node, RESEARCH_STEPS.get(node, 0), NUM_RESEARCH_STEPS)
+    if isinstance(graph.checkpointer, AsyncSqliteSaver):
+        await prune_checkpoints(graph.checkpointer, thread_id, MAX_CHECKPOINT_THREADS)
+    return summary, degraded
+
+
+async def run_research(
+    research_topic: str,
+    deadline: Optional[float] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    on_token: Optional[TokenCallback] = None,
+    thread_id: Optional[str] = None,
+) -> str:
+    """
+    Run the research graph, coalescing duplicate and recently answered topics.
+
+    A request only joins an in-flight run of the topic that ends by its own
+    deadline, so it never waits past the deadline; otherwise it starts its own
+    run, in a separate checkpoint thread when another run of the topic is in
+    flight. Only the request that starts a graph run receives its progress and
+    summary stream; requests that join it just wait for the result. Degraded
+    summaries are returned but not cached, so the next request researches
+    again.
+    """
+    key = normalize_topic(research_topic)
+    summary = summary_cache.get(key)
+    if summary is not None:
+        logger.info(f"Serving the cached summary for: {research_topic}")
+        return summary
+    flight_key = find_research_run(key, deadline)
+    if flight_key is not None:
+        logger.info(f"Joining the in-flight research for: {research_topic}")
+    else:
+        if research_runs.get(key):
+            thread_id = thread_id or research_thread_id(research_topic)
+            thread_id = f"{thread_id}-{uuid.uuid4().hex[:8]}"
+        flight_key = (key, deadline)
+        research_runs.setdefault(key, []).append(deadline)
+    run_deadline = flight_key[1]
+
+    async def invoke() -> str:
+        try:
+            summary, degraded = await invoke_graph(
+                research_topic, run_deadline, on_progress, on_token, thread_id)
+        finally:
+            research_runs[key].remove(run_deadline)
+            if not research_runs[key]:
+                del research_runs[key]
+        if summary and not degraded:
+            summary_cache.set(key, summary)
+        return summary
+
+    return await research_flight.ado(flight_key, invoke)
+
+
+async def run_job(job: Job) -> str:
+    return await run_research(
+        job.research_topic,
+        deadline=job.deadline,
+        on_progress=job.report_progress,
+        on_token=job.report_token,
+        thread_id=job.thread_id,
+    )
+
+
+# Every research run goes through a bounded pool of workers.
+job_manager = JobManager(
+    runner=run_job,
+    num_workers=int(os.getenv("RESEARCH_WORKERS", "2")),
+    max_queue_size=int(os.getenv("RESEARCH_QUEUE_SIZE", "32")),
+)
+# Blocking `research` calls jump ahead of submitted background jobs.
+INTERACTIVE_PRIORITY = 10
+# Stay well within the 300 seconds read timeout of typical clients.
+DEFAULT_RESEARCH_TIMEOUT_SECONDS = 240.0
+
+
+def find_research_job(research_topic: str, deadline: Optional[float]) -> Optional[Job]:
+    """
+    Return an active job of the topic that an interactive call can wait for.
+
+    The job must end by the deadline, and be running or queued at least at
+    the interactive priority, so that waiting for it is never slower than a
+    new job.
+    """
+    key = normalize_topic(research_topic)
+    for job in job_manager.active():
+        if (
+            normalize_topic(job.research_topic) == key
+            and finishes_by(job.deadline, deadline)
+            and (job.status == JobStatus.RUNNING or job.priority >= INTERACTIVE_PRIORITY)
+        ):
+            return job
+    return None
+
+
+async def wait_for_research(job: Job, timeout_seconds: float) -> str:
+    """Wait for a research job and return its summary."""
+    try:
+        async with asyncio.timeout(timeout_seconds):
+            job = await job_manager.wait(job.job_id)
+    except TimeoutError as e:
+        raise RuntimeError(
+            f"The research did not finish within {timeout_seconds:.0f}s, "
+            f"poll get_research_result with job id {job.job_id}"
+        ) from e
+    if job.status == JobStatus.FAILED:
+        raise RuntimeError(f"Research failed: {job.error}")
+    return job.summary
 
 
 @mcp.tool()
-async def research(research_topic: str) -> str:
+async def research(
+    research_topic: str,
+    ctx: Context,
+    timeout_seconds: float = DEFAULT_RESEARCH_TIMEOUT_SECONDS,
+) -> str:
     """Research the given topic.
 
+    Progress notifications are sent as each step completes, and the summary is
+    streamed as `info` log messages while it is generated. When time runs
+    short, the research runs fewer queries, reads fewer pages and writes a
+    shorter summary rather than failing.
+
     Args:
         research_topic: The topic to research
+        timeout_seconds: The time budget for the whole research, in seconds
+    """
+    summary = summary_cache.get(normalize_topic(research_topic))
+    if summary is not None:
+        return summary
+    deadline = time.time() + timeout_seconds
+    # Duplicate calls wait for the same job rather than each holding a worker.
+    job = find_research_job(research_topic, deadline)
+    if job is not None:
+        logger.info(f"Waiting for job {job.job_id}: {research_topic}")
+        return await wait_for_research(job, timeout_seconds)
+
+    async def on_progress(stage: str, step: int, total: int) -> None:
+        await ctx.report_progress(step, total)
+
+    async def on_token(text: str) -> None:
+        await ctx.request_context.session.send_log_message(
+            level="info", data=text, logger="research.summary"
+        )
+
+    job = job_manager.submit(
+        research_topic,
+        priority=INTERACTIVE_PRIORITY,
+        deadline=deadline,
+        on_progress=on_progress,
+        on_token=on_token,
+        thread_id=research_thread_id(research_topic),
+    )
+    return await wait_for_research(job, timeout_seconds)
+
+
+@mcp.tool()
+async def submit_research(
+    research_topic: str,
+    priority: int = 0,
+    timeout_seconds: Optional[float] = None,
+    thread_id: Optional[str] = None,
+) -> str:
+    """Start researching the given topic in the background and return the job.
+
+    Fails immediately when the research queue is full. Runs are checkpointed,
+    so a run that was interrupted resumes where it stopped, and a re-run only
+    fetches the pages that are new or stale.
+
+    Args:
+        research_topic: The topic to research
+        priority: Jobs with a higher priority run first
+        timeout_seconds: An optional time budget for the research, in seconds
+        thread_id: The checkpoint thread to resume, one per topic by default
+    """
+    deadline = None if timeout_seconds is None else time.time() + timeout_seconds
+    job = job_manager.submit(
+        research_topic,
+        priority=priority,
+        deadline=deadline,
+        thread_id=thread_id or research_thread_id(research_topic),
+    )
+    return job.model_dump_json(include={"job_id", "status", "thread_id"})
+
+
+@mcp.tool()
+async def resume_research(job_id: str, timeout_seconds: Optional[float] = None) -> str:
+    """Resume a failed research job from its last checkpoint and return the new job.
+
+    Args:
+        job_id: The id returned by submit_research
+        timeout_seconds: An optional time budget for the research, in seconds
+    """
+    previous = job_manager.get(job_id)
+    if previous.status != JobStatus.FAILED:
+        raise ValueError(
+            f"Only failed jobs can be resumed, job {job_id} is {previous.status.value}")
+    deadline = None if timeout_seconds is None else time.time() + timeout_seconds
+    job = job_manager.submit(
+        previous.research_topic,
+        priority=previous.priority,
+        deadline=deadline,
+        thread_id=previous.thread_id,
+    )
+    return job.model_dump_json(include={"job_id", "status", "thread_id"})
+
+
+@mcp.tool()
+async def get_research_status(job_id: str) -> str:
+    """Get the status and progress of a research job.
+
+    Args:
+        job_id: The id returned by submit_research
+    """
+    job = job_manager.get(job_id)
+    return job.model_dump_json(exclude={"summary"})
+
+
+@mcp.tool()
+async def get_research_result(job_id: str) -> str:
+    """Get the summary of a finished research job.
+
+    Args:
+        job_id: The id returned by submit_research
     """
-    state = ResearchWorkflowState(research_topic=research_topic)
-    response = await graph.ainvoke(state)
-    return response["summary"]
+    job = job_manager.get(job_id)
+    if job.status == JobStatus.SUCCEEDED:
+        return job.summary
+    if job.status == JobStatus.FAILED:
+        return f"The research failed: {job.error}"
+    return f"The research is still {job.status.value} ({job.progress:.0%} done)."
 
 
 if __name__ == "__main__":
@@ -0,0 +1,221 @@
+# Copyright 2025 yu-iskw
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+T = TypeVar("T")
+
+
+def cache_dir() -> Path:
+    """
+    Return the directory for the persistent caches, creating it if needed.
+
+    It is `$MCP_EXAMPLES_CACHE_DIR` when set, and `~/.cache/mcp_examples` otherwise.
+    """
+    path = Path(
+        os.getenv("MCP_EXAMPLES_CACHE_DIR")
+        or Path.home() / ".cache" / "mcp_examples"
+    )
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+@dataclass
+class TTLCache(Generic[T]):
+    """A bounded in-memory LRU cache whose entries expire after a TTL.
+
+    It is safe to use from several threads.
+    """
+
+    maxsize: int = 1024
+    ttl: float = 3600.0
+
+    hits: int = field(default=0, init=False)
+    misses: int = field(default=0, init=False)
+    _entries: "OrderedDict[Hashable, Tuple[float, T]]" = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False)
+
+    def get(self, key: Hashable) -> Optional[T]:
+        """Return the cached value, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: T, ttl: Optional[float] = None) -> None:
+        """Cache the value, evicting the least recently used entries over `maxsize`."""
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@dataclass
+class SQLiteStore:
+    """A persistent key-value store of JSON values with expiry, backed by SQLite."""
+
+    path: Path
+    table: str = "entries"
+
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False)
+    _conn: Optional[sqlite3.Connection] = field(
+        default=None, init=False, repr=False)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(
+                str(self.path), check_same_thread=False)
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table}"
+                " (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+        return self._conn
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the stored value, or None if it is missing or expired."""
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (
+                    key,)
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + ttl),
+            )
+            self.conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self.conn.execute(
+                f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self.conn.commit()
+
+    def purge_expired(self) -> int:
+        """Delete the expired entries and return how many were deleted."""
+        with self._lock:
+            cursor = self.conn.execute(
+                f"DELETE FROM {self.table} WHERE expires_at <= ?", (time.time(),)
+            )
+            self.conn.commit()
+            return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+@dataclass
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into a single execution.
+
+    While a call for a key is in flight, later callers with the same key wait
+    for it and share its result or exception instead of running their own.
+    `do` coalesces across threads and `ado` across tasks of an event loop.
+    """
+
+    _calls: Dict[Hashable, Future] = field(
+        default_factory=dict, init=False, repr=False)
+    _tasks: Dict[Hashable, asyncio.Future] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False)
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._tasks.get(key)
+        if task is None:
+            # The shared call runs as its own task, so cancelling one caller
+            # does not cancel it for the others.
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls or key in self._tasks
@@ -1,17 +1,17 @@
 import asyncio
-import os
 import sys
 from contextlib import AsyncExitStack
 from datetime import timedelta
 from typing import Optional
 
 from dotenv import load_dotenv
-from google import genai
 from google.genai import types as genai_types
 from loguru import logger
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
+from mcp_examples.llm import get_gemini_client
+from mcp_examples.llm_cache import get_response_cache
 from mcp_examples.utils import to_gemini_tool
 
 load_dotenv()  # load environment variables from .env
@@ -22,7 +22,7 @@ class MCPClient:
         # Initialize session and client objects
         self.session: Optional[ClientSession] = None
         self.exit_stack = AsyncExitStack()
-        self.gemini = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+        self.gemini = get_gemini_client()
 
     async def connect_to_server(self, server_script_path: str):
         """Connect to an MCP server
@@ -59,8 +59,13 @@ class MCPClient:
         print("\nConnected to server with tools:",
               [tool.name for tool in tools])
 
-    async def process_query(self, query: str) -> str:
-        """Process a query using Claude and available tools"""
+    async def process_query(self, query: str, use_cache: bool = True) -> str:
+        """Process a query using Claude and available tools
+
+        Args:
+            query: The query
+            use_cache: Whether to reuse the model response to an identical query
+        """
         # messages = [{"role": "user", "content": query}]
 
         messages = [
@@ -73,7 +78,8 @@ class MCPClient:
         genai_tools = [to_gemini_tool(tool) for tool in response.tools]
 
         # Initial Claude API call
-        response = self.gemini.models.generate_content(
+        response = await get_response_cache().generate_content(
+            self.gemini,
             model="gemini-2.0-flash",
             contents=messages,
             config=genai_types.GenerateContentConfig(
@@ -82,6 +88,7 @@ class MCPClient:
                     disable=False,
                 ),
             ),
+            use_cache=use_cache,
         )
         logger.debug(f"Response: {response}")
 
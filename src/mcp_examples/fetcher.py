@@ -0,0 +1,188 @@
+# Copyright 2025 yu-iskw
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+import httpx
+from loguru import logger
+
+from mcp_examples.cache import cache_dir
+from mcp_examples.page_cache import PageCache
+
+DEFAULT_USER_AGENT = "mcp-examples/0.1 (+https://github.com/yu-iskw/mcp-examples)"
+
+
+@dataclass
+class AsyncFetcher:
+    """A shared, connection-pooled async HTTP client.
+
+    All requests go through a single `httpx.AsyncClient`, so connections are
+    kept alive and reused across calls. Concurrency is bounded twice: by a
+    global in-flight cap and by a per-host cap, so that one slow site cannot
+    starve the others. A per-host slot is only kept while the host has
+    requests in flight. Every request runs under a deadline that also covers
+    the time spent waiting for a free slot.
+    """
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    max_in_flight: int = 50
+    max_per_host: int = 6
+    timeout: float = 10.0
+    follow_redirects: bool = True
+    headers: Dict[str, str] = field(
+        default_factory=lambda: {"User-Agent": DEFAULT_USER_AGENT}
+    )
+    transport: Optional[httpx.AsyncBaseTransport] = None
+    cache: Optional[PageCache] = None
+
+    _client: Optional[httpx.AsyncClient] = field(
+        default=None, init=False, repr=False)
+    _in_flight: Optional[asyncio.Semaphore] = field(
+        default=None, init=False, repr=False)
+    # The semaphore of every host with requests in flight, and their number.
+    _hosts: Dict[str, Tuple[asyncio.Semaphore, int]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The underlying pooled client, created on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                follow_redirects=self.follow_redirects,
+                timeout=self.timeout,
+                transport=self.transport,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+            )
+        return self._client
+
+    @asynccontextmanager
+    async def _slot(self, url: str) -> AsyncIterator[None]:
+        """Hold a global and a per-host slot for the duration of a request."""
+        if self._in_flight is None:
+            self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        host = httpx.URL(url).host
+        semaphore, users = self._hosts.get(
+            host, (asyncio.Semaphore(self.max_per_host), 0))
+        self._hosts[host] = (semaphore, users + 1)
+        try:
+            async with self._in_flight, semaphore:
+                yield
+        finally:
+            semaphore, users = self._hosts[host]
+            if users == 1:
+                del self._hosts[host]
+            else:
+                self._hosts[host] = (semaphore, users - 1)
+
+    async def get(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        use_cache: bool = False,
+    ) -> httpx.Response:
+        """
+        Request the given URL and return the response.
+
+        Args:
+            url: The URL to request.
+            headers: Extra headers for this request.
+            timeout: The deadline in seconds, including the wait for a free slot.
+            max_bytes: Stop reading the body after this many (decoded) bytes.
+            use_cache: Serve fresh pages from the page cache, revalidate stale
+                ones and store new ones. A body cut at `max_bytes` is not stored.
+
+        Raises:
+            TimeoutError: The deadline passed before the response was read.
+            httpx.HTTPError: The request failed or returned an error status.
+        """
+        deadline = timeout if timeout is not None else self.timeout
+        cache = self.cache if use_cache else None
+        page = None
+        if cache is not None:
+            page = await asyncio.to_thread(cache.lookup, url)
+            if page is not None:
+                if page.is_fresh():
+                    return page.to_response(max_bytes)
+                headers = {**page.validators(), **(headers or {})}
+        async with asyncio.timeout(deadline):
+            async with self._slot(url):
+                if max_bytes is None:
+                    response = await self.client.get(url, headers=headers)
+                else:
+                    response = await self._get_capped(url, headers, max_bytes)
+        if page is not None and response.status_code == httpx.codes.NOT_MODIFIED:
+            page = await asyncio.to_thread(cache.refresh, page, response)
+            return page.to_response(max_bytes)
+        response.raise_for_status()
+        if cache is not None and not response.extensions.get("truncated"):
+            await asyncio.to_thread(cache.store, url, response)
+        return response
+
+    async def _get_capped(
+        self, url: str, headers: Optional[Dict[str, str]], max_bytes: int
+    ) -> httpx.Response:
+        """
+        Stream the body and close the connection once `max_bytes` have been read.
+
+        A response whose body was cut has the `truncated` extension set.
+        """
+        async with self.client.stream("GET", url, headers=headers) as response:
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+                # Reading past the cap tells a cut body from one that fits exactly.
+                if len(body) > max_bytes:
+                    break
+        # The body is already decoded, so drop the headers describing the wire format.
+        response_headers = httpx.Headers(response.headers)
+        for name in ("content-encoding", "content-length", "transfer-encoding"):
+            response_headers.pop(name, None)
+        return httpx.Response(
+            response.status_code,
+            headers=response_headers,
+            content=bytes(body[:max_bytes]),
+            request=response.request,
+            extensions={"truncated": len(body) > max_bytes},
+        )
+
+    async def aclose(self) -> None:
+        """Close the pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.debug("Closed the shared HTTP client")
+
+
+_fetcher: Optional[AsyncFetcher] = None
+
+
+def get_fetcher() -> AsyncFetcher:
+    """Return the process-wide fetcher shared by all servers."""
+    global _fetcher  # pylint: disable=global-statement
+    if _fetcher is None:
+        _fetcher = AsyncFetcher(cache=PageCache(cache_dir() / "pages.sqlite3"))
+    return _fetcher
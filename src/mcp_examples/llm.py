@@ -0,0 +1,266 @@
+# Copyright 2025 yu-iskw
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import itertools
+import os
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from dotenv import load_dotenv
+from google import genai
+from google.genai import errors, types
+from loguru import logger
+from pydantic import BaseModel
+
+from mcp_examples.ratelimit import AsyncTokenBucket, retry_async
+
+# The number of characters assumed per token.
+CHARS_PER_TOKEN = 4
+# The output tokens assumed for a request without `max_output_tokens`.
+DEFAULT_OUTPUT_TOKENS = 1_024
+# The API errors worth retrying: rate limiting and server errors.
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class Priority(str, Enum):
+    """The priority class of a Gemini request."""
+
+    # A user is waiting for the response.
+    INTERACTIVE = "interactive"
+    # Bulk work that yields to interactive requests.
+    BATCH = "batch"
+
+
+def estimate_request_tokens(
+    contents: Any, config: Optional[types.GenerateContentConfig] = None
+) -> int:
+    """Roughly estimate the input and output tokens of a request."""
+
+    def size(value: Any) -> int:
+        if isinstance(value, str):
+            return len(value)
+        if isinstance(value, BaseModel):
+            return len(value.model_dump_json(exclude_none=True))
+        if isinstance(value, (list, tuple)):
+            return sum(size(v) for v in value)
+        return len(str(value))
+
+    output_tokens = DEFAULT_OUTPUT_TOKENS
+    if config is not None and config.max_output_tokens:
+        output_tokens = config.max_output_tokens
+    return size(contents) // CHARS_PER_TOKEN + output_tokens
+
+
+def is_retryable(error: BaseException) -> bool:
+    return isinstance(error, errors.APIError) and error.code in RETRYABLE_STATUS_CODES
+
+
+@dataclass
+class GeminiPool:
+    """Shared access to Gemini for every server of the process.
+
+    Requests are spread round-robin over a pool of clients, one per API key,
+    and admitted by two token buckets: one for requests per minute and one
+    for estimated tokens per minute. The quotas are those of each key, so the
+    buckets grow with the number of keys. While interactive requests wait for
+    admission, batch requests hold back. Rate-limited and failed requests are retried with
+    jittered exponential backoff, and every attempt goes through the buckets
+    again so that retries cannot exceed the quotas.
+    """
+
+    clients: List[genai.Client]
+    # The quotas of each API key.
+    requests_per_minute: float = 15.0
+    tokens_per_minute: float = 1_000_000.0
+    max_attempts: int = 5
+    base_delay: float = 2.0
+    max_delay: float = 60.0
+
+    _requests: AsyncTokenBucket = field(init=False, repr=False)
+    _tokens: AsyncTokenBucket = field(init=False, repr=False)
+    _next_client: Any = field(init=False, repr=False)
+    _interactive_waiting: int = field(default=0, init=False, repr=False)
+    _no_interactive_waiting: asyncio.Event = field(
+        default_factory=asyncio.Event, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        if not self.clients:
+            raise ValueError("The Gemini pool needs at least one client")
+        # Round-robin spreads the requests evenly, so the pool as a whole has
+        # the quotas of all its keys.
+        requests_per_minute = self.requests_per_minute * len(self.clients)
+        tokens_per_minute = self.tokens_per_minute * len(self.clients)
+        self._requests = AsyncTokenBucket(
+            rate=requests_per_minute / 60, capacity=max(1.0, requests_per_minute)
+        )
+        self._tokens = AsyncTokenBucket(
+            rate=tokens_per_minute / 60, capacity=tokens_per_minute
+        )
+        self._next_client = itertools.cycle(self.clients)
+        self._no_interactive_waiting.set()
+
+    async def _admit(self, priority: Priority, tokens: int) -> genai.Client:
+        """Wait until the request fits in the quotas and return the client to send it with."""
+        # A single request cannot use more than the quota of the key it is sent with.
+        tokens = min(tokens, int(self.tokens_per_minute))
+        if priority == Priority.INTERACTIVE:
+            self._interactive_waiting += 1
+            self._no_interactive_waiting.clear()
+            try:
+                await self._requests.acquire()
+                await self._tokens.acquire(tokens)
+            finally:
+                self._interactive_waiting -= 1
+                if not self._interactive_waiting:
+                    self._no_interactive_waiting.set()
+        else:
+            await self._acquire_batch(self._requests, 1)
+            await self._acquire_batch(self._tokens, tokens)
+        return next(self._next_client)
+
+    async def _acquire_batch(self, bucket: AsyncTokenBucket, tokens: float) -> None:
+        """Take tokens from the bucket, only while no interactive request is waiting."""
+        while True:
+            await self._no_interactive_waiting.wait()
+            delay = bucket.try_acquire(tokens)
+            if not delay:
+                return
+            await asyncio.sleep(delay)
+
+    async def generate_content(
+        self,
+        model: str,
+        contents: Any,
+        config: Optional[types.GenerateContentConfig] = None,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> types.GenerateContentResponse:
+        tokens = estimate_request_tokens(contents, config)
+
+        async def call() -> types.GenerateContentResponse:
+            client = await self._admit(priority, tokens)
+            return await client.aio.models.generate_content(
+                model=model, contents=contents, config=config
+            )
+
+        return await retry_async(
+            call,
+            retry_on=(errors.APIError,),
+            max_attempts=self.max_attempts,
+            base_delay=self.base_delay,
+            max_delay=self.max_delay,
+            retry_if=is_retryable,
+        )
+
+    async def generate_content_stream(
+        self,
+        model: str,
+        contents: Any,
+        config: Optional[types.GenerateContentConfig] = None,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> AsyncIterator[types.GenerateContentResponse]:
+        """Open a response stream. Only opening the stream is retried."""
+        tokens = estimate_request_tokens(contents, config)
+
+        async def call() -> AsyncIterator[types.GenerateContentResponse]:
+            client = await self._admit(priority, tokens)
+            return await client.aio.models.generate_content_stream(
+                model=model, contents=contents, config=config
+            )
+
+        return await retry_async(
+            call,
+            retry_on=(errors.APIError,),
+            max_attempts=self.max_attempts,
+            base_delay=self.base_delay,
+            max_delay=self.max_delay,
+            retry_if=is_retryable,
+        )
+
+    def stats(self) -> Dict[str, int]:
+        return {"clients": len(self.clients), "interactive_waiting": self._interactive_waiting}
+
+
+@dataclass
+class GeminiClient:
+    """A view of the shared pool that sends every request with one priority.
+
+    It has the `generate_content` and `generate_content_stream` methods of
+    `genai.Client.aio.models`.
+    """
+
+    pool: GeminiPool
+    priority: Priority = Priority.INTERACTIVE
+
+    def with_priority(self, priority: Priority) -> "GeminiClient":
+        return GeminiClient(self.pool, priority)
+
+    async def generate_content(
+        self,
+        model: str,
+        contents: Any,
+        config: Optional[types.GenerateContentConfig] = None,
+    ) -> types.GenerateContentResponse:
+        return await self.pool.generate_content(model, contents, config, self.priority)
+
+    async def generate_content_stream(
+        self,
+        model: str,
+        contents: Any,
+        config: Optional[types.GenerateContentConfig] = None,
+    ) -> AsyncIterator[types.GenerateContentResponse]:
+        return await self.pool.generate_content_stream(
+            model, contents, config, self.priority
+        )
+
+
+_pool: Optional[GeminiPool] = None
+
+
+def get_gemini_pool() -> GeminiPool:
+    """
+    Return the shared Gemini pool.
+
+    It uses the comma-separated API keys of `$GEMINI_API_KEYS`, or else
+    `$GEMINI_API_KEY`, and the quotas of `$GEMINI_REQUESTS_PER_MINUTE` and
+    `$GEMINI_TOKENS_PER_MINUTE`.
+    """
+    global _pool  # pylint: disable=global-statement
+    if _pool is None:
+        load_dotenv()  # load environment variables from .env
+        api_keys = [
+            key.strip()
+            for key in (os.getenv("GEMINI_API_KEYS") or os.getenv("GEMINI_API_KEY") or "").split(",")
+            if key.strip()
+        ]
+        clients = [genai.Client(api_key=key) for key in api_keys] or [
+            genai.Client()
+        ]
+        # clients = [genai.Client(vertexai=True, location="us-central1")]
+        _pool = GeminiPool(
+            clients=clients,
+            requests_per_minute=float(
+                os.getenv("GEMINI_REQUESTS_PER_MINUTE", "15")),
+            tokens_per_minute=float(
+                os.getenv("GEMINI_TOKENS_PER_MINUTE", "1000000")),
+        )
+        logger.info(f"Created a Gemini pool of {len(clients)} clients")
+    return _pool
+
+
+def get_gemini_client(priority: Priority = Priority.INTERACTIVE) -> GeminiClient:
+    """Return a client of the shared Gemini pool with the given priority."""
+    return GeminiClient(get_gemini_pool(), priority)
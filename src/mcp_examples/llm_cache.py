@@ -0,0 +1,252 @@
+# Copyright 2025 yu-iskw
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Optional
+
+from google.genai import types
+from loguru import logger
+from pydantic import BaseModel
+
+from mcp_examples.cache import SQLiteStore, TTLCache, cache_dir
+from mcp_examples.llm import GeminiClient
+
+
+def _normalize(value: Any) -> Any:
+    """Turn a request value into JSON-serializable data for the cache key."""
+    if isinstance(value, str):
+        # Requests that only differ in line endings or surrounding whitespace
+        # share a key.
+        return unicodedata.normalize("NFC", value.replace("\r\n", "\n")).strip()
+    if isinstance(value, type) and issubclass(value, BaseModel):
+        return value.model_json_schema()
+    if isinstance(value, BaseModel):
+        return _normalize(value.model_dump(exclude_none=True))
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return repr(value)
+
+
+def _parse(
+    response: types.GenerateContentResponse, config: Optional[types.GenerateContentConfig]
+) -> types.GenerateContentResponse:
+    """
+    Restore the parsed structured output of a cached response.
+
+    Raises:
+        ValueError: The text does not validate against the response schema.
+    """
+    schema = config.response_schema if config is not None else None
+    if schema is None:
+        return response
+    if not response.text:
+        raise ValueError("The response has no text to parse")
+    if isinstance(schema, type) and issubclass(schema, BaseModel):
+        response.parsed = schema.model_validate_json(response.text)
+    else:
+        json.loads(response.text)
+    return response
+
+
+def _is_complete(
+    response: types.GenerateContentResponse, config: Optional[types.GenerateContentConfig]
+) -> bool:
+    """
+    Whether the response can be cached.
+
+    It must have finished normally, not because of the token limit or a safety
+    block, and its text must validate against the response schema, if any.
+    """
+    if not response.candidates:
+        return False
+    if response.candidates[0].finish_reason != types.FinishReason.STOP:
+        return False
+    try:
+        _parse(response.model_copy(), config)
+    except ValueError:
+        return False
+    return True
+
+
+@dataclass
+class ResponseCache:
+    """A two-tier cache of Gemini responses.
+
+    Responses are keyed by a hash of the model, the normalized contents and the
+    generation config. They are kept in a bounded in-memory LRU and, when a
+    store is given, on disk so that they survive restarts. Only responses that
+    finished normally and match the response schema are cached.
+    """
+
+    ttl: float = 24 * 3600.0
+    memory: TTLCache[Dict[str, Any]] = field(
+        default_factory=lambda: TTLCache(maxsize=1024)
+    )
+    store: Optional[SQLiteStore] = None
+
+    hits: int = field(default=0, init=False)
+    disk_hits: int = field(default=0, init=False)
+    misses: int = field(default=0, init=False)
+
+    @staticmethod
+    def key(model: str, contents: Any, config: Any = None) -> str:
+        payload = json.dumps(
+            [model, _normalize(contents), _normalize(config)],
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response data, from memory or else from disk."""
+        data = self.memory.get(key)
+        if data is not None:
+            self.hits += 1
+            return data
+        if self.store is not None:
+            data = self.store.get(key)
+            if data is not None:
+                self.memory.set(key, data)
+                self.disk_hits += 1
+                return data
+        self.misses += 1
+        return None
+
+    def set(self, key: str, data: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        self.memory.set(key, data, ttl)
+        if self.store is not None:
+            self.store.set(key, data, ttl)
+
+    def evict(self, key: str) -> None:
+        self.memory.pop(key)
+        if self.store is not None:
+            self.store.delete(key)
+
+    async def generate_content(
+        self,
+        client: GeminiClient,
+        model: str,
+        contents: Any,
+        config: Optional[types.GenerateContentConfig] = None,
+        use_cache: bool = True,
+        ttl: Optional[float] = None,
+    ) -> types.GenerateContentResponse:
+        """
+        Call `generate_content`, serving and storing the response in the cache.
+
+        Args:
+            client: The client of the shared Gemini pool.
+            model: The model name.
+            contents: The contents of the request.
+            config: The generation config.
+            use_cache: Whether to use the cache for this call.
+            ttl: The lifetime of the cached response, in seconds.
+        """
+        key = self.key(model, contents, config) if use_cache else None
+        if key is not None:
+            data = self.get(key)
+            if data is not None:
+                try:
+                    response = _parse(
+                        types.GenerateContentResponse.model_validate(data), config)
+                except ValueError as e:
+                    logger.warning(
+                        f"Evicting the unparsable cached response {key[:12]}: {e}")
+                    self.evict(key)
+                else:
+                    logger.debug(f"Serving the cached response {key[:12]}")
+                    return response
+        response = await client.generate_content(
+            model=model, contents=contents, config=config
+        )
+        if key is not None and _is_complete(response, config):
+            self.set(
+                key,
+                response.model_dump(
+                    mode="json", exclude_none=True, exclude={"parsed"}),
+                ttl,
+            )
+        return response
+
+    async def generate_content_stream(
+        self,
+        client: GeminiClient,
+        model: str,
+        contents: Any,
+        config: Optional[types.GenerateContentConfig] = None,
+        use_cache: bool = True,
+        ttl: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream the text of a response, serving and storing it in the cache.
+
+        A cached response is yielded as a single piece. A streamed response is
+        only cached once it has been read to the end and finished normally.
+        """
+        key = self.key(model, contents, config) if use_cache else None
+        if key is not None:
+            data = self.get(key)
+            if data is not None:
+                logger.debug(f"Serving the cached response {key[:12]}")
+                yield types.GenerateContentResponse.model_validate(data).text or ""
+                return
+        chunks = []
+        finish_reason = None
+        async for chunk in await client.generate_content_stream(
+            model=model, contents=contents, config=config
+        ):
+            if chunk.candidates and chunk.candidates[0].finish_reason:
+                finish_reason = chunk.candidates[0].finish_reason
+            if chunk.text:
+                chunks.append(chunk.text)
+                yield chunk.text
+        if key is not None and chunks:
+            response = types.GenerateContentResponse(
+                candidates=[
+                    types.Candidate(
+                        content=types.Content(
+                            role="model", parts=[types.Part.from_text(text="".join(chunks))]
+                        ),
+                        finish_reason=finish_reason,
+                    )
+                ]
+            )
+            if _is_complete(response, config):
+                self.set(key, response.model_dump(
+                    mode="json", exclude_none=True), ttl)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the memory hit, disk hit and miss counters."""
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses}
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Return the shared response cache, persisted in the cache directory."""
+    global _response_cache  # pylint: disable=global-statement
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            store=SQLiteStore(cache_dir() / "llm.sqlite3", table="responses")
+        )
+    return _response_cache
@@ -12,36 +12,89 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import os
+import json
+from contextlib import aclosing
+from typing import List
 
 from dotenv import load_dotenv
-from google import genai
 from loguru import logger
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
+
+from mcp_examples.llm import Priority, get_gemini_client
+from mcp_examples.llm_server.translation import Translator
 
 # Initialize FastMCP server
 mcp = FastMCP("math")
 
 load_dotenv()  # load environment variables from .env
 
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+translator = Translator(client=get_gemini_client())
+# Bulk translations yield to the interactive ones.
+batch_translator = Translator(client=get_gemini_client(Priority.BATCH))
 
 
 @mcp.tool()
-async def translate(target_language: str, text: str) -> str:
+async def translate(target_language: str, text: str, use_cache: bool = True) -> str:
     """Translate the given text to the target language.
 
+    The text is translated sentence by sentence, and the sentences found in
+    the translation memory are not sent to the model.
+
     Args:
         target_language: The target language
         text: The text to translate
+        use_cache: Whether to reuse previous translations of the same sentences
     """
     logger.info(f"Translating text to {target_language}: {text}")
-    response = client.models.generate_content(
-        model="gemini-2.0-flash",
-        contents=[
-            f"Translate the following text to {target_language}: {text}"],
+    return await translator.translate_text(target_language, text, use_cache=use_cache)
+
+
+@mcp.tool()
+async def translate_batch(
+    target_language: str, segments: List[str], use_cache: bool = True
+) -> str:
+    """Translate many segments, such as the strings of a UI catalog, at once.
+
+    Returns a JSON array with the translation of every segment, in order.
+
+    Args:
+        target_language: The target language
+        segments: The segments to translate
+        use_cache: Whether to reuse previous translations of the same segments
+    """
+    translations = await batch_translator.translate_batch(
+        target_language, segments, use_cache=use_cache
     )
-    return response.text
+    return json.dumps(translations, ensure_ascii=False)
+
+
+@mcp.tool()
+async def translate_document(
+    target_language: str, text: str, ctx: Context, use_cache: bool = True
+) -> str:
+    """Translate a long document in chunks.
+
+    The chunks are translated concurrently, and each translated chunk is
+    streamed in order as an `info` log message as soon as it is ready, along
+    with a progress notification counting the chunks done.
+
+    Args:
+        target_language: The target language
+        text: The document to translate
+        use_cache: Whether to reuse previous translations of the same chunks
+    """
+    translated = []
+    async with aclosing(
+        batch_translator.iter_translate_document(
+            target_language, text, use_cache=use_cache)
+    ) as chunks:
+        async for chunk in chunks:
+            translated.append(chunk)
+            await ctx.request_context.session.send_log_message(
+                level="info", data=chunk, logger="translate.chunk"
+            )
+            await ctx.report_progress(len(translated))
+    return "".join(translated)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,312 @@
+# Copyright 2025 yu-iskw
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import re
+import textwrap
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+
+from google.genai import types
+from loguru import logger
+from pydantic import BaseModel, Field
+
+from mcp_examples.llm import GeminiClient
+from mcp_examples.llm_cache import ResponseCache, get_response_cache
+from mcp_examples.llm_server.translation_memory import (
+    TranslationMemory,
+    get_translation_memory,
+    split_sentences,
+)
+
+BATCH_PROMPT = textwrap.dedent(
+    """
+    Translate each segment of the following JSON object to {target_language}.
+    The keys are segment ids and the values are the segments. Translate every
+    segment independently, keep placeholders, markup and surrounding whitespace
+    as they are, and return one translation per id.
+    """
+)
+
+CHUNK_PROMPT = textwrap.dedent(
+    """
+    Translate the following part of a longer document to {target_language}.
+    Keep the formatting, markup and line breaks, and return only the translation.
+    """
+)
+CONTEXT_PROMPT = "For consistency, the document continues from this text, which must not be translated:"
+
+# The number of characters assumed per token.
+CHARS_PER_TOKEN = 4
+
+_PARAGRAPH_BREAK = re.compile(r"(\n\s*\n)")
+
+
+class SegmentTranslation(BaseModel):
+    """The translation of a segment."""
+
+    id: int = Field(..., description="The id of the segment")
+    translation: str = Field(..., description="The translated segment")
+
+
+class BatchTranslation(BaseModel):
+    """The translations of a pack of segments."""
+
+    translations: List[SegmentTranslation] = Field(
+        description="The translation of every segment", default_factory=list
+    )
+
+
+def pack_segments(
+    segments: Sequence[str], max_chars: int, max_segments: int
+) -> List[List[int]]:
+    """
+    Greedily group consecutive segments into packs that fit both limits.
+
+    A segment longer than `max_chars` forms a pack by itself.
+
+    Returns:
+      The indices of the segments of every pack.
+    """
+    packs: List[List[int]] = []
+    current: List[int] = []
+    current_chars = 0
+    for i, segment in enumerate(segments):
+        if current and (
+            current_chars + len(segment) > max_chars or len(current) >= max_segments
+        ):
+            packs.append(current)
+            current, current_chars = [], 0
+        current.append(i)
+        current_chars += len(segment)
+    if current:
+        packs.append(current)
+    return packs
+
+
+def split_chunks(text: str, max_chars: int) -> List[str]:
+    """
+    Split the text into chunks of at most `max_chars` characters.
+
+    Chunks end on paragraph boundaries, or on sentence boundaries for
+    paragraphs that are too long, and a sentence longer than `max_chars` is
+    cut. Joining the chunks gives the text back.
+    """
+    pieces: List[str] = []
+    for piece in _PARAGRAPH_BREAK.split(text):
+        if len(piece) <= max_chars:
+            pieces.append(piece)
+            continue
+        for sentence in split_sentences(piece):
+            pieces.extend(
+                sentence[i: i + max_chars] for i in range(0, len(sentence), max_chars)
+            )
+    chunks: List[str] = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(piece) > max_chars:
+            chunks.append(current)
+            current = ""
+        current += piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _replace_stripped(text: str, replacement: str) -> str:
+    """Replace the text but keep its leading and trailing whitespace."""
+    start = len(text) - len(text.lstrip())
+    end = len(text.rstrip())
+    return text[:start] + replacement + text[end:]
+
+
+@dataclass
+class Translator:
+    """Translates text with Gemini, many segments per request.
+
+    Segments found in the translation memory are not sent to the model, and
+    the translations of the others are added to it.
+    """
+
+    client: GeminiClient
+    model: str = "gemini-2.0-flash"
+    # The limits of a single request of a batch translation.
+    max_pack_chars: int = 8_000
+    max_pack_segments: int = 100
+    max_concurrency: int = 8
+    # The size of a chunk of a long document, and the characters of the
+    # previous chunk given as context.
+    document_chunk_tokens: int = 1_000
+    document_context_chars: int = 300
+    response_cache: ResponseCache = field(default_factory=get_response_cache)
+    memory: Optional[TranslationMemory] = field(
+        default_factory=get_translation_memory)
+
+    async def translate_text(
+        self, target_language: str, text: str, use_cache: bool = True
+    ) -> str:
+        """
+        Translate the text sentence by sentence.
+
+        The sentences are translated as a batch, so only the ones missing from
+        the translation memory reach the model, and they are stitched back
+        together with their original separators and surrounding whitespace.
+        """
+        pieces = split_sentences(text)
+        sentences = [piece.strip() for piece in pieces[::2]]
+        translations = iter(
+            await self.translate_batch(target_language, sentences, use_cache=use_cache)
+        )
+        for i in range(0, len(pieces), 2):
+            translation = next(translations)
+            if pieces[i].strip():
+                pieces[i] = _replace_stripped(pieces[i], translation)
+        return "".join(pieces)
+
+    async def iter_translate_document(
+        self, target_language: str, text: str, use_cache: bool = True
+    ) -> AsyncIterator[str]:
+        """
+        Translate a long document chunk by chunk, yielding the translated chunks in order.
+
+        The document is split into chunks of about `document_chunk_tokens`
+        tokens, which are translated concurrently. Each request also gets the
+        end of the previous chunk as context, so terms are translated
+        consistently across chunks. A chunk is yielded as soon as it and all
+        the chunks before it are translated.
+        """
+        chunks = split_chunks(
+            text, self.document_chunk_tokens * CHARS_PER_TOKEN)
+        logger.info(
+            f"Translating a document of {len(text)} characters to {target_language} "
+            f"in {len(chunks)} chunks"
+        )
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def translate_chunk(i: int) -> str:
+            chunk = chunks[i]
+            if not chunk.strip():
+                return chunk
+            contents = [CHUNK_PROMPT.format(target_language=target_language)]
+            context = chunks[i - 1][-self.document_context_chars:] if i > 0 else ""
+            if context.strip():
+                contents.extend([CONTEXT_PROMPT, context])
+            contents.append(chunk)
+            async with semaphore:
+                response = await self.response_cache.generate_content(
+                    self.client,
+                    model=self.model,
+                    contents=contents,
+                    use_cache=use_cache,
+                )
+            return _replace_stripped(chunk, (response.text or "").strip())
+
+        tasks = [asyncio.create_task(translate_chunk(i))
+                 for i in range(len(chunks))]
+        try:
+            for task in tasks:
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def translate_batch(
+        self, target_language: str, segments: Sequence[str], use_cache: bool = True
+    ) -> List[str]:
+        """
+        Translate the segments, returning the translations in the same order.
+
+        Identical segments are translated once, and blank segments are
+        returned as they are. The unique segments are packed into requests of
+        at most `max_pack_chars` characters and `max_pack_segments` segments,
+        which run concurrently.
+        """
+        unique = list(dict.fromkeys(s for s in segments if s.strip()))
+        translated: Dict[str, str] = {}
+        if self.memory is not None and use_cache:
+            # The memory runs SQLite queries and fuzzy comparisons, off the event loop.
+            translated = await asyncio.to_thread(
+                self.memory.lookup, target_language, unique)
+            unique = [segment for segment in unique if segment not in translated]
+        packs = pack_segments(
+            unique, self.max_pack_chars, self.max_pack_segments)
+        logger.info(
+            f"Translating {len(segments)} segments ({len(translated)} remembered, "
+            f"{len(unique)} new) to {target_language} in {len(packs)} requests"
+        )
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def translate_pack(pack: List[int]) -> Dict[int, str]:
+            async with semaphore:
+                return await self._translate_pack(
+                    target_language, {i: unique[i] for i in pack}, use_cache
+                )
+
+        new: Dict[str, str] = {}
+        for result in await asyncio.gather(*[translate_pack(pack) for pack in packs]):
+            for i, translation in result.items():
+                new[unique[i]] = translation
+        if self.memory is not None and new:
+            await asyncio.to_thread(self.memory.store, target_language, new)
+        translated.update(new)
+        return [translated.get(segment, segment) for segment in segments]
+
+    async def _translate_pack(
+        self, target_language: str, pack: Dict[int, str], use_cache: bool
+    ) -> Dict[int, str]:
+        response = await self.response_cache.generate_content(
+            self.client,
+            model=self.model,
+            contents=[
+                BATCH_PROMPT.format(target_language=target_language),
+                json.dumps({str(i): text for i, text in pack.items()},
+                           ensure_ascii=False),
+            ],
+            config=types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=BatchTranslation,
+            ),
+            use_cache=use_cache,
+        )
+        # Blocked or malformed output is not parsed, and then every segment
+        # of the pack counts as missing.
+        items = response.parsed.translations if response.parsed is not None else []
+        if len(items) != len(pack):
+            logger.warning(
+                f"The model returned {len(items)} translations for {len(pack)} segments")
+        # A segment translated more than once is ambiguous, so it is retried.
+        counts = Counter(item.id for item in items)
+        result = {
+            item.id: item.translation
+            for item in items
+            if item.id in pack and counts[item.id] == 1
+        }
+        missing = {i: text for i, text in pack.items() if i not in result}
+        if missing:
+            if len(pack) == 1:
+                reason = "no translation" if response.parsed is not None else "unparsable output"
+                raise RuntimeError(
+                    f"The model returned {reason} for: {next(iter(pack.values()))}")
+            # Retry the segments the model skipped in smaller packs.
+            logger.warning(
+                f"{len(missing)} of {len(pack)} segments were not translated, retrying")
+            items = list(missing.items())
+            halves = [dict(items[: len(items) // 2]),
+                      dict(items[len(items) // 2:])]
+            for half in halves:
+                if half:
+                    result.update(await self._translate_pack(target_language, half, use_cache))
+        return result
@@ -0,0 +1,190 @@
+# Copyright 2025 yu-iskw
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import difflib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from mcp_examples.cache import cache_dir
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    target_language TEXT NOT NULL,
+    segment TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    translation TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (target_language, segment)
+);
+CREATE INDEX IF NOT EXISTS segments_length ON segments (target_language, length);
+"""
+
+# Sentences end with terminal punctuation followed by whitespace, or with a
+# CJK full stop, and paragraphs with line breaks. The separators are kept.
+_SENTENCE_BREAK = re.compile(r"((?<=[.!?])\s+|(?<=[。！？])|\s*\n\s*)")
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split the text into sentences and the separators between them.
+
+    The pieces alternate between sentences (at even indices) and separators
+    (at odd indices), so joining them gives the text back.
+    """
+    return _SENTENCE_BREAK.split(text)
+
+
+def normalize_segment(segment: str) -> str:
+    """Normalize a segment so that spacing and Unicode variants share a key."""
+    return " ".join(unicodedata.normalize("NFC", segment).split())
+
+
+@dataclass
+class TranslationMemory:
+    """A persistent memory of segment translations, backed by SQLite.
+
+    Translations are keyed by target language and normalized segment. With a
+    `fuzzy_threshold`, a segment without an exact match reuses the translation
+    of the most similar stored segment whose `difflib` similarity ratio
+    reaches the threshold. Only stored segments of a similar length are
+    compared, at most `max_fuzzy_candidates` of them.
+    """
+
+    path: Path
+    fuzzy_threshold: Optional[float] = None
+    max_fuzzy_candidates: int = 200
+
+    hits: int = field(default=0, init=False)
+    fuzzy_hits: int = field(default=0, init=False)
+    misses: int = field(default=0, init=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False)
+    _conn: Optional[sqlite3.Connection] = field(
+        default=None, init=False, repr=False)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(
+                str(self.path), check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def lookup(self, target_language: str, segments: Iterable[str]) -> Dict[str, str]:
+        """Return the remembered translation of every segment that has one."""
+        result = {}
+        for segment in segments:
+            translation = self._exact(target_language, segment)
+            if translation is not None:
+                self.hits += 1
+            elif self.fuzzy_threshold is not None:
+                translation = self._fuzzy(target_language, segment)
+                if translation is not None:
+                    self.fuzzy_hits += 1
+            if translation is None:
+                self.misses += 1
+            else:
+                result[segment] = translation
+        return result
+
+    def _exact(self, target_language: str, segment: str) -> Optional[str]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT translation FROM segments WHERE target_language = ? AND segment = ?",
+                (target_language, normalize_segment(segment)),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _fuzzy(self, target_language: str, segment: str) -> Optional[str]:
+        assert self.fuzzy_threshold is not None
+        key = normalize_segment(segment)
+        # The ratio is at most 2 * min(la, lb) / (la + lb), so only segments of
+        # a close enough length can reach the threshold.
+        threshold = self.fuzzy_threshold
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT segment, translation FROM segments"
+                " WHERE target_language = ? AND length BETWEEN ? AND ?"
+                " ORDER BY ABS(length - ?) LIMIT ?",
+                (
+                    target_language,
+                    int(len(key) * threshold / (2 - threshold)),
+                    int(len(key) * (2 - threshold) / threshold) + 1,
+                    len(key),
+                    self.max_fuzzy_candidates,
+                ),
+            ).fetchall()
+        best: Tuple[float, Optional[str]] = (self.fuzzy_threshold, None)
+        matcher = difflib.SequenceMatcher(b=key, autojunk=False)
+        for candidate, translation in rows:
+            matcher.set_seq1(candidate)
+            if matcher.real_quick_ratio() < best[0] or matcher.quick_ratio() < best[0]:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= best[0]:
+                best = (ratio, translation)
+        return best[1]
+
+    def store(self, target_language: str, translations: Dict[str, str]) -> None:
+        """Remember the translation of every segment."""
+        now = time.time()
+        rows = []
+        for segment, translation in translations.items():
+            key = normalize_segment(segment)
+            rows.append((target_language, key, len(key), translation, now))
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO segments"
+                " (target_language, segment, length, translation, updated_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self.conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """Return the exact hit, fuzzy hit and miss counters."""
+        return {"hits": self.hits, "fuzzy_hits": self.fuzzy_hits, "misses": self.misses}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_translation_memory: Optional[TranslationMemory] = None
+
+
+def get_translation_memory() -> TranslationMemory:
+    """
+    Return the shared translation memory, persisted in the cache directory.
+
+    Fuzzy matching is enabled by setting `$TRANSLATION_MEMORY_FUZZY_THRESHOLD`
+    to a similarity ratio such as 0.95.
+    """
+    global _translation_memory  # pylint: disable=global-statement
+    if _translation_memory is None:
+        threshold = os.getenv("TRANSLATION_MEMORY_FUZZY_THRESHOLD")
+        _translation_memory = TranslationMemory(
+            cache_dir() / "translation_memory.sqlite3",
+            fuzzy_threshold=float(threshold) if threshold else None,
+        )
+    return _translation_memory
@@ -0,0 +1,139 @@
+# Copyright 2025 yu-iskw
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import math
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+# A number, a vector or a matrix, as sent by MCP clients.
+ArrayLike = Union[float, List[float], List[List[float]]]
+
+
+def divide(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Divide element-wise, with 0 wherever the divisor is 0, like the scalar `divide` tool."""
+    a, b = np.broadcast_arrays(a, b)
+    return np.divide(a, b, out=np.zeros(a.shape), where=b != 0)
+
+
+ELEMENTWISE: Dict[str, Callable[[np.ndarray, np.ndarray], np.ndarray]] = {
+    "add": np.add,
+    "subtract": np.subtract,
+    "multiply": np.multiply,
+    "divide": divide,
+    "power": np.power,
+    "mod": np.mod,
+    "minimum": np.minimum,
+    "maximum": np.maximum,
+}
+
+REDUCTIONS: Dict[str, Callable[..., Any]] = {
+    "sum": np.sum,
+    "mean": np.mean,
+    "min": np.min,
+    "max": np.max,
+    "median": np.median,
+    "std": np.std,
+    "var": np.var,
+    "prod": np.prod,
+    "count": lambda values, axis=None: np.count_nonzero(~np.isnan(values), axis=axis),
+}
+
+CUMULATIVE: Dict[str, Callable[..., np.ndarray]] = {
+    "sum": np.cumsum,
+    "prod": np.cumprod,
+    "min": np.minimum.accumulate,
+    "max": np.maximum.accumulate,
+}
+
+
+def as_array(values: ArrayLike) -> np.ndarray:
+    """Convert the values to a float array, rejecting ragged nesting."""
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except ValueError as e:
+        raise ValueError(
+            f"The values must be a number, a list or a rectangular list of lists: {e}"
+        ) from e
+
+
+def to_python(result: Any) -> Any:
+    """Convert a NumPy result to JSON-compatible values, with None for NaN and infinities."""
+    if isinstance(result, np.ndarray) and result.ndim:
+        return [to_python(value) for value in result]
+    value = float(result)
+    return value if math.isfinite(value) else None
+
+
+def _lookup(table: Dict[str, Any], operation: str) -> Any:
+    if operation not in table:
+        raise ValueError(
+            f"Unknown operation {operation!r}, expected one of {sorted(table)}")
+    return table[operation]
+
+
+def elementwise(operation: str, a: ArrayLike, b: ArrayLike) -> np.ndarray:
+    """Apply a binary operation element-wise, broadcasting the operands."""
+    fn = _lookup(ELEMENTWISE, operation)
+    x, y = as_array(a), as_array(b)
+    try:
+        np.broadcast_shapes(x.shape, y.shape)
+    except ValueError as e:
+        raise ValueError(
+            f"Cannot broadcast shapes {x.shape} and {y.shape}") from e
+    with np.errstate(all="ignore"):
+        return fn(x, y)
+
+
+def reduce(operation: str, values: ArrayLike, axis: Optional[int] = None) -> Any:
+    """Reduce the values, over all of them or along an axis."""
+    fn = _lookup(REDUCTIONS, operation)
+    array = as_array(values)
+    if array.size == 0 and operation not in ("sum", "prod", "count"):
+        raise ValueError(f"Cannot compute the {operation} of no values")
+    with np.errstate(all="ignore"):
+        return fn(array, axis=axis)
+
+
+def percentiles(
+    values: ArrayLike, q: Sequence[float], axis: Optional[int] = None
+) -> np.ndarray:
+    """Compute the percentiles `q`, between 0 and 100, of the values."""
+    array = as_array(values)
+    if array.size == 0:
+        raise ValueError("Cannot compute the percentiles of no values")
+    if any(not 0 <= p <= 100 for p in q):
+        raise ValueError("Percentiles must be between 0 and 100")
+    return np.percentile(array, q, axis=axis)
+
+
+def dot(a: ArrayLike, b: ArrayLike) -> Any:
+    """Compute the dot product of two vectors, or the matrix product of matrices."""
+    x, y = as_array(a), as_array(b)
+    try:
+        return np.dot(x, y)
+    except ValueError as e:
+        raise ValueError(
+            f"Cannot multiply shapes {x.shape} and {y.shape}") from e
+
+
+def cumulative(operation: str, values: ArrayLike, axis: Optional[int] = None) -> np.ndarray:
+    """Compute a running sum, product, minimum or maximum."""
+    fn = _lookup(CUMULATIVE, operation)
+    array = as_array(values)
+    if axis is None:
+        array = array.ravel()
+        axis = 0
+    with np.errstate(all="ignore"):
+        return fn(array, axis=axis)
@@ -0,0 +1,217 @@
+# Copyright 2025 yu-iskw
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import ast
+from dataclasses import dataclass
+from functools import lru_cache
+from types import CodeType
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping
+
+import numpy as np
+
+from mcp_examples.math_tools.arrays import ArrayLike, as_array, divide
+
+MAX_EXPRESSION_LENGTH = 1_000
+
+FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    "abs": np.abs,
+    "sqrt": np.sqrt,
+    "exp": np.exp,
+    "log": np.log,
+    "log2": np.log2,
+    "log10": np.log10,
+    "sin": np.sin,
+    "cos": np.cos,
+    "tan": np.tan,
+    "asin": np.arcsin,
+    "acos": np.arccos,
+    "atan": np.arctan,
+    "atan2": np.arctan2,
+    "sinh": np.sinh,
+    "cosh": np.cosh,
+    "tanh": np.tanh,
+    "hypot": np.hypot,
+    "floor": np.floor,
+    "ceil": np.ceil,
+    "round": np.round,
+    "min": np.minimum,
+    "max": np.maximum,
+    "clip": np.clip,
+    "where": np.where,
+}
+CONSTANTS: Dict[str, float] = {"pi": float(np.pi), "e": float(np.e)}
+
+# Division gives 0 wherever the divisor is 0, like the `divide` tool, and
+# powers go through NumPy so that overflows give infinity instead of failing.
+_BINARY_FUNCTIONS = {ast.Div: "_divide", ast.Pow: "_power"}
+_BINARY_OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Mod, ast.FloorDiv)
+_UNARY_OPERATORS = (ast.UAdd, ast.USub)
+_COMPARISONS = (ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq)
+
+
+class _Validator(ast.NodeTransformer):
+    """Reject everything but arithmetic on numbers, variables and known functions."""
+
+    def __init__(self) -> None:
+        self.variables: set = set()
+
+    def generic_visit(self, node: ast.AST) -> ast.AST:
+        raise ValueError(
+            f"Unsupported syntax in expression: {type(node).__name__}")
+
+    def visit_Expression(self, node: ast.Expression) -> ast.AST:
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_Constant(self, node: ast.Constant) -> ast.AST:
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ValueError(f"Unsupported constant: {node.value!r}")
+        return ast.copy_location(ast.Constant(float(node.value)), node)
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id.startswith("_") or node.id in FUNCTIONS:
+            raise ValueError(f"Invalid variable name: {node.id}")
+        if node.id not in CONSTANTS:
+            self.variables.add(node.id)
+        return node
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.AST:
+        if not isinstance(node.op, _UNARY_OPERATORS):
+            raise ValueError(
+                f"Unsupported operator: {type(node.op).__name__}")
+        node.operand = self.visit(node.operand)
+        return node
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        left, right = self.visit(node.left), self.visit(node.right)
+        function = _BINARY_FUNCTIONS.get(type(node.op))
+        if function is not None:
+            call = ast.Call(ast.Name(function, ast.Load()), [left, right], [])
+            return ast.copy_location(call, node)
+        if not isinstance(node.op, _BINARY_OPERATORS):
+            raise ValueError(
+                f"Unsupported operator: {type(node.op).__name__}")
+        node.left, node.right = left, right
+        return node
+
+    def visit_Compare(self, node: ast.Compare) -> ast.AST:
+        if len(node.ops) != 1 or not isinstance(node.ops[0], _COMPARISONS):
+            raise ValueError("Only single comparisons such as `x < 1` are supported")
+        node.left = self.visit(node.left)
+        node.comparators = [self.visit(node.comparators[0])]
+        return node
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+            raise ValueError(
+                f"Unknown function, expected one of {sorted(FUNCTIONS)}")
+        if node.keywords:
+            raise ValueError("Functions only take positional arguments")
+        node.args = [self.visit(arg) for arg in node.args]
+        return node
+
+
+@dataclass(frozen=True)
+class CompiledExpression:
+    """A validated expression, compiled once and evaluated over many bindings."""
+
+    expression: str
+    variables: FrozenSet[str]
+    code: CodeType
+
+    def evaluate(self, bindings: Mapping[str, ArrayLike]) -> np.ndarray:
+        """
+        Evaluate the expression with NumPy.
+
+        Every variable is bound to a number or to a column of values, and the
+        columns are broadcast together, so one call evaluates every row.
+        """
+        missing = self.variables - set(bindings)
+        if missing:
+            raise ValueError(f"Missing variables: {sorted(missing)}")
+        namespace: Dict[str, Any] = {
+            **FUNCTIONS,
+            **CONSTANTS,
+            "_divide": divide,
+            "_power": np.power,
+        }
+        values = {name: as_array(bindings[name]) for name in self.variables}
+        try:
+            np.broadcast_shapes(*(value.shape for value in values.values()))
+        except ValueError as e:
+            raise ValueError(
+                "The variables must be numbers or columns of the same length") from e
+        namespace.update(values)
+        with np.errstate(all="ignore"):
+            try:
+                # The code only contains the validated arithmetic, and runs
+                # without builtins.
+                # trunk-ignore(bandit/B307)
+                result = eval(self.code, {"__builtins__": {}}, namespace)
+            except TypeError as e:
+                raise ValueError(f"Invalid function call: {e}") from e
+        return np.asarray(result, dtype=np.float64)
+
+
+def normalize_expression(expression: str) -> str:
+    """Parse the expression and return it in a canonical spelling."""
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ValueError(
+            f"The expression is longer than {MAX_EXPRESSION_LENGTH} characters")
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression: {e.msg}") from e
+    return ast.unparse(tree)
+
+
+@lru_cache(maxsize=1024)
+def _compile_normalized(expression: str) -> CompiledExpression:
+    validator = _Validator()
+    tree = ast.fix_missing_locations(
+        validator.visit(ast.parse(expression, mode="eval")))
+    return CompiledExpression(
+        expression=expression,
+        variables=frozenset(validator.variables),
+        code=compile(tree, "<expression>", "eval"),
+    )
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(expression: str) -> CompiledExpression:
+    """
+    Validate and compile an arithmetic expression.
+
+    Expressions support numbers, variables, `+ - * / // % **`, single
+    comparisons, the constants `pi` and `e`, and the functions of `FUNCTIONS`.
+    Compiled expressions are cached by their normalized spelling, so
+    `x*2` and `x * 2` share one plan.
+
+    Raises:
+        ValueError: The expression is invalid or uses unsupported syntax.
+    """
+    return _compile_normalized(normalize_expression(expression))
+
+
+def rows_to_columns(rows: List[Mapping[str, float]]) -> Dict[str, List[float]]:
+    """Turn a list of variable bindings into one column per variable."""
+    names = set().union(*(row.keys() for row in rows)) if rows else set()
+    columns: Dict[str, List[float]] = {name: [] for name in names}
+    for i, row in enumerate(rows):
+        if row.keys() != names:
+            raise ValueError(
+                f"Row {i} does not bind the same variables as the others")
+        for name in names:
+            columns[name].append(row[name])
+    return columns
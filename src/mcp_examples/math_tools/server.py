@@ -12,8 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import json
+from typing import Dict, List, Optional
+
 from mcp.server.fastmcp import FastMCP
 
+from mcp_examples.math_tools import arrays, stats
+from mcp_examples.math_tools.arrays import ArrayLike
+from mcp_examples.math_tools.expression import compile_expression, rows_to_columns
+
 # Initialize FastMCP server
 mcp = FastMCP("math")
 
@@ -64,6 +72,147 @@ async def divide(a: float, b: float) -> float:
     return a / b
 
 
+@mcp.tool()
+async def elementwise(operation: str, a: ArrayLike, b: ArrayLike) -> str:
+    """Apply an arithmetic operation element-wise to numbers, lists or matrices.
+
+    The operands are broadcast like NumPy arrays, so a number applies to every
+    element and a row applies to every row of a matrix. Dividing by zero gives 0.
+    Returns the result as JSON, with null for undefined values.
+
+    Args:
+        operation: One of add, subtract, multiply, divide, power, mod, minimum, maximum
+        a: The first operand
+        b: The second operand
+    """
+    return json.dumps(arrays.to_python(arrays.elementwise(operation, a, b)))
+
+
+@mcp.tool()
+async def reduce(operation: str, values: ArrayLike, axis: Optional[int] = None) -> str:
+    """Reduce a list or matrix of numbers to a single number, or to one per row or column.
+
+    Returns the result as JSON, with null for undefined values.
+
+    Args:
+        operation: One of sum, mean, min, max, median, std, var, prod, count
+        values: The numbers
+        axis: Reduce along this axis of a matrix (0 for columns, 1 for rows) instead of over all the numbers
+    """
+    return json.dumps(arrays.to_python(arrays.reduce(operation, values, axis)))
+
+
+@mcp.tool()
+async def percentiles(
+    values: ArrayLike, q: List[float], axis: Optional[int] = None
+) -> str:
+    """Compute percentiles of a list or matrix of numbers.
+
+    Returns one result per percentile as JSON.
+
+    Args:
+        values: The numbers
+        q: The percentiles to compute, between 0 and 100
+        axis: Compute along this axis of a matrix instead of over all the numbers
+    """
+    return json.dumps(arrays.to_python(arrays.percentiles(values, q, axis)))
+
+
+@mcp.tool()
+async def dot(a: ArrayLike, b: ArrayLike) -> str:
+    """Compute the dot product of two vectors, or the product of two matrices.
+
+    Returns the result as JSON.
+
+    Args:
+        a: The first vector or matrix
+        b: The second vector or matrix
+    """
+    return json.dumps(arrays.to_python(arrays.dot(a, b)))
+
+
+@mcp.tool()
+async def cumulative(operation: str, values: ArrayLike, axis: Optional[int] = None) -> str:
+    """Compute the running sum, product, minimum or maximum of a list or matrix of numbers.
+
+    Returns the result as JSON.
+
+    Args:
+        operation: One of sum, prod, min, max
+        values: The numbers
+        axis: Accumulate along this axis of a matrix instead of over the flattened numbers
+    """
+    return json.dumps(arrays.to_python(arrays.cumulative(operation, values, axis)))
+
+
+@mcp.tool()
+async def evaluate(
+    expression: str,
+    variables: Optional[Dict[str, ArrayLike]] = None,
+    rows: Optional[List[Dict[str, float]]] = None,
+) -> str:
+    """Evaluate an arithmetic expression, once or over many rows of variables.
+
+    Expressions use numbers, variables, + - * / // % **, single comparisons
+    such as `x > 0`, the constants pi and e, and the functions abs, sqrt, exp,
+    log, log2, log10, sin, cos, tan, asin, acos, atan, atan2, sinh, cosh,
+    tanh, hypot, floor, ceil, round, min, max, clip and where. Dividing by
+    zero gives 0. Returns the result as JSON, with one value per row.
+
+    Args:
+        expression: The expression, such as `price * quantity * (1 - discount)`
+        variables: The value of every variable, either a number or a list with one value per row
+        rows: Alternatively, the variables of every row
+    """
+    bindings: Dict[str, ArrayLike] = dict(variables or {})
+    if rows:
+        bindings.update(rows_to_columns(rows))
+    result = compile_expression(expression).evaluate(bindings)
+    return json.dumps(arrays.to_python(result))
+
+
+@mcp.tool()
+async def describe_file(
+    source: str,
+    file_format: str = "csv",
+    column: str = "0",
+    delimiter: str = ",",
+    has_header: bool = True,
+    dtype: str = "float64",
+    quantiles: Optional[List[float]] = None,
+    bins: int = 10,
+) -> str:
+    """Compute statistics of a column of numbers in a large local file, in a single pass.
+
+    The file is streamed in chunks (CSV) or memory-mapped (raw binary), so
+    memory use does not grow with its size. Returns JSON with the count,
+    mean, variance, standard deviation, min, max, approximate quantiles, an
+    approximate histogram and the throughput in rows per second. Empty,
+    non-numeric and infinite values are counted as skipped.
+
+    Args:
+        source: The path or file:// URI of the file
+        file_format: csv, or binary for a raw array of numbers
+        column: The name or the index of the CSV column
+        delimiter: The CSV delimiter
+        has_header: Whether the first CSV row is a header
+        dtype: The NumPy type of the numbers of a binary file, such as float32 or int64
+        quantiles: The quantiles to estimate, between 0 and 1
+        bins: The number of histogram bins
+    """
+    path = stats.resolve_path(source)
+    if file_format == "csv":
+        chunks = stats.iter_csv_column(path, column, delimiter, has_header)
+    elif file_format == "binary":
+        chunks = stats.iter_binary(path, dtype)
+    else:
+        raise ValueError(f"Unknown file format: {file_format}")
+    result = await asyncio.to_thread(
+        stats.describe, chunks, quantiles or stats.DEFAULT_QUANTILES, bins
+    )
+    return json.dumps(result)
+
+
 if __name__ == "__main__":
     # Initialize and run the server
     mcp.run(transport="stdio")
@@ -0,0 +1,238 @@
+# Copyright 2025 yu-iskw
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import csv
+import itertools
+import math
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from urllib.parse import unquote, urlparse
+
+import numpy as np
+
+DEFAULT_QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+# The number of values read and processed at once.
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class KLLSketch:
+    """A KLL quantile sketch.
+
+    It keeps a bounded number of items in levels of compactors, where an item
+    at level h stands for 2**h values. A level over its capacity is sorted
+    and every other item, from a random offset, is promoted to the next
+    level. Quantiles are accurate to about 1/k in rank.
+    """
+
+    k: int = 200
+    c: float = 2 / 3
+    seed: Optional[int] = None
+
+    count: int = field(default=0, init=False)
+    _levels: List[np.ndarray] = field(
+        default_factory=lambda: [np.empty(0)], init=False, repr=False)
+    _rng: np.random.Generator = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._rng = np.random.default_rng(self.seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return max(2, int(math.ceil(self.k * self.c**depth)))
+
+    def update(self, values: np.ndarray) -> None:
+        """Add a batch of values."""
+        self.count += len(values)
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self._levels):
+                    self._levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item out stays at this level.
+                keep = items[len(items) - len(items) % 2:]
+                items = items[: len(items) - len(items) % 2]
+                offset = self._rng.integers(2)
+                self._levels[level + 1] = np.concatenate(
+                    [self._levels[level + 1], items[offset::2]])
+                self._levels[level] = keep
+            level += 1
+
+    def weighted_items(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the sorted items and the number of values each stands for."""
+        items = np.concatenate(self._levels)
+        weights = np.concatenate(
+            [np.full(len(level), 2.0**h) for h, level in enumerate(self._levels)]
+        )
+        order = np.argsort(items, kind="stable")
+        return items[order], weights[order]
+
+    def quantiles(self, q: Sequence[float]) -> np.ndarray:
+        """Return the approximate quantiles `q`, between 0 and 1."""
+        items, weights = self.weighted_items()
+        if not len(items):
+            return np.full(len(q), np.nan)
+        ranks = np.cumsum(weights)
+        positions = np.searchsorted(
+            ranks, np.asarray(q) * ranks[-1], side="left")
+        return items[np.minimum(positions, len(items) - 1)]
+
+    def num_items(self) -> int:
+        return sum(len(items) for items in self._levels)
+
+
+@dataclass
+class StreamingStats:
+    """Single-pass statistics over batches of values, in bounded memory.
+
+    The mean and variance follow Welford's method, with every batch merged
+    into the running totals with the parallel form of the update. Quantiles
+    and histograms come from a KLL sketch.
+    """
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    min: float = math.inf
+    max: float = -math.inf
+    skipped: int = 0
+    sketch: KLLSketch = field(default_factory=KLLSketch)
+
+    def update(self, values: np.ndarray) -> None:
+        """Add a batch of values, skipping the NaNs and infinities."""
+        finite = values[np.isfinite(values)]
+        self.skipped += len(values) - len(finite)
+        n = len(finite)
+        if not n:
+            return
+        batch_mean = float(finite.mean())
+        batch_m2 = float(((finite - batch_mean) ** 2).sum())
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += batch_m2 + delta**2 * self.count * n / total
+        self.count = total
+        self.min = min(self.min, float(finite.min()))
+        self.max = max(self.max, float(finite.max()))
+        self.sketch.update(finite)
+
+    @property
+    def variance(self) -> float:
+        """The sample variance."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def histogram(self, bins: int) -> Dict[str, List[float]]:
+        """Return an approximate histogram between the minimum and the maximum."""
+        if not self.count:
+            return {"edges": [], "counts": []}
+        items, weights = self.sketch.weighted_items()
+        counts, edges = np.histogram(
+            items, bins=bins, range=(self.min, self.max), weights=weights)
+        # The sketch weights add up to the number of values only approximately.
+        counts = np.round(counts * self.count / weights.sum())
+        return {"edges": edges.tolist(), "counts": counts.tolist()}
+
+
+def resolve_path(source: str) -> Path:
+    """Resolve a local path or a `file://` URI."""
+    if source.startswith("file://"):
+        return Path(unquote(urlparse(source).path))
+    return Path(source).expanduser()
+
+
+def _to_floats(texts: List[str]) -> np.ndarray:
+    try:
+        return np.asarray(texts, dtype=np.float64)
+    except ValueError:
+        # Empty and non-numeric cells become NaN, and are counted as skipped.
+        values = np.empty(len(texts))
+        for i, text in enumerate(texts):
+            try:
+                values[i] = float(text)
+            except ValueError:
+                values[i] = np.nan
+        return values
+
+
+def iter_csv_column(
+    path: Path,
+    column: Union[int, str] = 0,
+    delimiter: str = ",",
+    has_header: bool = True,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[np.ndarray]:
+    """Read a column of a CSV file in chunks of values."""
+    with path.open(newline="", encoding="utf-8") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, None) if has_header else None
+        if isinstance(column, str) and not column.isdigit():
+            if header is None or column not in header:
+                raise ValueError(f"Unknown column: {column}")
+            index = header.index(column)
+        else:
+            index = int(column)
+        while True:
+            rows = list(itertools.islice(reader, chunk_size))
+            if not rows:
+                return
+            yield _to_floats([row[index] if index < len(row) else "" for row in rows])
+
+
+def iter_binary(
+    path: Path, dtype: str = "float64", chunk_size: int = CHUNK_SIZE
+) -> Iterator[np.ndarray]:
+    """Read a raw binary array through a memory map, in chunks of values."""
+    if path.stat().st_size == 0:
+        return
+    values = np.memmap(path, dtype=np.dtype(dtype), mode="r")
+    for start in range(0, len(values), chunk_size):
+        yield np.asarray(values[start: start + chunk_size], dtype=np.float64)
+
+
+def describe(
+    chunks: Iterator[np.ndarray],
+    quantiles: Sequence[float] = DEFAULT_QUANTILES,
+    bins: int = 10,
+) -> Dict[str, Any]:
+    """Compute the statistics of a stream of chunks of values in a single pass."""
+    if any(not 0 <= q <= 1 for q in quantiles):
+        raise ValueError("Quantiles must be between 0 and 1")
+    start = time.perf_counter()
+    stats = StreamingStats()
+    for chunk in chunks:
+        stats.update(chunk)
+    elapsed = time.perf_counter() - start
+    rows = stats.count + stats.skipped
+    return {
+        "count": stats.count,
+        "skipped": stats.skipped,
+        "mean": stats.mean if stats.count else None,
+        "variance": stats.variance,
+        "std": math.sqrt(stats.variance),
+        "min": stats.min if stats.count else None,
+        "max": stats.max if stats.count else None,
+        "quantiles": {
+            str(q): (float(value) if stats.count else None)
+            for q, value in zip(quantiles, stats.sketch.quantiles(quantiles), strict=True)
+        },
+        "histogram": stats.histogram(bins),
+        "rows": rows,
+        "seconds": elapsed,
+        "rows_per_second": rows / elapsed if elapsed > 0 else None,
+    }
@@ -0,0 +1,261 @@
+# Copyright 2025 yu-iskw
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+import httpx
+from loguru import logger
+
+# The response headers kept with a cached page.
+STORED_HEADERS = ("content-type", "etag", "last-modified")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bodies (
+    content_hash TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    headers TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access);
+CREATE INDEX IF NOT EXISTS pages_content_hash ON pages (content_hash);
+"""
+
+
+@dataclass
+class CachedPage:
+    """A page read from the cache."""
+
+    url: str
+    body: bytes
+    headers: Dict[str, str]
+    stored_at: float
+    expires_at: float
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        """Whether the page can be served without revalidation."""
+        return (now or time.time()) < self.expires_at
+
+    def validators(self) -> Dict[str, str]:
+        """The conditional request headers to revalidate the page."""
+        headers = {}
+        if "etag" in self.headers:
+            headers["If-None-Match"] = self.headers["etag"]
+        if "last-modified" in self.headers:
+            headers["If-Modified-Since"] = self.headers["last-modified"]
+        return headers
+
+    def to_response(self, max_bytes: Optional[int] = None) -> httpx.Response:
+        """Rebuild an HTTP response from the cached page."""
+        return httpx.Response(
+            200,
+            headers=self.headers,
+            content=self.body if max_bytes is None else self.body[:max_bytes],
+            request=httpx.Request("GET", self.url),
+        )
+
+
+def freshness_lifetime(headers: httpx.Headers, heuristic_ttl: float) -> Optional[float]:
+    """
+    Compute how long a response stays fresh from its caching headers.
+
+    Returns:
+      The lifetime in seconds, or None if the response must not be stored.
+    """
+    directives = {}
+    for directive in headers.get("cache-control", "").split(","):
+        name, _, value = directive.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"')
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0.0
+    age = float(headers.get("age", "0") or 0)
+    if "max-age" in directives:
+        try:
+            return max(0.0, float(directives["max-age"]) - age)
+        except ValueError:
+            return 0.0
+    if "expires" in headers:
+        try:
+            expires = parsedate_to_datetime(headers["expires"]).timestamp()
+            return max(0.0, expires - time.time())
+        except (TypeError, ValueError):
+            return 0.0
+    return heuristic_ttl
+
+
+@dataclass
+class PageCache:
+    """A persistent, content-addressed cache of fetched pages.
+
+    Pages are stored in SQLite keyed by URL, and their bodies are stored once
+    per SHA-256 content hash, so mirrors of the same content share storage.
+    Freshness follows Cache-Control and Expires; stale pages are revalidated
+    with their ETag and Last-Modified validators. The least recently used pages
+    are evicted once the bodies exceed `max_bytes`.
+    """
+
+    path: Path
+    max_bytes: int = 256 * 1024 * 1024
+    # The freshness lifetime of responses without explicit caching headers.
+    heuristic_ttl: float = 3600.0
+
+    hits: int = field(default=0, init=False)
+    misses: int = field(default=0, init=False)
+    revalidations: int = field(default=0, init=False)
+    evictions: int = field(default=0, init=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False)
+    _conn: Optional[sqlite3.Connection] = field(
+        default=None, init=False, repr=False)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(
+                str(self.path), check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def lookup(self, url: str) -> Optional[CachedPage]:
+        """Return the cached page of the URL, fresh or stale, or None."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT pages.headers, pages.stored_at, pages.expires_at, bodies.body"
+                " FROM pages JOIN bodies USING (content_hash) WHERE pages.url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.conn.execute(
+                "UPDATE pages SET last_access = ? WHERE url = ?", (time.time(), url)
+            )
+            self.conn.commit()
+        headers, stored_at, expires_at, body = row
+        page = CachedPage(url, body, json.loads(headers), stored_at, expires_at)
+        if page.is_fresh():
+            self.hits += 1
+        else:
+            self.misses += 1
+        return page
+
+    def store(self, url: str, response: httpx.Response) -> None:
+        """Store a successful response, unless its headers forbid it."""
+        lifetime = freshness_lifetime(response.headers, self.heuristic_ttl)
+        if lifetime is None:
+            return
+        body = response.content
+        content_hash = hashlib.sha256(body).hexdigest()
+        headers = {
+            name: response.headers[name]
+            for name in STORED_HEADERS
+            if name in response.headers
+        }
+        now = time.time()
+        with self._lock:
+            previous = self.conn.execute(
+                "SELECT content_hash FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            self.conn.execute(
+                "INSERT OR IGNORE INTO bodies (content_hash, body, size) VALUES (?, ?, ?)",
+                (content_hash, body, len(body)),
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages"
+                " (url, content_hash, headers, stored_at, expires_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (url, content_hash, json.dumps(headers), now, now + lifetime, now),
+            )
+            if previous is not None and previous[0] != content_hash:
+                self._delete_orphan(previous[0])
+            self._evict()
+            self.conn.commit()
+
+    def refresh(self, page: CachedPage, response: httpx.Response) -> CachedPage:
+        """Extend the lifetime of a page after a `304 Not Modified` response."""
+        lifetime = freshness_lifetime(response.headers, self.heuristic_ttl) or 0.0
+        for name in ("etag", "last-modified"):
+            if name in response.headers:
+                page.headers[name] = response.headers[name]
+        page.expires_at = time.time() + lifetime
+        with self._lock:
+            self.conn.execute(
+                "UPDATE pages SET headers = ?, expires_at = ? WHERE url = ?",
+                (json.dumps(page.headers), page.expires_at, page.url),
+            )
+            self.conn.commit()
+        self.revalidations += 1
+        return page
+
+    def _evict(self) -> None:
+        """Evict the least recently used pages until the bodies fit in `max_bytes`."""
+        (total,) = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM bodies").fetchone()
+        while total > self.max_bytes:
+            row = self.conn.execute(
+                "SELECT url, content_hash FROM pages ORDER BY last_access LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            url, content_hash = row
+            self.conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            self.evictions += 1
+            total -= self._delete_orphan(content_hash)
+            logger.debug(f"Evicted {url} from the page cache")
+
+    def _delete_orphan(self, content_hash: str) -> int:
+        """Delete a body no page refers to anymore, and return the bytes freed."""
+        (shared,) = self.conn.execute(
+            "SELECT COUNT(*) FROM pages WHERE content_hash = ?", (content_hash,)
+        ).fetchone()
+        if shared:
+            return 0
+        row = self.conn.execute(
+            "SELECT size FROM bodies WHERE content_hash = ?", (content_hash,)
+        ).fetchone()
+        self.conn.execute(
+            "DELETE FROM bodies WHERE content_hash = ?", (content_hash,))
+        return row[0] if row else 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return the hit, miss, revalidation and eviction counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "evictions": self.evictions,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
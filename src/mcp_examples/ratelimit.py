@@ -0,0 +1,119 @@
+# Copyright 2025 yu-iskw
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional, Tuple, Type, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+
+@dataclass
+class AsyncTokenBucket:
+    """A token-bucket rate limiter for coroutines.
+
+    The bucket holds up to `capacity` tokens and refills at `rate` tokens per
+    second. Waiters are served in FIFO order.
+    """
+
+    rate: float
+    capacity: float
+
+    _tokens: float = field(init=False, repr=False)
+    _updated: float = field(init=False, repr=False)
+    _lock: asyncio.Lock = field(
+        default_factory=asyncio.Lock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take `tokens` tokens if they are available without waiting.
+
+        Returns:
+          0 when the tokens were taken, or else the seconds until they are available.
+        """
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return 0.0
+        return (tokens - self._tokens) / self.rate
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Wait until `tokens` tokens are available and take them."""
+        if tokens > self.capacity:
+            raise ValueError(
+                f"Cannot acquire {tokens} tokens from a bucket of {self.capacity}"
+            )
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Return a jittered exponential backoff delay for the given attempt (from 1)."""
+    delay = min(max_delay, base_delay * 2 ** (attempt - 1))
+    # trunk-ignore(bandit/B311)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+async def retry_async(
+    fn: Callable[[], Awaitable[T]],
+    retry_on: Tuple[Type[BaseException], ...],
+    max_attempts: int = 4,
+    base_delay: float = 1.0,
+    max_delay: float = 30.0,
+    retry_if: Optional[Callable[[BaseException], bool]] = None,
+) -> T:
+    """
+    Call `fn`, retrying with jittered exponential backoff on the given exceptions.
+
+    Args:
+        fn: The coroutine function to call.
+        retry_on: The exceptions that trigger a retry.
+        max_attempts: The maximum number of calls, including the first one.
+        base_delay: The delay before the first retry, in seconds.
+        max_delay: The maximum delay between two calls, in seconds.
+        retry_if: An optional predicate that narrows down which of these
+            exceptions trigger a retry.
+    """
+    attempt = 1
+    while True:
+        try:
+            return await fn()
+        except retry_on as e:
+            if attempt >= max_attempts or (retry_if is not None and not retry_if(e)):
+                raise
+            delay = backoff_delay(attempt, base_delay, max_delay)
+            logger.warning(
+                f"Attempt {attempt} failed: {e}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            attempt += 1
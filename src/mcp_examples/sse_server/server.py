@@ -1,9 +1,10 @@
 import anyio
 import click
-import httpx
 import mcp.types as types
 from mcp.server.lowlevel import Server
 
+from mcp_examples.fetcher import get_fetcher
+
 
 async def fetch_website(
     url: str,
@@ -11,10 +12,8 @@ async def fetch_website(
     headers = {
         "User-Agent": "MCP Test Server (github.com/modelcontextprotocol/python-sdk)"
     }
-    async with httpx.AsyncClient(follow_redirects=True, headers=headers) as client:
-        response = await client.get(url)
-        response.raise_for_status()
-        return [types.TextContent(type="text", text=response.text)]
+    response = await get_fetcher().get(url, headers=headers)
+    return [types.TextContent(type="text", text=response.text)]
 
 
 @click.command()
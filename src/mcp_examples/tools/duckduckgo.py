@@ -12,11 +12,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import List, Optional
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Iterable, List, Optional, Set
 
 from duckduckgo_search import DDGS
+from duckduckgo_search.exceptions import RatelimitException, TimeoutException
+from loguru import logger
 from pydantic import BaseModel, Field
 
+from mcp_examples.cache import SingleFlight, SQLiteStore, TTLCache, cache_dir
+from mcp_examples.ratelimit import AsyncTokenBucket, retry_async
+from mcp_examples.utils import normalize_url
+
 
 class DuckDuckGoSearchResult(BaseModel):
     title: str = Field(..., description="The title of the search result")
@@ -24,40 +33,267 @@ class DuckDuckGoSearchResult(BaseModel):
     body: str = Field(..., description="The snippet of the search result")
 
 
+@dataclass
+class SearchCache:
+    """A cache of search results keyed on (query, region, max_results).
+
+    Results live in a bounded in-memory LRU for `ttl` seconds and, when a
+    `store` is given, in a persistent store shared across processes.
+    Concurrent misses for the same key are coalesced into one upstream call.
+    """
+
+    ttl: float = 6 * 3600
+    memory: TTLCache = field(default_factory=lambda: TTLCache(maxsize=1024))
+    store: Optional[SQLiteStore] = None
+    _flight: SingleFlight = field(
+        default_factory=SingleFlight, init=False, repr=False)
+
+    @staticmethod
+    def key(query: str, region: Optional[str], max_results: int) -> str:
+        return json.dumps([query, region, max_results])
+
+    def get(self, key: str) -> Optional[List[DuckDuckGoSearchResult]]:
+        results = self.memory.get(key)
+        if results is None and self.store is not None:
+            stored = self.store.get(key)
+            if stored is not None:
+                results = [
+                    DuckDuckGoSearchResult.model_validate(result) for result in stored
+                ]
+                self.memory.set(key, results, self.ttl)
+        return None if results is None else list(results)
+
+    def set(self, key: str, results: List[DuckDuckGoSearchResult]) -> None:
+        self.memory.set(key, list(results), self.ttl)
+        if self.store is not None:
+            self.store.set(
+                key, [result.model_dump() for result in results], self.ttl)
+
+    def fetch(
+        self, key: str, fn: Callable[[], List[DuckDuckGoSearchResult]]
+    ) -> List[DuckDuckGoSearchResult]:
+        """Return the cached results, or call `fn` once for all concurrent callers."""
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        def load() -> List[DuckDuckGoSearchResult]:
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+            results = fn()
+            self.set(key, results)
+            return results
+
+        return list(self._flight.do(key, load))
+
+    async def afetch(
+        self, key: str, fn: Callable[[], Awaitable[List[DuckDuckGoSearchResult]]]
+    ) -> List[DuckDuckGoSearchResult]:
+        """The async version of `fetch`."""
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        async def load() -> List[DuckDuckGoSearchResult]:
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+            results = await fn()
+            self.set(key, results)
+            return results
+
+        return list(await self._flight.ado(key, load))
+
+
+_search_cache: Optional[SearchCache] = None
+
+
+def get_search_cache() -> SearchCache:
+    """Return the process-wide search cache, backed by a persistent store."""
+    global _search_cache  # pylint: disable=global-statement
+    if _search_cache is None:
+        _search_cache = SearchCache(
+            store=SQLiteStore(cache_dir() / "search.sqlite3"))
+    return _search_cache
+
+
+def _text(
+    query: str, max_results: int, region: Optional[str]
+) -> List[DuckDuckGoSearchResult]:
+    extra_params = {}
+    if region:
+        extra_params["region"] = region
+    results = DDGS().text(query, max_results=max_results, **extra_params)
+    return [DuckDuckGoSearchResult.model_validate(result) for result in results]
+
+
+@dataclass
+class DuckDuckGoClient:
+    """A non-blocking DuckDuckGo search client.
+
+    `duckduckgo_search` only offers a blocking client, so each upstream call
+    runs in a worker thread. Calls are limited by a token bucket and by
+    `max_concurrency`, and are retried with jittered exponential backoff when
+    DuckDuckGo rate-limits or times out.
+    """
+
+    requests_per_second: float = 1.0
+    burst: int = 3
+    max_concurrency: int = 4
+    max_attempts: int = 4
+    base_delay: float = 2.0
+    max_delay: float = 30.0
+    cache: Optional[SearchCache] = None
+
+    _rate_limiter: AsyncTokenBucket = field(init=False, repr=False)
+    _semaphore: asyncio.Semaphore = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._rate_limiter = AsyncTokenBucket(
+            rate=self.requests_per_second, capacity=self.burst
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def _search_once(
+        self, query: str, max_results: int, region: Optional[str]
+    ) -> List[DuckDuckGoSearchResult]:
+        async with self._semaphore:
+            await self._rate_limiter.acquire()
+            return await asyncio.to_thread(_text, query, max_results, region)
+
+    async def search(
+        self,
+        query: str,
+        max_results: int = 10,
+        region: Optional[str] = None,
+        use_cache: bool = True,
+    ) -> List[DuckDuckGoSearchResult]:
+        """Search the web for the given query."""
+
+        async def fetch() -> List[DuckDuckGoSearchResult]:
+            return await retry_async(
+                lambda: self._search_once(query, max_results, region),
+                retry_on=(RatelimitException, TimeoutException),
+                max_attempts=self.max_attempts,
+                base_delay=self.base_delay,
+                max_delay=self.max_delay,
+            )
+
+        if not use_cache or self.cache is None:
+            return await fetch()
+        key = SearchCache.key(query, region, max_results)
+        return await self.cache.afetch(key, fetch)
+
+    async def iter_search_many(
+        self,
+        queries: Iterable[str],
+        max_results: int = 10,
+        region: Optional[str] = None,
+    ) -> AsyncIterator[DuckDuckGoSearchResult]:
+        """
+        Search all the queries concurrently and yield results as each query completes.
+
+        Results are deduplicated across queries by normalized URL. A query that
+        still fails after its retries is logged and skipped.
+        """
+        tasks = [
+            asyncio.create_task(self.search(query, max_results, region))
+            for query in dict.fromkeys(queries)
+        ]
+        seen_urls: Set[str] = set()
+        try:
+            for next_search in asyncio.as_completed(tasks):
+                try:
+                    results = await next_search
+                # A network or timeout error of one query must not lose the
+                # results of the others.
+                # pylint: disable=broad-exception-caught
+                except Exception as e:
+                    logger.error(f"Failed to search: {type(e).__name__}: {e}")
+                    continue
+                for result in results:
+                    url = normalize_url(result.href)
+                    if url not in seen_urls:
+                        seen_urls.add(url)
+                        yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def search_many(
+        self,
+        queries: Iterable[str],
+        max_results: int = 10,
+        region: Optional[str] = None,
+    ) -> List[DuckDuckGoSearchResult]:
+        """Search all the queries concurrently and return the merged, deduplicated results."""
+        return [
+            result
+            async for result in self.iter_search_many(queries, max_results, region)
+        ]
+
+
+_client: Optional[DuckDuckGoClient] = None
+
+
+def get_client() -> DuckDuckGoClient:
+    """Return the process-wide search client, which uses the shared search cache."""
+    global _client  # pylint: disable=global-statement
+    if _client is None:
+        _client = DuckDuckGoClient(cache=get_search_cache())
+    return _client
+
+
 async def asearch(
     query: str,
     max_results: int = 10,
     region: Optional[str] = None,
+    use_cache: bool = True,
 ) -> List[DuckDuckGoSearchResult]:
     """
-    Search the web for the given query.
+    Search the web for the given query without blocking the event loop.
     """
-    extra_params = {}
-    if region:
-        extra_params["region"] = region
-    results = DDGS().text(query, max_results=max_results, **extra_params)
-    return [DuckDuckGoSearchResult.model_validate(result) for result in results]
+    return await get_client().search(query, max_results, region, use_cache)
+
+
+async def search_many(
+    queries: Iterable[str],
+    max_results: int = 10,
+    region: Optional[str] = None,
+) -> List[DuckDuckGoSearchResult]:
+    """
+    Search the web for a batch of queries concurrently.
+
+    Args:
+      queries: The queries to search for.
+
+    Returns:
+      The merged search results, deduplicated by URL.
+    """
+    return await get_client().search_many(queries, max_results, region)
 
 
 def search(
     query: str,
     max_results: int = 10,
     region: Optional[str] = None,
+    use_cache: bool = True,
 ) -> List[DuckDuckGoSearchResult]:
     """
     Search the web for the given query.
 
     Args:
       query: The query to search for.
+      use_cache: Whether to serve and store the results in the search cache.
 
     Returns:
       A list of search results.
     """
-    extra_params = {}
-    if region:
-        extra_params["region"] = region
-    results = DDGS().text(query, max_results=max_results, **extra_params)
-    return [DuckDuckGoSearchResult.model_validate(result) for result in results]
+    if not use_cache:
+        return _text(query, max_results, region)
+    key = SearchCache.key(query, region, max_results)
+    return get_search_cache().fetch(key, lambda: _text(query, max_results, region))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,151 @@
+# Copyright 2025 yu-iskw
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+from html.parser import HTMLParser
+from typing import Iterable, List
+
+# Elements whose content is never part of the readable text.
+SKIP_TAGS = frozenset(
+    {
+        "script",
+        "style",
+        "noscript",
+        "template",
+        "svg",
+        "canvas",
+        "iframe",
+        "nav",
+        "header",
+        "footer",
+        "aside",
+        "form",
+        "button",
+        "select",
+    }
+)
+# Elements that hold the main content of a page when present.
+MAIN_TAGS = frozenset({"main", "article"})
+# Elements that start a new line of text.
+BLOCK_TAGS = frozenset(
+    {
+        "p",
+        "div",
+        "section",
+        "br",
+        "li",
+        "ul",
+        "ol",
+        "tr",
+        "table",
+        "blockquote",
+        "pre",
+        "h1",
+        "h2",
+        "h3",
+        "h4",
+        "h5",
+        "h6",
+        "dt",
+        "dd",
+    }
+)
+# Elements that never have a closing tag.
+VOID_TAGS = frozenset(
+    {"area", "base", "br", "col", "embed", "hr", "img",
+        "input", "link", "meta", "source", "wbr"}
+)
+
+_WHITESPACE = re.compile(r"[ \t\r\f\v]+")
+
+
+class HTMLTextExtractor(HTMLParser):
+    """An incremental HTML-to-text parser.
+
+    Feed it chunks of a page with `feed` and call `text` at any point to get the
+    readable text seen so far. Scripts, styles, navigation and other boilerplate
+    are dropped. When the page marks up its main content with `<main>` or
+    `<article>`, only that content is kept.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self._skip_depth = 0
+        self._main_depth = 0
+        self._all: List[str] = []
+        self._main: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            if tag == "br":
+                self._append("\n")
+            return
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in MAIN_TAGS:
+            self._main_depth += 1
+        if tag in BLOCK_TAGS:
+            self._append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS and self._skip_depth > 0:
+            self._skip_depth -= 1
+        elif tag in MAIN_TAGS and self._main_depth > 0:
+            self._main_depth -= 1
+        if tag in BLOCK_TAGS:
+            self._append("\n")
+
+    def handle_data(self, data):
+        if self._skip_depth == 0:
+            self._append(data)
+
+    def _append(self, data: str) -> None:
+        self._all.append(data)
+        if self._main_depth > 0:
+            self._main.append(data)
+
+    def text(self) -> str:
+        """Return the normalized text extracted so far."""
+        parts = self._main if "".join(self._main).strip() else self._all
+        lines = []
+        for line in "".join(parts).splitlines():
+            line = _WHITESPACE.sub(" ", line).strip()
+            if line:
+                lines.append(line)
+        return "\n".join(lines)
+
+
+def extract_text(chunks: Iterable[str]) -> str:
+    """
+    Extract the readable text from an HTML document.
+
+    Args:
+      chunks: The document, as one or more consecutive pieces.
+
+    Returns:
+      The main text of the document.
+    """
+    parser = HTMLTextExtractor()
+    for chunk in chunks:
+        parser.feed(chunk)
+    parser.close()
+    return parser.text()
+
+
+def truncate_utf8(text: str, max_bytes: int) -> str:
+    """Truncate the text to at most `max_bytes` bytes of UTF-8 without splitting a character."""
+    encoded = text.encode("utf-8")
+    if len(encoded) <= max_bytes:
+        return text
+    return encoded[:max_bytes].decode("utf-8", errors="ignore")
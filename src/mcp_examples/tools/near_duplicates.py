@@ -0,0 +1,90 @@
+# Copyright 2025 yu-iskw
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import heapq
+import re
+from typing import List, Sequence
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def shingle_hashes(text: str, shingle_words: int = 5) -> List[int]:
+    """Return the 64-bit hashes of the overlapping word shingles of the text."""
+    words = _WORD.findall(text.casefold())
+    if len(words) < shingle_words:
+        words = [" ".join(words)] if words else []
+        shingle_words = 1
+    return [
+        int.from_bytes(
+            hashlib.blake2b(
+                " ".join(words[i: i + shingle_words]).encode("utf-8"), digest_size=8
+            ).digest(),
+            "big",
+        )
+        for i in range(len(words) - shingle_words + 1)
+    ]
+
+
+def minhash(text: str, num_hashes: int = 128, shingle_words: int = 5) -> List[int]:
+    """
+    Compute the bottom-k MinHash signature of the text.
+
+    The signature is the `num_hashes` smallest distinct shingle hashes, in
+    ascending order. A single hash function is used, so computing a signature
+    costs one hash per shingle.
+    """
+    return heapq.nsmallest(num_hashes, set(shingle_hashes(text, shingle_words)))
+
+
+def similarity(a: List[int], b: List[int]) -> float:
+    """Estimate the Jaccard similarity of two texts from their MinHash signatures."""
+    if not a or not b:
+        return 1.0 if a == b else 0.0
+    num_hashes = max(len(a), len(b))
+    union = heapq.nsmallest(num_hashes, set(a) | set(b))
+    both = set(a) & set(b)
+    return sum(1 for h in union if h in both) / len(union)
+
+
+def deduplicate(
+    texts: Sequence[str],
+    quality: Sequence[float],
+    threshold: float = 0.8,
+    num_hashes: int = 128,
+    shingle_words: int = 5,
+) -> List[int]:
+    """
+    Drop the near-duplicates among the texts.
+
+    The texts are considered from the highest quality down, and a text is
+    dropped when its estimated similarity to a text already kept reaches the
+    threshold, so the best copy of every group of near-duplicates is kept.
+
+    Args:
+      texts: The texts to deduplicate.
+      quality: The quality of every text; ties keep the earlier text.
+      threshold: The Jaccard similarity above which two texts are near-duplicates.
+      num_hashes: The size of the MinHash signatures.
+      shingle_words: The number of words per shingle.
+
+    Returns:
+      The indices of the texts to keep, in their original order.
+    """
+    signatures = [minhash(text, num_hashes, shingle_words) for text in texts]
+    kept: List[int] = []
+    for i in sorted(range(len(texts)), key=lambda i: (-quality[i], i)):
+        if all(similarity(signatures[i], signatures[j]) < threshold for j in kept):
+            kept.append(i)
+    return sorted(kept)
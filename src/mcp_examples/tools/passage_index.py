@@ -0,0 +1,158 @@
+# Copyright 2025 yu-iskw
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split the text into lower-cased terms, without stopwords."""
+    return [
+        token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS
+    ]
+
+
+@dataclass
+class Passage:
+    """A passage of a document."""
+
+    doc_id: int
+    position: int
+    title: str
+    href: str
+    text: str
+    term_counts: Counter = field(repr=False)
+    length: int = 0
+
+
+@dataclass
+class PassageIndex:
+    """An in-memory BM25 index over the passages of a set of documents.
+
+    Documents are split on line boundaries into passages of about
+    `passage_words` words. The index lives only as long as the object, so it
+    is meant to be built once per research run.
+    """
+
+    passage_words: int = 200
+    k1: float = 1.5
+    b: float = 0.75
+    passages: List[Passage] = field(default_factory=list)
+    _document_frequency: Counter = field(default_factory=Counter, repr=False)
+    _num_documents: int = field(default=0, repr=False)
+
+    def add_document(self, title: str, href: str, text: str) -> None:
+        """Split the document into passages and index them."""
+        doc_id = self._num_documents
+        self._num_documents += 1
+        for position, passage_text in enumerate(self._split(text)):
+            term_counts = Counter(tokenize(passage_text))
+            self.passages.append(
+                Passage(
+                    doc_id=doc_id,
+                    position=position,
+                    title=title,
+                    href=href,
+                    text=passage_text,
+                    term_counts=term_counts,
+                    length=sum(term_counts.values()),
+                )
+            )
+            self._document_frequency.update(term_counts.keys())
+
+    def _split(self, text: str) -> Iterable[str]:
+        lines: List[str] = []
+        words = 0
+        for line in self._lines(text):
+            line_words = len(line.split())
+            if lines and words + line_words > self.passage_words:
+                yield "\n".join(lines)
+                lines, words = [], 0
+            lines.append(line)
+            words += line_words
+        if lines:
+            yield "\n".join(lines)
+
+    def _lines(self, text: str) -> Iterable[str]:
+        """Yield the lines of the text, breaking overly long lines into word windows."""
+        for line in text.splitlines():
+            line_words = line.split()
+            if len(line_words) <= self.passage_words:
+                yield line
+                continue
+            for i in range(0, len(line_words), self.passage_words):
+                yield " ".join(line_words[i: i + self.passage_words])
+
+    def score(self, queries: Iterable[str]) -> List[float]:
+        """Return the BM25 score of every passage against all the queries combined."""
+        if not self.passages:
+            return []
+        query_terms = Counter(
+            term for query in queries for term in tokenize(query))
+        num_passages = len(self.passages)
+        average_length = sum(p.length for p in self.passages) / num_passages
+        idf: Dict[str, float] = {}
+        for term in query_terms:
+            frequency = self._document_frequency.get(term, 0)
+            idf[term] = math.log(
+                1 + (num_passages - frequency + 0.5) / (frequency + 0.5))
+        scores = []
+        for passage in self.passages:
+            norm = self.k1 * (1 - self.b + self.b *
+                              passage.length / max(average_length, 1))
+            score = 0.0
+            for term, weight in query_terms.items():
+                tf = passage.term_counts.get(term, 0)
+                if tf:
+                    score += weight * idf[term] * \
+                        tf * (self.k1 + 1) / (tf + norm)
+            scores.append(score)
+        return scores
+
+    def pack(
+        self, queries: Iterable[str], budget_tokens: int, chars_per_token: int = 4
+    ) -> List[Passage]:
+        """
+        Select the best passages that fit in the token budget.
+
+        Passages that share no term with the queries, for example on pages in
+        another language, fill the rest of the budget in document order.
+
+        Args:
+          queries: The queries to rank the passages against.
+          budget_tokens: The maximum number of tokens of passage text.
+          chars_per_token: The number of characters assumed per token.
+
+        Returns:
+          The selected passages, in document order.
+        """
+        scores = self.score(queries)
+        # The sort is stable, so passages with equal scores stay in document order.
+        ranked = sorted(range(len(self.passages)), key=lambda i: -scores[i])
+        budget_chars = budget_tokens * chars_per_token
+        selected = []
+        for i in ranked:
+            size = len(self.passages[i].text)
+            if size <= budget_chars:
+                selected.append(i)
+                budget_chars -= size
+        return [self.passages[i] for i in sorted(selected)]
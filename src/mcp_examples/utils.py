@@ -12,11 +12,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import requests
+from typing import Optional
+
+import httpx
 from google import genai
 from google.genai import types as genai_types
 from mcp import types as mcp_types
 
+from mcp_examples.fetcher import get_fetcher
+
 
 def to_gemini_tool(mcp_tool: mcp_types.Tool) -> genai_types.Tool:
     """
@@ -51,10 +55,33 @@ def to_gemini_tool(mcp_tool: mcp_types.Tool) -> genai_types.Tool:
     return genai_types.Tool(function_declarations=[function])
 
 
-async def request_get(url: str) -> requests.Response:
+async def request_get(
+    url: str,
+    timeout: float = 10,
+    max_bytes: Optional[int] = None,
+    use_cache: bool = False,
+) -> httpx.Response:
     """
     Request the given URL and return the response.
+
+    The request goes through the shared connection-pooled fetcher, so it
+    does not block the event loop. When `max_bytes` is given, the body is
+    truncated to that many bytes and the rest of it is never downloaded.
+    With `use_cache`, the page is served from or stored in the persistent
+    page cache.
+    """
+    return await get_fetcher().get(
+        url, timeout=timeout, max_bytes=max_bytes, use_cache=use_cache
+    )
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL so that trivially different spellings of a page compare equal.
+
+    The scheme and host are lower-cased, the fragment is dropped and a trailing
+    slash on the path is removed.
     """
-    response = requests.get(url, timeout=10)
-    response.raise_for_status()
-    return response
+    parsed = httpx.URL(url)
+    path = parsed.path.rstrip("/") or "/"
+    return str(parsed.copy_with(fragment=None, path=path))
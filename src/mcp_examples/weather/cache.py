@@ -0,0 +1,302 @@
+# Copyright 2025 yu-iskw
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+import httpx
+from loguru import logger
+
+from mcp_examples.cache import SingleFlight, SQLiteStore, TTLCache, cache_dir
+from mcp_examples.page_cache import freshness_lifetime
+from mcp_examples.weather.nws import NWSClient, decode_json, get_nws_client
+
+# The NWS forecast grid has 2.5km cells. Coordinates are rounded to 0.01°,
+# about 1.1km, so that nearby coordinates share a grid point.
+GRID_RESOLUTION_DEGREES = 0.01
+# The fields of a `/points` response kept in the cache.
+GRID_POINT_FIELDS = ("gridId", "gridX", "gridY", "forecast", "forecastHourly")
+
+
+def quantize(
+    latitude: float, longitude: float, resolution: float = GRID_RESOLUTION_DEGREES
+) -> Tuple[float, float]:
+    """Round coordinates to the grid resolution, with at most 4 decimals as NWS requires."""
+    return (
+        round(round(latitude / resolution) * resolution, 4),
+        round(round(longitude / resolution) * resolution, 4),
+    )
+
+
+@dataclass
+class GridPointCache:
+    """A cache of the NWS grid points of coordinates.
+
+    The mapping from coordinates to a forecast grid point almost never
+    changes, so grid points live for `ttl` seconds in a bounded in-memory LRU
+    and, when a `store` is given, in a persistent store. Coordinates are
+    quantized to the grid resolution, and concurrent misses for the same key
+    are coalesced into one upstream call.
+    """
+
+    ttl: float = 30 * 24 * 3600
+    resolution: float = GRID_RESOLUTION_DEGREES
+    memory: TTLCache = field(default_factory=lambda: TTLCache(maxsize=4096))
+    store: Optional[SQLiteStore] = None
+    _flight: SingleFlight = field(
+        default_factory=SingleFlight, init=False, repr=False)
+
+    def key(self, latitude: float, longitude: float) -> str:
+        """Return the quantized `latitude,longitude`, as used in `/points` URLs."""
+        latitude, longitude = quantize(latitude, longitude, self.resolution)
+        return f"{latitude},{longitude}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        point = self.memory.get(key)
+        if point is None and self.store is not None:
+            point = self.store.get(key)
+            if point is not None:
+                self.memory.set(key, point, self.ttl)
+        return point
+
+    def set(self, key: str, point: Dict[str, Any]) -> None:
+        self.memory.set(key, point, self.ttl)
+        if self.store is not None:
+            self.store.set(key, point, self.ttl)
+
+    def invalidate(self, key: str) -> None:
+        self.memory.pop(key)
+        if self.store is not None:
+            self.store.delete(key)
+
+    async def afetch(
+        self, key: str, fn: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Return the cached grid point, or call `fn` once for all concurrent callers."""
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        async def load() -> Dict[str, Any]:
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+            point = await fn()
+            self.set(key, point)
+            return point
+
+        return await self._flight.ado(key, load)
+
+
+_grid_point_cache: Optional[GridPointCache] = None
+
+
+def get_grid_point_cache() -> GridPointCache:
+    """Return the process-wide grid point cache, backed by a persistent store."""
+    global _grid_point_cache  # pylint: disable=global-statement
+    if _grid_point_cache is None:
+        _grid_point_cache = GridPointCache(
+            store=SQLiteStore(cache_dir() / "weather.sqlite3", table="grid_points")
+        )
+    return _grid_point_cache
+
+
+@dataclass
+class CachedResponse:
+    """A parsed NWS payload with its validators."""
+
+    data: Dict[str, Any]
+    headers: Dict[str, str]
+    expires_at: float
+    # How long after expiry the payload may still be served while it is
+    # revalidated in the background.
+    max_stale: float = 0.0
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        """Whether the payload can be served without revalidation."""
+        return (now or time.time()) < self.expires_at
+
+    def is_servable_stale(self, now: Optional[float] = None) -> bool:
+        """Whether the expired payload can be served while it is revalidated."""
+        return (now or time.time()) < self.expires_at + self.max_stale
+
+    def validators(self) -> Dict[str, str]:
+        """The conditional request headers to revalidate the payload."""
+        headers = {}
+        if "etag" in self.headers:
+            headers["If-None-Match"] = self.headers["etag"]
+        if "last-modified" in self.headers:
+            headers["If-Modified-Since"] = self.headers["last-modified"]
+        return headers
+
+
+@dataclass
+class ResponseCache:
+    """A stale-while-revalidate cache of parsed NWS payloads.
+
+    Payloads stay fresh for the lifetime given by their Cache-Control or
+    Expires headers. For `max_stale` seconds after that, or `alerts_max_stale`
+    seconds for alerts, a stale payload is served at once while a background
+    task revalidates it with its ETag and Last-Modified validators. Payloads
+    with no freshness lifetime, such as `no-cache` responses, are never served
+    stale: they are revalidated before every use. Either way, a
+    `304 Not Modified` only extends the lifetime of a payload. Payloads live in a bounded in-memory LRU and, when a `store` is
+    given, in a persistent store. Concurrent fetches of the same URL are
+    coalesced into one upstream call.
+    """
+
+    client: NWSClient
+    # The freshness lifetime of responses without explicit caching headers.
+    heuristic_ttl: float = 300.0
+    max_stale: float = 3600.0
+    # Safety alerts must not be served long after they expire.
+    alerts_max_stale: float = 60.0
+    memory: TTLCache = field(default_factory=lambda: TTLCache(maxsize=1024))
+    store: Optional[SQLiteStore] = None
+
+    hits: int = field(default=0, init=False)
+    stale_hits: int = field(default=0, init=False)
+    misses: int = field(default=0, init=False)
+    revalidations: int = field(default=0, init=False)
+    _flight: SingleFlight = field(
+        default_factory=SingleFlight, init=False, repr=False)
+    _refreshes: Set[asyncio.Task] = field(
+        default_factory=set, init=False, repr=False)
+
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        """Return the cached payload of the URL, fresh or stale, or None."""
+        entry = self.memory.get(url)
+        if entry is None and self.store is not None:
+            stored = self.store.get(url)
+            if stored is not None:
+                entry = CachedResponse(**stored)
+                self.memory.set(url, entry, self._retention(entry))
+        return entry
+
+    def _retention(self, entry: CachedResponse) -> float:
+        # Entries are kept past their stale window for conditional requests.
+        return max(0.0, entry.expires_at - time.time()) + self.max_stale
+
+    def _max_stale(self, url: str, lifetime: float) -> float:
+        if lifetime <= 0:
+            return 0.0
+        if httpx.URL(url).path.startswith("/alerts"):
+            return self.alerts_max_stale
+        return self.max_stale
+
+    def _save(self, url: str, entry: CachedResponse) -> None:
+        ttl = self._retention(entry)
+        self.memory.set(url, entry, ttl)
+        if self.store is not None:
+            self.store.set(url, asdict(entry), ttl)
+
+    async def get_json(self, url: str) -> Dict[str, Any]:
+        """
+        Return the payload of the URL, from the cache when possible.
+
+        Raises:
+            NWSError: The payload is not cached and the request failed.
+        """
+        entry = self.lookup(url)
+        if entry is not None and entry.is_fresh():
+            self.hits += 1
+            return entry.data
+        if entry is not None and entry.is_servable_stale():
+            self.stale_hits += 1
+            self._refresh_in_background(url)
+            return entry.data
+        self.misses += 1
+        entry = await self._flight.ado(url, lambda: self._fetch(url))
+        return entry.data
+
+    async def refresh(self, url: str) -> None:
+        """Fetch or revalidate the payload of the URL unless it is fresh."""
+        entry = self.lookup(url)
+        if entry is None or not entry.is_fresh():
+            await self._flight.ado(url, lambda: self._fetch(url))
+
+    def _refresh_in_background(self, url: str) -> None:
+        if self._flight.in_flight(url):
+            return
+        task = asyncio.create_task(self._flight.ado(url, lambda: self._fetch(url)))
+        self._refreshes.add(task)
+        task.add_done_callback(self._on_refreshed)
+
+    def _on_refreshed(self, task: asyncio.Task) -> None:
+        self._refreshes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(
+                f"Failed to refresh a cached NWS payload: {task.exception()}")
+
+    async def _fetch(self, url: str) -> CachedResponse:
+        """Fetch the URL, conditionally when a cached payload exists, and cache it."""
+        entry = self.lookup(url)
+        response = await self.client.get(
+            url, headers=entry.validators() if entry is not None else None
+        )
+        lifetime = freshness_lifetime(response.headers, self.heuristic_ttl)
+        expires_at = time.time() + (lifetime or 0.0)
+        max_stale = self._max_stale(url, lifetime or 0.0)
+        if entry is not None and response.status_code == httpx.codes.NOT_MODIFIED:
+            self.revalidations += 1
+            headers = dict(entry.headers)
+            for name in ("etag", "last-modified"):
+                if name in response.headers:
+                    headers[name] = response.headers[name]
+            entry = CachedResponse(entry.data, headers, expires_at, max_stale)
+        else:
+            entry = CachedResponse(
+                data=decode_json(response),
+                headers={
+                    name: response.headers[name]
+                    for name in ("etag", "last-modified")
+                    if name in response.headers
+                },
+                expires_at=expires_at,
+                max_stale=max_stale,
+            )
+        if lifetime is not None:
+            self._save(url, entry)
+        return entry
+
+    def stats(self) -> Dict[str, int]:
+        """Return the hit, stale hit, miss and revalidation counters."""
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+        }
+
+    async def aclose(self) -> None:
+        """Cancel the background refreshes."""
+        for task in list(self._refreshes):
+            task.cancel()
+        await asyncio.gather(*self._refreshes, return_exceptions=True)
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide NWS response cache, backed by a persistent store."""
+    global _response_cache  # pylint: disable=global-statement
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            client=get_nws_client(),
+            store=SQLiteStore(cache_dir() / "weather.sqlite3", table="responses"),
+        )
+    return _response_cache
@@ -0,0 +1,165 @@
+# Copyright 2025 yu-iskw
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import importlib.util
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import httpx
+from loguru import logger
+
+NWS_API_BASE = "https://api.weather.gov"
+USER_AGENT = "weather-app/1.0"
+
+
+class NWSError(RuntimeError):
+    """Raised when a request to the NWS API fails."""
+
+    def __init__(
+        self, url: str, reason: str, latency: float, status_code: Optional[int] = None
+    ):
+        self.url = url
+        self.reason = reason
+        self.latency = latency
+        self.status_code = status_code
+        super().__init__(f"{reason} after {latency:.2f}s ({url})")
+
+
+def decode_json(response: httpx.Response) -> Dict[str, Any]:
+    """Decode the JSON body of an NWS response."""
+    try:
+        return response.json()
+    except ValueError as e:
+        raise NWSError(
+            str(response.request.url),
+            "NWS returned invalid JSON",
+            response.elapsed.total_seconds(),
+            response.status_code,
+        ) from e
+
+
+@dataclass
+class NWSClient:
+    """A shared, connection-pooled client for the NWS API.
+
+    Connections are kept alive across tool calls, and HTTP/2 is used when the
+    `h2` package is installed, so consecutive requests skip the TCP and TLS
+    setup. The latency of every request is logged, and failures raise
+    `NWSError` with the status code and latency.
+    """
+
+    timeout: float = 30.0
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 60.0
+    http2: bool = field(
+        default_factory=lambda: importlib.util.find_spec("h2") is not None
+    )
+    headers: Dict[str, str] = field(
+        default_factory=lambda: {
+            "User-Agent": USER_AGENT,
+            "Accept": "application/geo+json",
+        }
+    )
+    transport: Optional[httpx.AsyncBaseTransport] = None
+
+    requests: int = field(default=0, init=False)
+    errors: int = field(default=0, init=False)
+    total_latency: float = field(default=0.0, init=False)
+    _client: Optional[httpx.AsyncClient] = field(
+        default=None, init=False, repr=False)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The underlying pooled client, created on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=self.timeout,
+                http2=self.http2,
+                transport=self.transport,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+            )
+        return self._client
+
+    async def get(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> httpx.Response:
+        """
+        Send a GET request and return the response.
+
+        A `304 Not Modified` answer to a conditional request is returned as is.
+
+        Raises:
+            NWSError: The request failed or returned an error status.
+        """
+        start = time.perf_counter()
+        self.requests += 1
+        try:
+            response = await self.client.get(url, headers=headers)
+            if response.status_code != httpx.codes.NOT_MODIFIED:
+                response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            self.errors += 1
+            latency = time.perf_counter() - start
+            status_code = e.response.status_code
+            raise NWSError(
+                url, f"NWS returned {status_code}", latency, status_code
+            ) from e
+        except httpx.HTTPError as e:
+            self.errors += 1
+            latency = time.perf_counter() - start
+            reason = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            raise NWSError(url, reason, latency) from e
+        latency = time.perf_counter() - start
+        self.total_latency += latency
+        logger.debug(
+            f"GET {url}: {response.status_code} in {latency * 1000:.0f}ms "
+            f"over {response.http_version}"
+        )
+        return response
+
+    async def get_json(self, url: str) -> Dict[str, Any]:
+        """Send a GET request and return the decoded JSON body."""
+        return decode_json(await self.get(url))
+
+    def stats(self) -> Dict[str, float]:
+        """Return the request and error counters and the mean latency."""
+        succeeded = self.requests - self.errors
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "mean_latency": self.total_latency / succeeded if succeeded else 0.0,
+        }
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_nws_client: Optional[NWSClient] = None
+
+
+def get_nws_client() -> NWSClient:
+    """Return the NWS client shared by every tool call."""
+    global _nws_client  # pylint: disable=global-statement
+    if _nws_client is None:
+        _nws_client = NWSClient()
+    return _nws_client
@@ -1,26 +1,108 @@
+import asyncio
+import os
 from typing import Any
 
-import httpx
+from loguru import logger
 from mcp.server.fastmcp import FastMCP
 
+from mcp_examples.weather.cache import (
+    GRID_POINT_FIELDS,
+    get_grid_point_cache,
+    get_response_cache,
+)
+from mcp_examples.weather.nws import NWS_API_BASE, NWSError, get_nws_client
+
 # Initialize FastMCP server
 mcp = FastMCP("weather")
 
-# Constants
-NWS_API_BASE = "https://api.weather.gov"
-USER_AGENT = "weather-app/1.0"
+_prewarm_task: asyncio.Task | None = None
+
+
+async def make_nws_request(url: str) -> dict[str, Any]:
+    """Make a request to the NWS API through the shared response cache.
+
+    Raises:
+        NWSError: The request failed, with its status code and latency.
+    """
+    return await get_response_cache().get_json(url)
+
+
+async def get_grid_point(latitude: float, longitude: float) -> dict[str, Any]:
+    """Get the forecast grid point of a location, from the cache when possible."""
+    cache = get_grid_point_cache()
+    key = cache.key(latitude, longitude)
+
+    async def load() -> dict[str, Any]:
+        points_data = await get_nws_client().get_json(f"{NWS_API_BASE}/points/{key}")
+        properties = points_data["properties"]
+        return {name: properties.get(name) for name in GRID_POINT_FIELDS}
+
+    return await cache.afetch(key, load)
 
 
-async def make_nws_request(url: str) -> dict[str, Any] | None:
-    """Make a request to the NWS API with proper error handling."""
-    headers = {"User-Agent": USER_AGENT, "Accept": "application/geo+json"}
-    async with httpx.AsyncClient() as client:
+def parse_points(value: str) -> list[tuple[float, float]]:
+    """Parse `latitude,longitude` pairs separated by semicolons."""
+    points = []
+    for point in value.split(";"):
+        if point.strip():
+            latitude, longitude = point.split(",")
+            points.append((float(latitude), float(longitude)))
+    return points
+
+
+async def prewarm(states: list[str], points: list[tuple[float, float]]) -> None:
+    """Fetch or revalidate the alerts of the states and the forecasts of the points."""
+    urls = [f"{NWS_API_BASE}/alerts/active/area/{state}" for state in states]
+    for latitude, longitude in points:
         try:
-            response = await client.get(url, headers=headers, timeout=30.0)
-            response.raise_for_status()
-            return response.json()
-        except Exception:
-            return None
+            point = await get_grid_point(latitude, longitude)
+        except NWSError as e:
+            logger.warning(f"Failed to pre-warm {latitude},{longitude}: {e}")
+            continue
+        if point["forecast"]:
+            urls.append(point["forecast"])
+    cache = get_response_cache()
+    results = await asyncio.gather(
+        *(cache.refresh(url) for url in urls), return_exceptions=True
+    )
+    for url, result in zip(urls, results, strict=True):
+        if isinstance(result, Exception):
+            logger.warning(f"Failed to pre-warm {url}: {result}")
+
+
+async def prewarm_forever(
+    states: list[str], points: list[tuple[float, float]], interval: float
+) -> None:
+    while True:
+        await prewarm(states, points)
+        await asyncio.sleep(interval)
+
+
+def start_prewarm() -> None:
+    """Start pre-warming the cache in the background, unless it is running.
+
+    It keeps the alerts of the comma-separated states of
+    `$WEATHER_PREWARM_STATES` and the forecasts of the semicolon-separated
+    points of `$WEATHER_PREWARM_POINTS` fresh, every
+    `$WEATHER_PREWARM_INTERVAL` seconds.
+    """
+    global _prewarm_task  # pylint: disable=global-statement
+    if _prewarm_task is not None and not _prewarm_task.done():
+        return
+    states = [
+        state.strip().upper()
+        for state in os.getenv("WEATHER_PREWARM_STATES", "").split(",")
+        if state.strip()
+    ]
+    points = parse_points(os.getenv("WEATHER_PREWARM_POINTS", ""))
+    if not states and not points:
+        return
+    interval = float(os.getenv("WEATHER_PREWARM_INTERVAL", "300"))
+    _prewarm_task = asyncio.create_task(
+        prewarm_forever(states, points, interval), name="weather-prewarm"
+    )
+    logger.info(
+        f"Pre-warming {len(states)} states and {len(points)} points every {interval}s")
 
 
 def format_alert(feature: dict) -> str:
@@ -42,11 +124,15 @@ async def get_alerts(state: str) -> str:
     Args:
         state: Two-letter US state code (e.g. CA, NY)
     """
-    url = f"{NWS_API_BASE}/alerts/active/area/{state}"
-    data = await make_nws_request(url)
+    start_prewarm()
+    url = f"{NWS_API_BASE}/alerts/active/area/{state.strip().upper()}"
+    try:
+        data = await make_nws_request(url)
+    except NWSError as e:
+        return f"Unable to fetch alerts: {e}"
 
-    if not data or "features" not in data:
-        return "Unable to fetch alerts or no alerts found."
+    if "features" not in data:
+        return "No alerts found."
 
     if not data["features"]:
         return "No active alerts for this state."
@@ -63,19 +149,23 @@ async def get_forecast(latitude: float, longitude: float) -> str:
         latitude: Latitude of the location
         longitude: Longitude of the location
     """
-    # First get the forecast grid endpoint
-    points_url = f"{NWS_API_BASE}/points/{latitude},{longitude}"
-    points_data = await make_nws_request(points_url)
-
-    if not points_data:
-        return "Unable to fetch forecast data for this location."
-
-    # Get the forecast URL from the points response
-    forecast_url = points_data["properties"]["forecast"]
-    forecast_data = await make_nws_request(forecast_url)
-
-    if not forecast_data:
-        return "Unable to fetch detailed forecast."
+    start_prewarm()
+    # First get the forecast grid endpoint, which is cached for a long time
+    try:
+        point = await get_grid_point(latitude, longitude)
+    except NWSError as e:
+        return f"Unable to fetch forecast data for this location: {e}"
+    if not point["forecast"]:
+        return "No forecast is available for this location."
+
+    try:
+        forecast_data = await make_nws_request(point["forecast"])
+    except NWSError as e:
+        if e.status_code == 404:
+            # The grid was redrawn; look the grid point up again next time.
+            cache = get_grid_point_cache()
+            cache.invalidate(cache.key(latitude, longitude))
+        return f"Unable to fetch detailed forecast: {e}"
 
     # Format the periods into a readable forecast
     periods = forecast_data["properties"]["periods"]
@@ -92,6 +182,12 @@ Forecast: {period["detailedForecast"]}
     return "\n---\n".join(forecasts)
 
 
+async def main() -> None:
+    # FastMCP has no lifespan hook here, so start pre-warming before serving.
+    start_prewarm()
+    await mcp.run_stdio_async()
+
+
 if __name__ == "__main__":
     # Initialize and run the server
-    mcp.run(transport="stdio")
+    asyncio.run(main())
@@ -0,0 +1,34 @@
+import asyncio
+
+from google.genai import types
+
+
+def make_response(
+    text: str, finish_reason: types.FinishReason = types.FinishReason.STOP
+) -> types.GenerateContentResponse:
+    return types.GenerateContentResponse(
+        candidates=[
+            types.Candidate(
+                content=types.Content(
+                    role="model", parts=[types.Part.from_text(text=text)]),
+                finish_reason=finish_reason,
+            )
+        ]
+    )
+
+
+class StreamingClient:
+    """Streams the given pieces of text, then hangs when `hang` is set."""
+
+    def __init__(self, pieces, hang=False):
+        self.pieces = pieces
+        self.hang = hang
+
+    async def generate_content_stream(self, model, contents, config=None):
+        async def stream():
+            for piece in self.pieces:
+                yield make_response(piece)
+            if self.hang:
+                await asyncio.sleep(10)
+
+        return stream()
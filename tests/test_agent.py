@@ -0,0 +1,203 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+import httpx
+from duckduckgo_search.exceptions import DuckDuckGoSearchException
+
+from mcp_examples.agentic_server.agent import (
+    MAP_PROMPT,
+    REDUCE_PROMPT,
+    PlannerResult,
+    ResearchData,
+    ResearchWorkflow,
+    ResearchWorkflowState,
+    estimate_tokens,
+    group_by_budget,
+    truncate_to_budget,
+)
+from mcp_examples.llm_cache import ResponseCache
+from mcp_examples.tools.duckduckgo import DuckDuckGoClient, DuckDuckGoSearchResult
+from tests.gemini_fakes import StreamingClient, make_response
+
+
+def result(href: str) -> DuckDuckGoSearchResult:
+    return DuckDuckGoSearchResult(title=href, href=href, body="")
+
+
+class FakeClient:
+    """Answers map and reduce prompts with fixed-size notes and records the streamed summary."""
+
+    def __init__(self, map_note_tokens: int, reduce_note_tokens: int = 10):
+        self.map_note_tokens = map_note_tokens
+        self.reduce_note_tokens = reduce_note_tokens
+        self.calls = []
+        self.summary_contents = None
+
+    def with_priority(self, priority):
+        return self
+
+    async def generate_content(self, model, contents, config=None):
+        prompt = contents[0]
+        self.calls.append(prompt)
+        tokens = self.map_note_tokens if prompt == MAP_PROMPT else self.reduce_note_tokens
+        return make_response("x" * tokens * 4)
+
+    async def generate_content_stream(self, model, contents, config=None):
+        self.summary_contents = contents
+
+        async def stream():
+            yield make_response("summary")
+
+        return stream()
+
+
+def page(href: str, tokens: int) -> ResearchData:
+    return ResearchData(title=href, href=href, content="y" * tokens * 4, extracted=True)
+
+
+def make_workflow(genai_client=None, **kwargs) -> ResearchWorkflow:
+    return ResearchWorkflow(
+        genai_client=genai_client,
+        response_cache=ResponseCache(),
+        use_response_cache=False,
+        **kwargs,
+    )
+
+
+class TestBudgets(unittest.TestCase):
+    def test_group_by_budget(self):
+        texts = ["a" * 40, "b" * 40, "c" * 40, "d" * 200]
+        self.assertEqual(
+            group_by_budget(texts, 20),
+            [["a" * 40, "b" * 40], ["c" * 40], ["d" * 200]],
+        )
+
+    def test_truncate_to_budget(self):
+        texts = ["a" * 40, "b" * 400, "c" * 800]
+        truncated = truncate_to_budget(texts, 100)
+        self.assertEqual(truncated[0], texts[0])
+        self.assertEqual([len(text) for text in truncated], [40, 180, 180])
+        self.assertLessEqual(sum(estimate_tokens(text) for text in truncated), 100)
+        self.assertEqual(truncate_to_budget(texts, 1000), texts)
+
+    def test_route_summarizer(self):
+        workflow = make_workflow(summary_budget_tokens=1_000)
+        state = ResearchWorkflowState(
+            research_topic="topic", research_data=[page("a", 1_500)])
+        self.assertEqual(workflow.route_summarizer(state), "summarizer")
+        state.research_data.append(page("b", 1_000))
+        self.assertEqual(workflow.route_summarizer(state),
+                         "map_reduce_summarizer")
+        # With little time left, the research data is packed instead.
+        state.deadline = time.time() + 10
+        self.assertEqual(workflow.route_summarizer(state), "summarizer")
+
+    def test_default_threshold_is_reachable(self):
+        workflow = make_workflow()
+        largest_page = workflow.max_text_bytes // 4
+        self.assertLess(
+            workflow.map_reduce_threshold(),
+            3 * workflow.max_results_per_query * largest_page,
+        )
+        self.assertLess(workflow.map_chunk_tokens, largest_page)
+
+
+class TestStreamSummary(unittest.IsolatedAsyncioTestCase):
+    async def test_streams_chunks_in_order(self):
+        workflow = make_workflow(StreamingClient(["Hello, ", "wor", "ld"]))
+        written = []
+        state = ResearchWorkflowState(research_topic="topic")
+        summary = await workflow.stream_summary(state, ["prompt"], written.append)
+        self.assertEqual(summary, "Hello, world")
+        self.assertEqual(
+            written,
+            [{"summary_delta": "Hello, "}, {"summary_delta": "wor"},
+             {"summary_delta": "ld"}],
+        )
+
+    async def test_returns_the_partial_summary_on_timeout(self):
+        workflow = make_workflow(
+            StreamingClient(["Hello, ", "world"], hang=True),
+            deadline_margin_seconds=0,
+            brief_summary_seconds=0,
+        )
+        state = ResearchWorkflowState(
+            research_topic="topic", deadline=time.time() + 0.2)
+        summary = await workflow.stream_summary(state, ["prompt"], lambda chunk: None)
+        self.assertEqual(summary, "Hello, world")
+
+
+class TestMapReduceSummarizer(unittest.IsolatedAsyncioTestCase):
+    async def summarize(self, client, **kwargs):
+        workflow = make_workflow(
+            client, map_chunk_tokens=100, reduce_budget_tokens=100, **kwargs)
+        state = ResearchWorkflowState(
+            research_topic="topic",
+            research_data=[page("a", 200), page("b", 100), page("c", 200)],
+        )
+        state = await workflow.map_reduce_summarizer(state, lambda chunk: None)
+        self.assertEqual(state.summary, "summary")
+        return client.summary_contents[1]
+
+    async def test_reduces_notes_level_by_level(self):
+        client = FakeClient(map_note_tokens=30)
+        notes = await self.summarize(client)
+        self.assertEqual(client.calls.count(MAP_PROMPT), 5)
+        self.assertEqual(client.calls.count(REDUCE_PROMPT), 2)
+        self.assertLessEqual(estimate_tokens(notes), 100)
+
+    async def test_truncates_notes_that_cannot_be_merged(self):
+        # Any two notes exceed the reduce budget, so they cannot be merged.
+        client = FakeClient(map_note_tokens=60)
+        notes = await self.summarize(client)
+        self.assertNotIn(REDUCE_PROMPT, client.calls)
+        # The budget, plus the separators between the 5 notes.
+        self.assertLessEqual(len(notes), 100 * 4 + 2 * 4)
+
+
+class TestResearcher(unittest.IsolatedAsyncioTestCase):
+    async def test_fetches_start_before_searches_finish(self):
+        events = []
+        lock = threading.Lock()
+
+        def text(query, max_results, region):
+            if query == "fail":
+                raise DuckDuckGoSearchException("boom")
+            if query == "slow":
+                time.sleep(0.2)
+            with lock:
+                events.append(f"searched {query}")
+            return [result(f"https://example.com/{query}")]
+
+        async def request_get(url, **kwargs):
+            with lock:
+                events.append(f"fetched {url}")
+            return httpx.Response(200, text=f"<p>{url}</p>")
+
+        search_client = DuckDuckGoClient(requests_per_second=100, burst=10)
+        state = ResearchWorkflowState(
+            research_topic="topic",
+            plan=PlannerResult(search_queries=["slow", "fail", "fast"]),
+        )
+        with (
+            mock.patch("mcp_examples.tools.duckduckgo._text", side_effect=text),
+            mock.patch(
+                "mcp_examples.agentic_server.agent.get_search_client",
+                return_value=search_client,
+            ),
+            mock.patch(
+                "mcp_examples.agentic_server.agent.request_get", side_effect=request_get
+            ),
+        ):
+            state = await make_workflow().researcher(state)
+
+        self.assertLess(
+            events.index("fetched https://example.com/fast"),
+            events.index("searched slow"),
+        )
+        self.assertEqual(
+            sorted(data.href for data in state.research_data),
+            ["https://example.com/fast", "https://example.com/slow"],
+        )
@@ -0,0 +1,60 @@
+import unittest
+
+from mcp_examples.math_tools import arrays
+
+
+class TestArrays(unittest.TestCase):
+    def test_elementwise_broadcasts(self):
+        result = arrays.elementwise("add", [[1, 2], [3, 4]], [10, 20])
+        self.assertEqual(arrays.to_python(result), [[11, 22], [13, 24]])
+        result = arrays.elementwise("multiply", [1, 2, 3], 2)
+        self.assertEqual(arrays.to_python(result), [2, 4, 6])
+
+    def test_divide_by_zero_gives_zero(self):
+        result = arrays.elementwise("divide", [1, 2, 3], [1, 0, 3])
+        self.assertEqual(arrays.to_python(result), [1, 0, 1])
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            arrays.elementwise("concat", [1], [2])
+        with self.assertRaises(ValueError):
+            arrays.elementwise("add", [1, 2, 3], [1, 2])
+        with self.assertRaises(ValueError):
+            arrays.reduce("sum", [[1, 2], [3]])
+        with self.assertRaises(ValueError):
+            arrays.reduce("mean", [])
+
+    def test_reduce(self):
+        values = [[1, 2], [3, 4]]
+        self.assertEqual(arrays.to_python(arrays.reduce("sum", values)), 10)
+        self.assertEqual(arrays.to_python(
+            arrays.reduce("max", values, axis=0)), [3, 4])
+        self.assertEqual(arrays.to_python(
+            arrays.reduce("mean", values, axis=1)), [1.5, 3.5])
+
+    def test_percentiles(self):
+        result = arrays.percentiles(list(range(101)), [0, 50, 90])
+        self.assertEqual(arrays.to_python(result), [0, 50, 90])
+
+    def test_dot(self):
+        self.assertEqual(arrays.to_python(arrays.dot([1, 2, 3], [4, 5, 6])), 32)
+        self.assertEqual(
+            arrays.to_python(arrays.dot([[1, 0], [0, 1]], [[1, 2], [3, 4]])),
+            [[1, 2], [3, 4]],
+        )
+
+    def test_cumulative(self):
+        self.assertEqual(
+            arrays.to_python(arrays.cumulative("sum", [1, 2, 3])), [1, 3, 6])
+        self.assertEqual(
+            arrays.to_python(arrays.cumulative("max", [[1, 5], [3, 2]], axis=1)),
+            [[1, 5], [3, 3]],
+        )
+
+    def test_to_python_replaces_non_finite_values(self):
+        result = arrays.elementwise("power", [0.0, 2.0], [-1.0, 0.5])
+        self.assertEqual(arrays.to_python(result)[0], None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import asyncio
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from mcp_examples.cache import SingleFlight, SQLiteStore, TTLCache
+
+
+class TestTTLCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = TTLCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_expiry(self):
+        cache = TTLCache()
+        cache.set("a", 1, ttl=-1)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.misses, 1)
+
+
+class TestSQLiteStore(unittest.TestCase):
+    def test_roundtrip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SQLiteStore(Path(tmp) / "store.sqlite3")
+            store.set("a", {"x": [1, 2]}, ttl=60)
+            store.set("b", "stale", ttl=-1)
+            self.assertEqual(store.get("a"), {"x": [1, 2]})
+            self.assertIsNone(store.get("b"))
+            self.assertEqual(store.purge_expired(), 1)
+            store.close()
+
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    async def test_ado_coalesces(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "done"
+
+        results = await asyncio.gather(*[flight.ado("k", work) for _ in range(5)])
+        self.assertEqual(results, ["done"] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertFalse(flight.in_flight("k"))
+
+    async def test_ado_shares_exceptions(self):
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            *[flight.ado("k", work) for _ in range(3)], return_exceptions=True
+        )
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+
+    def test_do_coalesces_threads(self):
+        flight = SingleFlight()
+        calls = []
+
+        def work():
+            calls.append(1)
+            time.sleep(0.05)
+            return "done"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(flight.do("k", work)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ["done"] * 5)
+        self.assertEqual(len(calls), 1)
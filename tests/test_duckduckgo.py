@@ -0,0 +1,55 @@
+import unittest
+from unittest import mock
+
+from duckduckgo_search.exceptions import RatelimitException
+
+from mcp_examples.tools.duckduckgo import DuckDuckGoClient, DuckDuckGoSearchResult
+
+
+def result(href: str) -> DuckDuckGoSearchResult:
+    return DuckDuckGoSearchResult(title=href, href=href, body="")
+
+
+class TestDuckDuckGoClient(unittest.IsolatedAsyncioTestCase):
+    async def test_search_many_dedupes(self):
+        responses = {
+            "a": [result("https://example.com/1"), result("https://example.com/2")],
+            "b": [result("https://example.com/2/"), result("https://example.com/3")],
+        }
+        client = DuckDuckGoClient(requests_per_second=100, burst=10)
+        with mock.patch(
+            "mcp_examples.tools.duckduckgo._text",
+            side_effect=lambda query, max_results, region: responses[query],
+        ):
+            results = await client.search_many(["a", "b", "a"])
+        self.assertEqual(
+            sorted(r.href for r in results),
+            ["https://example.com/1", "https://example.com/2",
+                "https://example.com/3"],
+        )
+
+    async def test_retries_when_rate_limited(self):
+        client = DuckDuckGoClient(
+            requests_per_second=100, burst=10, base_delay=0.001)
+        with mock.patch(
+            "mcp_examples.tools.duckduckgo._text",
+            side_effect=[RatelimitException("slow down"),
+                         [result("https://example.com/")]],
+        ) as text:
+            results = await client.search("a")
+        self.assertEqual(len(results), 1)
+        self.assertEqual(text.call_count, 2)
+
+    async def test_search_many_isolates_failures(self):
+        def text(query, max_results, region):
+            if query == "offline":
+                raise ConnectionError("network is unreachable")
+            return [result(f"https://example.com/{query}")]
+
+        client = DuckDuckGoClient(requests_per_second=100, burst=10)
+        with mock.patch("mcp_examples.tools.duckduckgo._text", side_effect=text):
+            results = await client.search_many(["a", "offline", "b"])
+        self.assertEqual(
+            sorted(r.href for r in results),
+            ["https://example.com/a", "https://example.com/b"],
+        )
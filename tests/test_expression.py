@@ -0,0 +1,61 @@
+import unittest
+
+from mcp_examples.math_tools.arrays import to_python
+from mcp_examples.math_tools.expression import compile_expression, rows_to_columns
+
+
+class TestExpression(unittest.TestCase):
+    def test_evaluate(self):
+        compiled = compile_expression("price * quantity * (1 - discount)")
+        self.assertEqual(compiled.variables, {"price", "quantity", "discount"})
+        result = compiled.evaluate(
+            {"price": [10, 20], "quantity": [1, 2], "discount": 0.5})
+        self.assertEqual(to_python(result), [5, 20])
+
+    def test_functions_and_constants(self):
+        result = compile_expression(
+            "where(x > 0, sqrt(x), 0) + round(pi)").evaluate({"x": [4, -1]})
+        self.assertEqual(to_python(result), [5, 3])
+
+    def test_division_by_zero_gives_zero(self):
+        self.assertEqual(to_python(compile_expression("1 / x").evaluate({"x": 0})), 0)
+
+    def test_overflow_gives_infinity(self):
+        result = compile_expression("9 ** 9 ** 9").evaluate({})
+        self.assertIsNone(to_python(result))
+
+    def test_cached_by_normalized_expression(self):
+        self.assertIs(compile_expression("x*2"), compile_expression("x * (2)"))
+
+    def test_rejects_unsafe_syntax(self):
+        for expression in [
+            "__import__('os')",
+            "x.real",
+            "[x for x in y]",
+            "_divide(1, 2)",
+            "lambda: 1",
+            "x[0]",
+            "'a' * 3",
+            "0 < x < 1",
+            "sqrt(x=1)",
+            "x +",
+        ]:
+            with self.subTest(expression=expression):
+                with self.assertRaises(ValueError):
+                    compile_expression(expression)
+
+    def test_missing_variables(self):
+        with self.assertRaises(ValueError):
+            compile_expression("x + y").evaluate({"x": 1})
+
+    def test_rows_to_columns(self):
+        self.assertEqual(
+            rows_to_columns([{"x": 1, "y": 2}, {"x": 3, "y": 4}]),
+            {"x": [1, 3], "y": [2, 4]},
+        )
+        with self.assertRaises(ValueError):
+            rows_to_columns([{"x": 1}, {"y": 2}])
+
+
+if __name__ == "__main__":
+    unittest.main()
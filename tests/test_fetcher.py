@@ -0,0 +1,59 @@
+import asyncio
+import unittest
+
+import httpx
+
+from mcp_examples.fetcher import AsyncFetcher
+
+
+class TestAsyncFetcher(unittest.IsolatedAsyncioTestCase):
+    async def test_per_host_limit(self):
+        active = {"now": 0, "peak": 0}
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+            await asyncio.sleep(0.01)
+            active["now"] -= 1
+            return httpx.Response(200, text=request.url.path)
+
+        fetcher = AsyncFetcher(
+            max_per_host=2, transport=httpx.MockTransport(handler))
+        responses = await asyncio.gather(
+            *[fetcher.get(f"https://example.com/{i}") for i in range(6)]
+        )
+        await fetcher.aclose()
+        self.assertEqual([r.text for r in responses], [
+                         f"/{i}" for i in range(6)])
+        self.assertEqual(active["peak"], 2)
+        # Idle hosts do not keep their slot.
+        self.assertEqual(fetcher._hosts, {})
+
+    async def test_deadline(self):
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(1)
+            return httpx.Response(200)
+
+        fetcher = AsyncFetcher(transport=httpx.MockTransport(handler))
+        with self.assertRaises(TimeoutError):
+            await fetcher.get("https://example.com/", timeout=0.01)
+        await fetcher.aclose()
+        self.assertEqual(fetcher._hosts, {})
+
+    async def test_raise_for_status(self):
+        fetcher = AsyncFetcher(
+            transport=httpx.MockTransport(lambda request: httpx.Response(404))
+        )
+        with self.assertRaises(httpx.HTTPStatusError):
+            await fetcher.get("https://example.com/missing")
+        await fetcher.aclose()
+
+    async def test_max_bytes(self):
+        fetcher = AsyncFetcher(
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, content=b"x" * 1000)
+            )
+        )
+        response = await fetcher.get("https://example.com/", max_bytes=100)
+        await fetcher.aclose()
+        self.assertEqual(response.content, b"x" * 100)
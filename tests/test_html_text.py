@@ -0,0 +1,26 @@
+import unittest
+
+from mcp_examples.tools.html_text import extract_text, truncate_utf8
+
+
+class TestExtractText(unittest.TestCase):
+    def test_strips_boilerplate(self):
+        html = (
+            "<html><head><style>p {color: red}</style><script>var x = 1;</script></head>"
+            "<body><nav>Home | About</nav><p>Hello&nbsp;<b>world</b></p>"
+            "<footer>Copyright</footer></body></html>"
+        )
+        self.assertEqual(extract_text([html]), "Hello\xa0world")
+
+    def test_prefers_main_content(self):
+        html = "<div>Sidebar</div><article><h1>Title</h1><p>Body</p></article>"
+        self.assertEqual(extract_text([html]), "Title\nBody")
+
+    def test_chunked_input(self):
+        html = "<p>Hello</p><scr" + "ipt>ignored()</script><p>there</p>"
+        chunks = [html[i: i + 5] for i in range(0, len(html), 5)]
+        self.assertEqual(extract_text(chunks), "Hello\nthere")
+
+    def test_truncate_utf8(self):
+        self.assertEqual(truncate_utf8("あいう", 7), "あい")
+        self.assertEqual(truncate_utf8("abc", 10), "abc")
@@ -0,0 +1,37 @@
+import asyncio
+import unittest
+
+from mcp_examples.agentic_server.jobs import JobManager, JobStatus, QueueFullError
+
+
+class TestJobManager(unittest.IsolatedAsyncioTestCase):
+    async def test_priority_and_backpressure(self):
+        order = []
+        gate = asyncio.Event()
+
+        async def runner(job):
+            await gate.wait()
+            order.append(job.research_topic)
+            if job.research_topic == "fail":
+                raise ValueError("boom")
+            return f"summary of {job.research_topic}"
+
+        manager = JobManager(runner=runner, num_workers=1, max_queue_size=3)
+        first = manager.submit("first")
+        await asyncio.sleep(0)  # Let the worker pick up the first job.
+        low = manager.submit("low", priority=0)
+        failing = manager.submit("fail", priority=1)
+        high = manager.submit("high", priority=5)
+        with self.assertRaises(QueueFullError):
+            manager.submit("overflow")
+        self.assertEqual(manager.active(), [first, low, failing, high])
+        gate.set()
+
+        self.assertEqual((await manager.wait(low.job_id)).summary, "summary of low")
+        self.assertEqual(order, ["first", "high", "fail", "low"])
+        self.assertEqual(manager.get(first.job_id).status, JobStatus.SUCCEEDED)
+        self.assertEqual(manager.get(high.job_id).progress, 1.0)
+        self.assertEqual(manager.get(failing.job_id).status, JobStatus.FAILED)
+        self.assertEqual(manager.get(failing.job_id).error, "boom")
+        self.assertEqual(manager.active(), [])
+        await manager.aclose()
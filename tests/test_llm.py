@@ -0,0 +1,83 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+from google.genai import errors
+
+from mcp_examples.llm import GeminiClient, GeminiPool, Priority, estimate_request_tokens
+
+
+def api_error(code):
+    return errors.ClientError(
+        code, SimpleNamespace(body_segments=[{"error": {"message": "error"}}])
+    )
+
+
+class FakeModels:
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.calls = []
+
+    async def generate_content(self, model, contents, config=None):
+        self.calls.append(contents)
+        if self.failures:
+            raise api_error(self.failures.pop(0))
+        return contents
+
+
+def make_pool(models, num_keys=1, **kwargs):
+    return GeminiPool(
+        clients=[SimpleNamespace(aio=SimpleNamespace(models=models))] * num_keys,
+        base_delay=0.001,
+        max_delay=0.001,
+        **kwargs,
+    )
+
+
+class TestGeminiPool(unittest.TestCase):
+    def test_estimate_request_tokens(self):
+        self.assertEqual(estimate_request_tokens(["a" * 400]), 100 + 1024)
+
+    def test_retries_rate_limited_requests(self):
+        models = FakeModels(failures=[429, 503])
+        client = GeminiClient(make_pool(models))
+        self.assertEqual(asyncio.run(client.generate_content("m", "hi")), "hi")
+        self.assertEqual(len(models.calls), 3)
+
+    def test_does_not_retry_bad_requests(self):
+        models = FakeModels(failures=[400])
+        client = GeminiClient(make_pool(models))
+        with self.assertRaises(errors.ClientError):
+            asyncio.run(client.generate_content("m", "hi"))
+        self.assertEqual(len(models.calls), 1)
+
+    def test_quotas_scale_with_keys(self):
+        pool = make_pool(FakeModels(), num_keys=3, requests_per_minute=60)
+        # pylint: disable=protected-access
+        self.assertEqual(pool._requests.capacity, 180)
+        self.assertEqual(pool._requests.rate, 3)
+        self.assertEqual(pool._tokens.capacity, 3_000_000)
+
+    def test_interactive_requests_go_first(self):
+        models = FakeModels()
+        # One request per second, with a single request of burst.
+        pool = make_pool(models, requests_per_minute=60)
+        pool._requests.capacity = 1.0  # pylint: disable=protected-access
+        interactive = GeminiClient(pool)
+        batch = interactive.with_priority(Priority.BATCH)
+
+        async def run():
+            await interactive.generate_content("m", "first")
+            # The batch request is submitted first but waits for the interactive one.
+            batch_task = asyncio.create_task(batch.generate_content("m", "batch"))
+            interactive_task = asyncio.create_task(
+                interactive.generate_content("m", "interactive"))
+            await asyncio.sleep(0)
+            await asyncio.gather(batch_task, interactive_task)
+
+        asyncio.run(run())
+        self.assertEqual(models.calls, ["first", "interactive", "batch"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+from google.genai import types
+from pydantic import BaseModel
+
+from mcp_examples.cache import SQLiteStore
+from mcp_examples.llm_cache import ResponseCache
+from tests.gemini_fakes import make_response
+
+
+class Answer(BaseModel):
+    value: int
+
+
+class FakeModels:
+    def __init__(self, responses=None):
+        self.calls = 0
+        self.responses = responses or [make_response('{"value": 42}')]
+
+    async def generate_content(self, model, contents, config=None):
+        self.calls += 1
+        return self.responses[min(self.calls, len(self.responses)) - 1]
+
+    async def generate_content_stream(self, model, contents, config=None):
+        self.calls += 1
+
+        async def stream():
+            yield make_response("Hello, ", finish_reason=None)
+            yield make_response("world")
+
+        return stream()
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.models = FakeModels()
+        self.client = self.models
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = SQLiteStore(Path(self.tmp.name) / "llm.sqlite3")
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_key_normalizes_contents(self):
+        self.assertEqual(
+            ResponseCache.key("m", ["Hello\r\nworld  "]),
+            ResponseCache.key("m", ["Hello\nworld"]),
+        )
+        self.assertNotEqual(ResponseCache.key("m", ["a"]), ResponseCache.key("n", ["a"]))
+
+    def test_generate_content(self):
+        cache = ResponseCache(store=self.store)
+        config = types.GenerateContentConfig(
+            response_mime_type="application/json", response_schema=Answer
+        )
+
+        async def generate(use_cache=True):
+            return await cache.generate_content(
+                self.client, "m", ["question"], config, use_cache=use_cache
+            )
+
+        first = asyncio.run(generate())
+        second = asyncio.run(generate())
+        self.assertEqual(self.models.calls, 1)
+        self.assertEqual(second.text, first.text)
+        self.assertEqual(second.parsed, Answer(value=42))
+
+        asyncio.run(generate(use_cache=False))
+        self.assertEqual(self.models.calls, 2)
+
+        # A new process only has the disk tier.
+        restarted = ResponseCache(store=self.store)
+        self.assertIsNotNone(restarted.get(
+            ResponseCache.key("m", ["question"], config)))
+        self.assertEqual(cache.stats(), {"hits": 1, "disk_hits": 0, "misses": 1})
+        self.assertEqual(restarted.disk_hits, 1)
+
+    def test_does_not_cache_incomplete_responses(self):
+        cache = ResponseCache(store=self.store)
+        config = types.GenerateContentConfig(
+            response_mime_type="application/json", response_schema=Answer
+        )
+        incomplete = [
+            make_response('{"value": 4', types.FinishReason.MAX_TOKENS),
+            make_response("", types.FinishReason.SAFETY),
+            make_response('{"value": 4'),
+        ]
+        for response in incomplete:
+            self.models.responses = [response]
+            asyncio.run(cache.generate_content(
+                self.client, "m", ["question"], config))
+            self.assertIsNone(cache.get(ResponseCache.key("m", ["question"], config)))
+
+    def test_refetches_unparsable_cached_responses(self):
+        cache = ResponseCache(store=self.store)
+        config = types.GenerateContentConfig(
+            response_mime_type="application/json", response_schema=Answer
+        )
+        key = ResponseCache.key("m", ["question"], config)
+        cache.set(key, make_response('{"value": 4').model_dump(
+            mode="json", exclude_none=True))
+
+        response = asyncio.run(cache.generate_content(
+            self.client, "m", ["question"], config))
+        self.assertEqual(response.text, '{"value": 42}')
+        self.assertEqual(self.models.calls, 1)
+        # The broken entry was replaced by the new response.
+        restarted = ResponseCache(store=self.store)
+        cached = asyncio.run(restarted.generate_content(
+            self.client, "m", ["question"], config))
+        self.assertEqual(cached.parsed, Answer(value=42))
+        self.assertEqual(self.models.calls, 1)
+
+    def test_generate_content_stream(self):
+        cache = ResponseCache()
+
+        async def stream():
+            return [
+                text
+                async for text in cache.generate_content_stream(self.client, "m", ["q"])
+            ]
+
+        self.assertEqual(asyncio.run(stream()), ["Hello, ", "world"])
+        self.assertEqual(asyncio.run(stream()), ["Hello, world"])
+        self.assertEqual(self.models.calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+
+from mcp_examples.tools.near_duplicates import deduplicate, minhash, similarity
+
+ARTICLE = " ".join(
+    f"Sentence {i} explains how the Japanese economy grew in year {1950 + i}."
+    for i in range(60)
+)
+
+
+class TestNearDuplicates(unittest.TestCase):
+    def test_similarity(self):
+        mirror = ARTICLE + " Copyright Mirror Site."
+        other = " ".join(
+            f"Paragraph {i} describes a sushi recipe with {i} grams of rice."
+            for i in range(60)
+        )
+        self.assertEqual(similarity(minhash(ARTICLE), minhash(ARTICLE)), 1.0)
+        self.assertGreater(similarity(minhash(ARTICLE), minhash(mirror)), 0.9)
+        self.assertLess(similarity(minhash(ARTICLE), minhash(other)), 0.1)
+
+    def test_deduplicate_keeps_the_best_copy(self):
+        texts = [ARTICLE[:-200], "Something else entirely", ARTICLE]
+        kept = deduplicate(texts, quality=[len(text) for text in texts])
+        self.assertEqual(kept, [1, 2])
+
+    def test_deduplicate_ties_keep_the_first_copy(self):
+        kept = deduplicate([ARTICLE, ARTICLE], quality=[1, 1])
+        self.assertEqual(kept, [0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import httpx
+
+from mcp_examples.fetcher import AsyncFetcher
+from mcp_examples.page_cache import PageCache, freshness_lifetime
+
+
+class TestFreshnessLifetime(unittest.TestCase):
+    def test_cache_control(self):
+        self.assertIsNone(freshness_lifetime(
+            httpx.Headers({"cache-control": "no-store"}), 60))
+        self.assertEqual(freshness_lifetime(
+            httpx.Headers({"cache-control": "no-cache"}), 60), 0)
+        self.assertEqual(
+            freshness_lifetime(httpx.Headers(
+                {"cache-control": "public, max-age=100", "age": "40"}), 60),
+            60,
+        )
+        self.assertEqual(freshness_lifetime(httpx.Headers(), 60), 60)
+
+
+class TestPageCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = PageCache(Path(self.tmp.name) / "pages.sqlite3")
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    async def test_fresh_hit(self):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, headers={"cache-control": "max-age=60"}, text="hello")
+
+        fetcher = AsyncFetcher(transport=httpx.MockTransport(
+            handler), cache=self.cache)
+        for _ in range(3):
+            response = await fetcher.get("https://example.com/", use_cache=True)
+            self.assertEqual(response.text, "hello")
+        await fetcher.aclose()
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(self.cache.hits, 2)
+
+    async def test_does_not_store_cut_bodies(self):
+        def handler(request):
+            size = 1000 if request.url.path == "/large" else 50
+            return httpx.Response(
+                200, headers={"cache-control": "max-age=60"}, content=b"x" * size)
+
+        fetcher = AsyncFetcher(transport=httpx.MockTransport(
+            handler), cache=self.cache)
+        for path in ["/large", "/small"]:
+            url = f"https://example.com{path}"
+            await fetcher.get(url, max_bytes=100, use_cache=True)
+            response = await fetcher.get(url, use_cache=True)
+            self.assertEqual(len(response.content), 1000 if path == "/large" else 50)
+        await fetcher.aclose()
+        # Only the page that fit under the cap was served from the cache.
+        self.assertEqual(self.cache.hits, 1)
+
+    async def test_revalidation(self):
+        def handler(request):
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304, headers={"cache-control": "no-cache"})
+            return httpx.Response(
+                200, headers={"cache-control": "no-cache", "etag": '"v1"'}, text="hello"
+            )
+
+        fetcher = AsyncFetcher(transport=httpx.MockTransport(
+            handler), cache=self.cache)
+        await fetcher.get("https://example.com/", use_cache=True)
+        response = await fetcher.get("https://example.com/", use_cache=True)
+        await fetcher.aclose()
+        self.assertEqual(response.text, "hello")
+        self.assertEqual(self.cache.revalidations, 1)
+
+    def test_lru_eviction(self):
+        self.cache.max_bytes = 10
+        for i in range(3):
+            self.cache.store(
+                f"https://example.com/{i}",
+                httpx.Response(200, content=bytes([i]) * 4),
+            )
+        self.assertIsNone(self.cache.lookup("https://example.com/0"))
+        self.assertIsNotNone(self.cache.lookup("https://example.com/2"))
+        self.assertEqual(self.cache.evictions, 1)
@@ -0,0 +1,48 @@
+import unittest
+
+from mcp_examples.tools.passage_index import PassageIndex, tokenize
+
+
+class TestPassageIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = PassageIndex(passage_words=5)
+        self.index.add_document(
+            "Economy",
+            "https://example.com/economy",
+            "Japan has a large economy\nThe weather is mild today\nExports drive the Japanese economy",
+        )
+        self.index.add_document(
+            "Cooking", "https://example.com/cooking", "Sushi comes from Japan"
+        )
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("The Economy of Japan"), ["economy", "japan"])
+
+    def test_split(self):
+        self.assertEqual(len(self.index.passages), 4)
+
+    def test_score(self):
+        scores = self.index.score(["economy"])
+        self.assertGreater(scores[0], 0)
+        self.assertEqual(scores[1], 0)
+        self.assertGreater(scores[2], 0)
+        self.assertEqual(scores[3], 0)
+
+    def test_pack_respects_budget_and_order(self):
+        passages = self.index.pack(["japan economy exports"], budget_tokens=15)
+        self.assertEqual([p.text for p in passages], [
+            "Japan has a large economy",
+            "Exports drive the Japanese economy",
+        ])
+
+    def test_pack_fills_the_budget_without_matches(self):
+        passages = self.index.pack(["économie"], budget_tokens=14)
+        self.assertEqual([p.text for p in passages], [
+            "Japan has a large economy",
+            "The weather is mild today",
+        ])
+
+    def test_split_long_line(self):
+        index = PassageIndex(passage_words=3)
+        index.add_document("Long", "https://example.com/long", "one two three four five")
+        self.assertEqual([p.text for p in index.passages], ["one two three", "four five"])
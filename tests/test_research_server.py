@@ -0,0 +1,239 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+# The server creates its Gemini client and caches on import. No request is
+# sent in these tests.
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+os.environ.setdefault("MCP_EXAMPLES_CACHE_DIR", tempfile.mkdtemp())
+
+# pylint: disable=wrong-import-position
+import aiosqlite  # noqa: E402
+from langgraph.checkpoint.memory import MemorySaver  # noqa: E402
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver  # noqa: E402
+from langgraph.graph import END, START, StateGraph  # noqa: E402
+
+from mcp_examples.agentic_server import server  # noqa: E402
+from mcp_examples.agentic_server.agent import (  # noqa: E402
+    PlannerResult,
+    ResearchData,
+    ResearchWorkflow,
+    ResearchWorkflowState,
+)
+from mcp_examples.agentic_server.jobs import Job, JobManager  # noqa: E402
+from mcp_examples.llm_cache import ResponseCache  # noqa: E402
+from tests.gemini_fakes import StreamingClient  # noqa: E402
+
+
+def summarizer_graph(client, **kwargs):
+    workflow = ResearchWorkflow(
+        genai_client=client,
+        response_cache=ResponseCache(),
+        use_response_cache=False,
+        **kwargs,
+    )
+    graph_builder = StateGraph(ResearchWorkflowState)
+    graph_builder.add_node("summarizer", workflow.summarizer)
+    graph_builder.add_edge(START, "summarizer")
+    graph_builder.add_edge("summarizer", END)
+    return graph_builder.compile(checkpointer=MemorySaver())
+
+
+class TestRunResearch(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        server.summary_cache.clear()
+        self.calls = []
+
+    async def invoke_graph(self, research_topic, *args, **kwargs):
+        self.calls.append(research_topic)
+        await asyncio.sleep(0.05)
+        return f"summary of {research_topic}", False
+
+    async def test_coalesces_duplicate_topics(self):
+        with mock.patch.object(server, "invoke_graph", side_effect=self.invoke_graph):
+            first, second = await asyncio.gather(
+                server.run_research("Japanese Economy"),
+                server.run_research("  japanese   economy "),
+            )
+            third = await server.run_research("JAPANESE ECONOMY")
+        self.assertEqual(self.calls, ["Japanese Economy"])
+        self.assertEqual(first, "summary of Japanese Economy")
+        self.assertEqual(second, first)
+        self.assertEqual(third, first)
+
+    async def test_joins_only_runs_that_end_by_the_deadline(self):
+        deadlines, threads = [], []
+
+        async def invoke_graph(research_topic, deadline, *args):
+            deadlines.append(deadline)
+            threads.append(args[-1])
+            await asyncio.sleep(0.05)
+            return f"summary by {deadline}", False
+
+        soon = time.time() + 60
+        with mock.patch.object(server, "invoke_graph", side_effect=invoke_graph):
+            unbounded, bounded, joined = await asyncio.gather(
+                server.run_research("topic", thread_id="thread"),
+                server.run_research("topic", deadline=soon, thread_id="thread"),
+                server.run_research("topic", deadline=soon + 1, thread_id="thread"),
+            )
+        # The run without a deadline could end after `soon`, so it is not joined.
+        self.assertEqual(deadlines, [None, soon])
+        self.assertEqual(unbounded, "summary by None")
+        self.assertEqual(bounded, f"summary by {soon}")
+        self.assertEqual(joined, bounded)
+        # The second run does not share the checkpoint thread of the first.
+        self.assertEqual(threads[0], "thread")
+        self.assertTrue(threads[1].startswith("thread-"))
+        self.assertEqual(server.research_runs, {})
+
+    async def test_does_not_cache_degraded_summaries(self):
+        async def invoke_graph(research_topic, *args, **kwargs):
+            self.calls.append(research_topic)
+            return "partial summary", True
+
+        with mock.patch.object(server, "invoke_graph", side_effect=invoke_graph):
+            first = await server.run_research("topic")
+            second = await server.run_research("topic")
+        self.assertEqual(first, "partial summary")
+        self.assertEqual(second, "partial summary")
+        self.assertEqual(self.calls, ["topic", "topic"])
+        self.assertIsNone(server.summary_cache.get("topic"))
+
+
+class TestResearchTool(unittest.IsolatedAsyncioTestCase):
+    async def test_duplicate_calls_share_a_job(self):
+        server.summary_cache.clear()
+        manager = JobManager(runner=server.run_job, num_workers=2)
+
+        async def invoke_graph(research_topic, *args, **kwargs):
+            await asyncio.sleep(0.05)
+            return f"summary of {research_topic}", False
+
+        with (
+            mock.patch.object(server, "job_manager", manager),
+            mock.patch.object(server, "invoke_graph", side_effect=invoke_graph),
+        ):
+            summaries = await asyncio.gather(
+                server.research("topic", None), server.research("Topic", None))
+        await manager.aclose()
+        self.assertEqual(summaries, ["summary of topic"] * 2)
+        self.assertEqual(len(manager._jobs), 1)
+
+
+class TestInvokeGraph(unittest.IsolatedAsyncioTestCase):
+    async def test_streams_summary_chunks_to_the_job(self):
+        graph = summarizer_graph(StreamingClient(["Hello, ", "wor", "ld"]))
+
+        tokens, progress = [], []
+
+        async def on_token(text):
+            tokens.append(text)
+
+        async def on_progress(stage, step, total):
+            progress.append((stage, step, total))
+
+        job = Job(research_topic="topic")
+        job._on_token = on_token
+        with mock.patch.object(server, "get_graph", return_value=graph):
+            summary, degraded = await server.invoke_graph(
+                "topic", on_progress=on_progress, on_token=job.report_token
+            )
+        self.assertEqual(summary, "Hello, world")
+        self.assertFalse(degraded)
+        self.assertEqual(tokens, ["Hello, ", "wor", "ld"])
+        self.assertEqual(progress, [("summarizer", 5, 5)])
+
+    async def test_reports_a_timed_out_summary_as_degraded(self):
+        graph = summarizer_graph(
+            StreamingClient(["Hello"], hang=True),
+            deadline_margin_seconds=0,
+            brief_summary_seconds=0,
+        )
+        with mock.patch.object(server, "get_graph", return_value=graph):
+            summary, degraded = await server.invoke_graph(
+                "topic", deadline=time.time() + 0.2)
+        self.assertEqual(summary, "Hello")
+        self.assertTrue(degraded)
+
+
+class TestCheckpoints(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.conn = aiosqlite.connect(f"{self.tmp.name}/checkpoints.sqlite3")
+        self.calls = []
+        self.previous_pages = []
+        self.fail_researcher = False
+
+        def planner(state):
+            self.calls.append("planner")
+            state.plan = PlannerResult(search_queries=[state.research_topic])
+            return state
+
+        def researcher(state):
+            self.calls.append("researcher")
+            self.previous_pages.append(len(state.previous_research_data))
+            if self.fail_researcher:
+                self.fail_researcher = False
+                raise RuntimeError("network down")
+            state.research_data = [
+                ResearchData(title="page", href="https://example.com/", content="text")
+            ]
+            state.previous_research_data = []
+            return state
+
+        def summarizer(state):
+            self.calls.append("summarizer")
+            state.summary = f"summary of {state.research_topic}"
+            return state
+
+        graph_builder = StateGraph(ResearchWorkflowState)
+        graph_builder.add_node("planner", planner)
+        graph_builder.add_node("researcher", researcher)
+        graph_builder.add_node("summarizer", summarizer)
+        graph_builder.add_edge(START, "planner")
+        graph_builder.add_edge("planner", "researcher")
+        graph_builder.add_edge("researcher", "summarizer")
+        graph_builder.add_edge("summarizer", END)
+        self.saver = AsyncSqliteSaver(self.conn)
+        self.graph = graph_builder.compile(checkpointer=self.saver)
+        self.patch = mock.patch.object(server, "get_graph", return_value=self.graph)
+        self.patch.start()
+
+    async def asyncTearDown(self):
+        self.patch.stop()
+        await self.conn.close()
+        self.tmp.cleanup()
+
+    async def count_checkpoints(self, thread_id):
+        async with self.conn.execute(
+            "SELECT COUNT(*) FROM checkpoints WHERE thread_id = ?", (thread_id,)
+        ) as cursor:
+            (count,) = await cursor.fetchone()
+        return count
+
+    async def test_resumes_after_the_last_finished_node(self):
+        self.fail_researcher = True
+        with self.assertRaises(RuntimeError):
+            await server.invoke_graph("topic", thread_id="thread")
+        summary, _ = await server.invoke_graph("topic", thread_id="thread")
+        self.assertEqual(summary, "summary of topic")
+        self.assertEqual(
+            self.calls, ["planner", "researcher", "researcher", "summarizer"])
+
+    async def test_rerun_reuses_pages_and_prunes_checkpoints(self):
+        await server.invoke_graph("topic", thread_id="thread")
+        self.assertEqual(await self.count_checkpoints("thread"), 1)
+        await server.invoke_graph("topic", thread_id="thread")
+        self.assertEqual(self.previous_pages, [0, 1])
+        self.assertEqual(await self.count_checkpoints("thread"), 1)
+
+    async def test_keeps_the_latest_threads(self):
+        with mock.patch.object(server, "MAX_CHECKPOINT_THREADS", 2):
+            for thread_id in ["a", "b", "c"]:
+                await server.invoke_graph("topic", thread_id=thread_id)
+        self.assertEqual(
+            [await self.count_checkpoints(t) for t in ["a", "b", "c"]], [0, 1, 1])
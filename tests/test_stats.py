@@ -0,0 +1,81 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from mcp_examples.math_tools.stats import (
+    KLLSketch,
+    StreamingStats,
+    describe,
+    iter_binary,
+    iter_csv_column,
+)
+
+
+class TestStreamingStats(unittest.TestCase):
+    def test_matches_numpy(self):
+        values = np.random.default_rng(0).normal(10, 3, size=50_000)
+        stats = StreamingStats()
+        for chunk in np.array_split(values, 7):
+            stats.update(chunk)
+        self.assertEqual(stats.count, len(values))
+        self.assertAlmostEqual(stats.mean, values.mean())
+        self.assertAlmostEqual(stats.variance, values.var(ddof=1))
+        self.assertEqual(stats.min, values.min())
+        self.assertEqual(stats.max, values.max())
+        self.assertEqual(sum(stats.histogram(5)["counts"]), len(values))
+
+    def test_kll_sketch_is_bounded_and_accurate(self):
+        values = np.random.default_rng(1).permutation(200_000).astype(float)
+        sketch = KLLSketch(seed=0)
+        for chunk in np.array_split(values, 20):
+            sketch.update(chunk)
+        self.assertLess(sketch.num_items(), 2_000)
+        for q, estimate in zip([0.1, 0.5, 0.9], sketch.quantiles([0.1, 0.5, 0.9]), strict=True):
+            self.assertLess(abs(estimate / len(values) - q), 0.02)
+
+
+class TestDescribe(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_csv(self):
+        path = self.dir / "data.csv"
+        path.write_text("name,value\na,1\nb,\nc,3\nd,oops\ne,5\n", encoding="utf-8")
+        result = describe(iter_csv_column(path, "value", chunk_size=2))
+        self.assertEqual(result["count"], 3)
+        self.assertEqual(result["skipped"], 2)
+        self.assertEqual(result["mean"], 3)
+        self.assertEqual(result["quantiles"]["0.5"], 3)
+        self.assertEqual(result["rows"], 5)
+
+    def test_csv_skips_infinities(self):
+        path = self.dir / "data.csv"
+        path.write_text("value\n1\n2\ninf\n3\n-inf\n", encoding="utf-8")
+        result = describe(iter_csv_column(path, "value"), bins=2)
+        self.assertEqual(result["count"], 3)
+        self.assertEqual(result["skipped"], 2)
+        self.assertEqual(result["mean"], 2)
+        self.assertEqual(result["max"], 3)
+        self.assertEqual(result["histogram"]["counts"], [1, 2])
+        # The result is valid JSON.
+        json.dumps(result, allow_nan=False)
+
+    def test_binary(self):
+        path = self.dir / "data.bin"
+        np.arange(10, dtype=np.float32).tofile(path)
+        result = describe(iter_binary(path, "float32", chunk_size=3), bins=2)
+        self.assertEqual(result["count"], 10)
+        self.assertEqual(result["min"], 0)
+        self.assertEqual(result["max"], 9)
+        self.assertEqual(result["histogram"]["counts"], [5, 5])
+
+
+if __name__ == "__main__":
+    unittest.main()
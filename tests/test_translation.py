@@ -0,0 +1,232 @@
+import asyncio
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+from google.genai import types
+
+from mcp_examples.llm_cache import ResponseCache
+from mcp_examples.llm_server.translation import (
+    BatchTranslation,
+    SegmentTranslation,
+    Translator,
+    pack_segments,
+    split_chunks,
+)
+from mcp_examples.llm_server.translation_memory import (
+    TranslationMemory,
+    split_sentences,
+)
+
+
+class FakeModels:
+    """Translates segments to upper case, skipping the ones containing "skip" once."""
+
+    def __init__(self):
+        self.requests = []
+        self.skipped = set()
+
+    async def generate_content(self, model, contents, config=None):
+        pack = json.loads(contents[-1])
+        self.requests.append(pack)
+        translations = []
+        for i, text in pack.items():
+            if "skip" in text and text not in self.skipped:
+                self.skipped.add(text)
+                continue
+            translations.append(SegmentTranslation(id=int(i), translation=text.upper()))
+        return SimpleNamespace(
+            parsed=BatchTranslation(translations=translations), candidates=[]
+        )
+
+
+class UnparsableModels(FakeModels):
+    """Returns unparsable output for packs of several segments."""
+
+    async def generate_content(self, model, contents, config=None):
+        pack = json.loads(contents[-1])
+        if len(pack) > 1:
+            self.requests.append(pack)
+            return SimpleNamespace(parsed=None, candidates=[])
+        return await super().generate_content(model, contents, config)
+
+
+class TestTranslation(unittest.TestCase):
+    def setUp(self):
+        self.models = FakeModels()
+        self.translator = Translator(
+            client=self.models,
+            max_pack_chars=20,
+            max_pack_segments=2,
+            response_cache=ResponseCache(),
+            memory=None,
+        )
+
+    def test_pack_segments(self):
+        self.assertEqual(
+            pack_segments(["aaaa", "bbbb", "cccc", "dddddddddddd", "e"], 10, 5),
+            [[0, 1], [2], [3], [4]],
+        )
+        self.assertEqual(pack_segments(["a", "b", "c"], 10, 2), [[0, 1], [2]])
+
+    def test_translate_batch(self):
+        segments = ["ok", "cancel", "ok", " ", "save", "skip me", "open"]
+        translations = asyncio.run(
+            self.translator.translate_batch("French", segments))
+        self.assertEqual(
+            translations, ["OK", "CANCEL", "OK", " ", "SAVE", "SKIP ME", "OPEN"])
+        # Duplicates and blank segments are not sent.
+        sent = [text for pack in self.models.requests for text in pack.values()]
+        self.assertEqual(sent.count("ok"), 1)
+        self.assertNotIn(" ", sent)
+
+    def test_falls_back_to_single_segments(self):
+        self.translator.client = UnparsableModels()
+        translations = asyncio.run(
+            self.translator.translate_batch("French", ["ok", "cancel"]))
+        self.assertEqual(translations, ["OK", "CANCEL"])
+
+    def test_rejects_duplicated_ids(self):
+        class DuplicatingModels(FakeModels):
+            async def generate_content(self, model, contents, config=None):
+                pack = json.loads(contents[-1])
+                self.requests.append(pack)
+                i = int(next(iter(pack)))
+                translations = [SegmentTranslation(id=i, translation="A"),
+                                SegmentTranslation(id=i, translation="B")]
+                return SimpleNamespace(
+                    parsed=BatchTranslation(translations=translations), candidates=[]
+                )
+
+        self.translator.client = DuplicatingModels()
+        with self.assertRaisesRegex(RuntimeError, "no translation for: ok"):
+            asyncio.run(self.translator.translate_batch("French", ["ok"]))
+
+    def test_retries_truncated_output(self):
+        class TruncatingModels:
+            """Cuts the first response off at the token limit."""
+
+            def __init__(self):
+                self.calls = 0
+
+            async def generate_content(self, model, contents, config=None):
+                self.calls += 1
+                if self.calls == 1:
+                    text = '{"translations": [{"id": 0, "transl'
+                    finish_reason = types.FinishReason.MAX_TOKENS
+                else:
+                    text = '{"translations": [{"id": 0, "translation": "Hola"}]}'
+                    finish_reason = types.FinishReason.STOP
+                response = types.GenerateContentResponse(
+                    candidates=[
+                        types.Candidate(
+                            content=types.Content(
+                                role="model", parts=[types.Part.from_text(text=text)]),
+                            finish_reason=finish_reason,
+                        )
+                    ]
+                )
+                if finish_reason == types.FinishReason.STOP:
+                    response.parsed = BatchTranslation.model_validate_json(text)
+                return response
+
+        models = TruncatingModels()
+        self.translator.client = models
+        with self.assertRaisesRegex(RuntimeError, "unparsable output"):
+            asyncio.run(self.translator.translate_batch("es", ["Hello"]))
+        self.assertEqual(
+            asyncio.run(self.translator.translate_batch("es", ["Hello"])), ["Hola"])
+        self.assertEqual(
+            asyncio.run(self.translator.translate_batch("es", ["Hello"])), ["Hola"])
+        self.assertEqual(models.calls, 2)
+
+    def test_split_chunks(self):
+        text = "First paragraph.\n\nSecond one. It is longer than the limit.\n\nThird."
+        chunks = split_chunks(text, 30)
+        self.assertEqual("".join(chunks), text)
+        self.assertTrue(all(len(chunk) <= 30 for chunk in chunks))
+        self.assertEqual(chunks[0], "First paragraph.\n\nSecond one. ")
+
+    def test_iter_translate_document(self):
+        class SlowFirstModels:
+            def __init__(self):
+                self.contents = []
+
+            async def generate_content(self, model, contents, config=None):
+                self.contents.append(contents)
+                # The first chunk finishes last.
+                await asyncio.sleep(0.05 if "one" in contents[-1] else 0)
+                return SimpleNamespace(text=contents[-1].strip().upper(), candidates=[])
+
+        models = SlowFirstModels()
+        translator = Translator(
+            client=models,
+            document_chunk_tokens=4,
+            document_context_chars=5,
+            response_cache=ResponseCache(),
+            memory=None,
+        )
+
+        async def translate():
+            return [
+                chunk
+                async for chunk in translator.iter_translate_document(
+                    "French", "Chunk one.\n\nChunk two.\n\nChunk three."
+                )
+            ]
+
+        chunks = asyncio.run(translate())
+        self.assertEqual(
+            chunks, ["CHUNK ONE.\n\n", "CHUNK TWO.\n\n", "CHUNK THREE."])
+        # Every chunk after the first gets the end of the previous one as context.
+        contexts = {contents[-1]: contents[2] for contents in models.contents[1:]}
+        self.assertEqual(contexts["Chunk two.\n\n"], "ne.\n\n")
+
+
+class TestTranslationMemory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.memory = TranslationMemory(Path(self.tmp.name) / "tm.sqlite3")
+        self.models = FakeModels()
+        self.translator = Translator(
+            client=self.models,
+            response_cache=ResponseCache(),
+            memory=self.memory,
+        )
+
+    def tearDown(self):
+        self.memory.close()
+        self.tmp.cleanup()
+
+    def test_split_sentences(self):
+        text = "Hello world. How are you?\n\nFine!"
+        pieces = split_sentences(text)
+        self.assertEqual(pieces[::2], ["Hello world.", "How are you?", "Fine!"])
+        self.assertEqual("".join(pieces), text)
+
+    def test_translate_text_only_sends_new_sentences(self):
+        first = asyncio.run(self.translator.translate_text(
+            "French", "Save the file. Close it.\n"))
+        self.assertEqual(first, "SAVE THE FILE. CLOSE IT.\n")
+        second = asyncio.run(self.translator.translate_text(
+            "French", " Close it.  Open it."))
+        self.assertEqual(second, " CLOSE IT.  OPEN IT.")
+        self.assertEqual(self.models.requests[-1], {"0": "Open it."})
+        self.assertEqual(self.memory.stats(), {"hits": 1, "fuzzy_hits": 0, "misses": 3})
+
+    def test_fuzzy_lookup(self):
+        self.memory.store("French", {"Save the document now.": "Enregistrez."})
+        self.assertEqual(self.memory.lookup("French", ["Save the document now!"]), {})
+        self.memory.fuzzy_threshold = 0.9
+        self.assertEqual(
+            self.memory.lookup("French", ["Save the document now!"]),
+            {"Save the document now!": "Enregistrez."},
+        )
+        self.assertEqual(self.memory.lookup("French", ["Delete everything"]), {})
+        self.assertEqual(self.memory.lookup("German", ["Save the document now."]), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+import asyncio
+import time
+import unittest
+
+import httpx
+
+from mcp_examples.weather import cache as weather_cache
+from mcp_examples.weather import nws
+from mcp_examples.weather.cache import GridPointCache, ResponseCache, quantize
+from mcp_examples.weather.nws import NWSClient, NWSError
+from mcp_examples.weather.server import get_forecast
+
+FORECAST_URL = "https://api.weather.gov/gridpoints/MTR/85,105/forecast"
+PERIOD = {
+    "name": "Tonight",
+    "temperature": 55,
+    "temperatureUnit": "F",
+    "windSpeed": "5 mph",
+    "windDirection": "W",
+    "detailedForecast": "Clear.",
+}
+
+
+class TestNWSClient(unittest.IsolatedAsyncioTestCase):
+    async def test_reuses_one_client(self):
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(200, json={"path": request.url.path})
+        )
+        client = NWSClient(transport=transport)
+        first = await client.get_json("https://api.weather.gov/points/1,2")
+        pooled = client.client
+        second = await client.get_json("https://api.weather.gov/alerts")
+        self.assertIs(client.client, pooled)
+        await client.aclose()
+        self.assertEqual(first, {"path": "/points/1,2"})
+        self.assertEqual(second, {"path": "/alerts"})
+        self.assertEqual(client.stats()["requests"], 2)
+        self.assertEqual(client.stats()["errors"], 0)
+
+    async def test_status_error(self):
+        client = NWSClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(503))
+        )
+        with self.assertRaises(NWSError) as raised:
+            await client.get_json("https://api.weather.gov/points/1,2")
+        await client.aclose()
+        self.assertEqual(raised.exception.status_code, 503)
+        self.assertIn("503", str(raised.exception))
+        self.assertGreaterEqual(raised.exception.latency, 0)
+        self.assertEqual(client.stats()["errors"], 1)
+
+    async def test_transport_error(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            raise httpx.ConnectError("connection refused", request=request)
+
+        client = NWSClient(transport=httpx.MockTransport(handler))
+        with self.assertRaises(NWSError) as raised:
+            await client.get_json("https://api.weather.gov/points/1,2")
+        await client.aclose()
+        self.assertIsNone(raised.exception.status_code)
+        self.assertIn("ConnectError", str(raised.exception))
+
+
+class TestGridPointCache(unittest.TestCase):
+    def test_quantize(self):
+        self.assertEqual(quantize(37.7749, -122.4194), (37.77, -122.42))
+        self.assertEqual(quantize(37.77, -122.42), (37.77, -122.42))
+
+    def test_nearby_coordinates_share_a_key(self):
+        cache = GridPointCache()
+        self.assertEqual(cache.key(37.7749, -122.4194),
+                         cache.key(37.7701, -122.4151))
+        self.assertNotEqual(cache.key(37.7749, -122.4194),
+                            cache.key(37.79, -122.4194))
+
+
+class TestGetForecast(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.paths = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            self.paths.append(request.url.path)
+            if request.url.path.startswith("/points/"):
+                return httpx.Response(
+                    200, json={"properties": {"forecast": FORECAST_URL}})
+            return httpx.Response(200, json={"properties": {"periods": [PERIOD]}})
+
+        nws._nws_client = NWSClient(transport=httpx.MockTransport(handler))
+        weather_cache._grid_point_cache = GridPointCache()
+        weather_cache._response_cache = ResponseCache(client=nws._nws_client)
+
+    async def asyncTearDown(self):
+        await nws._nws_client.aclose()
+        nws._nws_client = None
+        weather_cache._grid_point_cache = None
+        weather_cache._response_cache = None
+
+    async def test_nearby_forecast_is_served_from_the_caches(self):
+        first = await get_forecast(37.7749, -122.4194)
+        second = await get_forecast(37.7701, -122.4151)
+        self.assertIn("Temperature: 55°F", first)
+        self.assertEqual(first, second)
+        self.assertEqual(
+            self.paths,
+            ["/points/37.77,-122.42", "/gridpoints/MTR/85,105/forecast"],
+        )
+
+    async def test_stale_forecast_makes_one_request(self):
+        await get_forecast(37.7749, -122.4194)
+        weather_cache._response_cache.memory.clear()
+        await get_forecast(37.7749, -122.4194)
+        self.assertEqual(
+            self.paths,
+            ["/points/37.77,-122.42", "/gridpoints/MTR/85,105/forecast",
+             "/gridpoints/MTR/85,105/forecast"],
+        )
+
+
+class TestResponseCache(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.requests = []
+        self.version = 1
+        self.cache_control = "max-age=60"
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            self.requests.append(request)
+            etag = f'"v{self.version}"'
+            if request.headers.get("If-None-Match") == etag:
+                return httpx.Response(304, headers={"Cache-Control": self.cache_control})
+            return httpx.Response(
+                200,
+                headers={"Cache-Control": self.cache_control, "ETag": etag},
+                json={"version": self.version},
+            )
+
+        self.client = NWSClient(transport=httpx.MockTransport(handler))
+        self.cache = ResponseCache(client=self.client)
+
+    async def asyncTearDown(self):
+        await self.cache.aclose()
+        await self.client.aclose()
+
+    def expire(self, url, seconds_ago=1):
+        self.cache.lookup(url).expires_at = time.time() - seconds_ago
+
+    async def test_fresh_payload_is_served_from_memory(self):
+        url = "https://api.weather.gov/alerts/active/area/CA"
+        self.assertEqual(await self.cache.get_json(url), {"version": 1})
+        self.assertEqual(await self.cache.get_json(url), {"version": 1})
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    async def test_stale_payload_is_revalidated_in_background(self):
+        url = "https://api.weather.gov/gridpoints/MTR/85,105/forecast"
+        await self.cache.get_json(url)
+        self.expire(url)
+        self.assertEqual(await self.cache.get_json(url), {"version": 1})
+        await asyncio.gather(*self.cache._refreshes)
+        self.assertEqual(self.requests[1].headers["If-None-Match"], '"v1"')
+        self.assertEqual(self.cache.stats()["revalidations"], 1)
+        self.assertTrue(self.cache.lookup(url).is_fresh())
+
+        self.version = 2
+        self.expire(url)
+        self.assertEqual(await self.cache.get_json(url), {"version": 1})
+        await asyncio.gather(*self.cache._refreshes)
+        self.assertEqual(await self.cache.get_json(url), {"version": 2})
+        self.assertEqual(len(self.requests), 3)
+
+    async def test_no_cache_payload_is_revalidated_before_use(self):
+        self.cache_control = "no-cache"
+        url = "https://api.weather.gov/gridpoints/MTR/85,105/forecast"
+        await self.cache.get_json(url)
+        self.version = 2
+        self.assertEqual(await self.cache.get_json(url), {"version": 2})
+        self.assertEqual(self.requests[1].headers["If-None-Match"], '"v1"')
+        self.assertEqual(self.cache.stats()["stale_hits"], 0)
+
+    async def test_alerts_are_only_briefly_served_stale(self):
+        url = "https://api.weather.gov/alerts/active/area/CA"
+        await self.cache.get_json(url)
+        self.version = 2
+        self.expire(url, seconds_ago=120)
+        self.assertEqual(await self.cache.get_json(url), {"version": 2})
+        self.assertEqual(self.cache.stats()["stale_hits"], 0)